@@ -0,0 +1,340 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    Adaptive - A parser which adds the indexes for the searches it is given often
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+from .Parser import IndexedAdvancedHTMLParser
+
+__all__ = ('AdaptiveAdvancedHTMLParser', 'DEFAULT_AUTO_INDEX_THRESHOLD', 'ATTRIBUTE_INDEX_PREFIX')
+
+
+# DEFAULT_AUTO_INDEX_THRESHOLD - The default number of full searches which could have used an index, after which it is added
+DEFAULT_AUTO_INDEX_THRESHOLD = 3
+
+# ATTRIBUTE_INDEX_PREFIX - The name of the index on an attribute (@see IndexedAdvancedHTMLParser.addIndexOnAttribute) is this prefix and the attribute name
+ATTRIBUTE_INDEX_PREFIX = 'attribute:'
+
+
+class AdaptiveAdvancedHTMLParser(IndexedAdvancedHTMLParser):
+    '''
+        AdaptiveAdvancedHTMLParser - An IndexedAdvancedHTMLParser which starts without indexes, so searches are full searches as
+            with AdvancedHTMLParser, and adds an index once #autoIndexThreshold searches could have used it.
+
+          The searches are counted by the index they would use:
+
+            "id" - getElementById
+            "name" - getElementsByName
+            "classname" - getElementsByClassName
+            "tagname" - getElementsByTagName
+            "attributenames" - getElementsWithAttr, getElementsWithAttrPrefix
+            "text" - getElementsByText
+            "attribute:" + attribute name - getElementsByAttr, getElementsWithAttrValues
+
+            find counts each of its criteria given a single value.
+
+          An index is built the first time it is used (@see IndexedAdvancedHTMLParser lazyIndexes), and is then kept up to date
+            as the document is modified, and built again for each document parsed.
+
+          With maxIndexEntries, once the added indexes hold more entries (a tag under a value) than that, those least recently
+            used are removed until within it. A removed index is added again once searched by #autoIndexThreshold more times.
+    '''
+
+    def __init__(self, filename=None, encoding='utf-8', tokenizer=None, keepFilter=None, autoIndexThreshold=DEFAULT_AUTO_INDEX_THRESHOLD, maxIndexEntries=None):
+        '''
+            __init__ - Create an AdaptiveAdvancedHTMLParser
+
+                @param filename <str>         - Optional filename to parse. Otherwise use parseFile or parseStr methods.
+                @param encoding <str> - Specifies the document encoding. Default utf-8
+                @param tokenizer <None/class> - Tokenizer backend class, @see AdvancedHTMLParser.__init__
+                @param keepFilter <None/str/function/list/KeepFilter> - Only build matching elements, @see AdvancedHTMLParser.__init__
+                @param autoIndexThreshold <int> - The number of searches which could use an index, after which it is added. <default 3>
+                @param maxIndexEntries <None/int> - If not None, the maximum number of entries (a tag under a value) held by the added
+                                                      indexes, beyond which the least recently used are removed. <default None>
+        '''
+        self.autoIndexThreshold = autoIndexThreshold
+        self.maxIndexEntries = maxIndexEntries
+
+        # Index name -> the number of searches which could have used it, for each index not added
+        self._searchCounts = {}
+
+        # Index name -> the number of the search which last used it, for each index added
+        self._autoIndexLastUsed = {}
+        self._searchNumber = 0
+
+        # Set when an index is built, so the size of the indexes is checked after the search
+        self._isIndexSizeChanged = False
+
+        # Set during a search, @see _search
+        self._isSearching = False
+
+        IndexedAdvancedHTMLParser.__init__(self, filename, encoding, indexIDs=False, indexNames=False, indexClassNames=False, indexTagNames=False,
+            tokenizer=tokenizer, keepFilter=keepFilter, indexAttributeNames=False, indexText=False, lazyIndexes=True,
+        )
+
+    ######## Tracking searches #########
+
+    def _getIndexInfo(self, name):
+        '''
+            _getIndexInfo - Get the setting, index function name and member names of an index enabled by an index* setting
+
+                @param name <str> - The index name, @see IndexedAdvancedHTMLParser._INDEXES
+
+                @return tuple( <str>, <str>, tuple<str> )
+        '''
+        for (indexName, settingName, indexFunctionName, memberNames) in self._INDEXES:
+            if indexName == name:
+                return (settingName, indexFunctionName, memberNames)
+
+        raise KeyError('Unknown index: %s' %(name, ))
+
+    def _isIndexed(self, name):
+        '''
+            _isIndexed - Check if there is an index (added by this parser or otherwise)
+
+                @param name <str> - The index name
+
+                @return <bool>
+        '''
+        if name.startswith(ATTRIBUTE_INDEX_PREFIX):
+            return name[len(ATTRIBUTE_INDEX_PREFIX):] in self._otherAttributeIndexes
+
+        return getattr(self, self._getIndexInfo(name)[0]) is True
+
+    def _addAutoIndex(self, name):
+        '''
+            _addAutoIndex - Add an index, to be built when first used
+
+                @param name <str> - The index name
+        '''
+        if name.startswith(ATTRIBUTE_INDEX_PREFIX):
+            self.addIndexOnAttribute(name[len(ATTRIBUTE_INDEX_PREFIX):])
+        else:
+            (settingName, indexFunctionName, memberNames) = self._getIndexInfo(name)
+            setattr(self, settingName, True)
+            self._unbuiltIndexes[name] = getattr(self, indexFunctionName)
+
+        self._autoIndexLastUsed[name] = self._searchNumber
+
+    def _removeAutoIndex(self, name):
+        '''
+            _removeAutoIndex - Remove an index added by _addAutoIndex, and the indexed data
+
+                @param name <str> - The index name
+        '''
+        del self._autoIndexLastUsed[name]
+
+        if name.startswith(ATTRIBUTE_INDEX_PREFIX):
+            self.removeIndexOnAttribute(name[len(ATTRIBUTE_INDEX_PREFIX):])
+            return
+
+        (settingName, indexFunctionName, memberNames) = self._getIndexInfo(name)
+        setattr(self, settingName, False)
+
+        indexFunction = getattr(self, indexFunctionName)
+        self._unbuiltIndexes.pop(name, None)
+        if indexFunction in self.indexFunctions:
+            self.indexFunctions.remove(indexFunction)
+
+        for memberName in memberNames:
+            getattr(self, memberName).clear()
+
+    def _getIndexSize(self, name):
+        '''
+            _getIndexSize - Get the number of entries (a tag under a value) in an index
+
+                @param name <str> - The index name
+
+                @return <int>
+        '''
+        if name.startswith(ATTRIBUTE_INDEX_PREFIX):
+            index = self._otherAttributeIndexes.get(name[len(ATTRIBUTE_INDEX_PREFIX):], None)
+        elif name == 'id':
+            return len(self._idMap)
+        else:
+            index = getattr(self, self._getIndexInfo(name)[2][0])
+
+        if not index:
+            return 0
+
+        return sum( [ len(tags) for tags in index.values() ] )
+
+    def _onSearch(self, name):
+        '''
+            _onSearch - Count a search which uses, or could use, an index. The index is added if this is search #autoIndexThreshold.
+
+                @param name <str> - The index name
+        '''
+        self._searchNumber += 1
+
+        if name in self._autoIndexLastUsed:
+            self._autoIndexLastUsed[name] = self._searchNumber
+        elif not self._isIndexed(name):
+            searchCount = self._searchCounts.get(name, 0) + 1
+            if searchCount >= self.autoIndexThreshold:
+                self._searchCounts.pop(name, None)
+                self._addAutoIndex(name)
+            else:
+                self._searchCounts[name] = searchCount
+
+    def _limitIndexSize(self):
+        '''
+            _limitIndexSize - If over maxIndexEntries, remove the least recently used indexes added by this parser until within it
+        '''
+        self._isIndexSizeChanged = False
+
+        maxIndexEntries = self.maxIndexEntries
+        if maxIndexEntries is None:
+            return
+
+        indexSizes = dict( [ (name, self._getIndexSize(name)) for name in self._autoIndexLastUsed ] )
+        totalSize = sum(indexSizes.values())
+
+        autoIndexLastUsed = self._autoIndexLastUsed
+        for name in sorted(autoIndexLastUsed.keys(), key=autoIndexLastUsed.get):
+            if totalSize <= maxIndexEntries:
+                break
+
+            totalSize -= indexSizes[name]
+            self._removeAutoIndex(name)
+
+    def _search(self, indexNames, searchFunction, *args, **kwargs):
+        '''
+            _search - Count a search by the indexes it could use (@see _onSearch), and perform it
+
+                @param indexNames list<str> - The names of the indexes
+
+                @param searchFunction <function> - The search method of IndexedAdvancedHTMLParser
+
+                @param args, kwargs - The arguments to #searchFunction
+
+                @return - The result of #searchFunction
+        '''
+        # A full search may call the same method for each child, which is part of this search
+        if self._isSearching is True:
+            return searchFunction(self, *args, **kwargs)
+
+        for name in indexNames:
+            self._onSearch(name)
+
+        self._isSearching = True
+        try:
+            ret = searchFunction(self, *args, **kwargs)
+        finally:
+            self._isSearching = False
+
+        # Only after the search, as it may use the index just built
+        if self._isIndexSizeChanged is True:
+            self._limitIndexSize()
+
+        return ret
+
+    def _buildIndex(self, name):
+        '''
+            _buildIndex - Build an index when first used, @see IndexedAdvancedHTMLParser._buildIndex
+        '''
+        if name in self._unbuiltIndexes:
+            IndexedAdvancedHTMLParser._buildIndex(self, name)
+            self._isIndexSizeChanged = True
+
+    def _buildAttributeIndex(self, attributeName):
+        '''
+            _buildAttributeIndex - Build an index on an attribute when first used, @see IndexedAdvancedHTMLParser._buildAttributeIndex
+        '''
+        if self._otherAttributeIndexes.get(attributeName, {}) is None:
+            IndexedAdvancedHTMLParser._buildAttributeIndex(self, attributeName)
+            self._isIndexSizeChanged = True
+
+##########################################################
+#                 Public
+##########################################################
+
+    def getAutoIndexes(self):
+        '''
+            getAutoIndexes - Get the names of the indexes added by this parser, @see AdaptiveAdvancedHTMLParser
+
+                @return list<str> - The index names, most recently used first
+        '''
+        autoIndexLastUsed = self._autoIndexLastUsed
+
+        return sorted(autoIndexLastUsed.keys(), key=autoIndexLastUsed.get, reverse=True)
+
+    def getElementById(self, _id, root='root', useIndex=True):
+        '''
+            getElementById - Searches and returns the first (should only be one) element with the given ID, @see IndexedAdvancedHTMLParser.getElementById
+        '''
+        return self._search(['id'] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementById, _id, root, useIndex)
+
+    def getElementsByName(self, name, root='root', useIndex=True):
+        '''
+            getElementsByName - Searches and returns all elements with a specific name, @see IndexedAdvancedHTMLParser.getElementsByName
+        '''
+        return self._search(['name'] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementsByName, name, root, useIndex)
+
+    def getElementsByClassName(self, className, root='root', useIndex=True):
+        '''
+            getElementsByClassName - Searches and returns all elements containing a given class name, @see IndexedAdvancedHTMLParser.getElementsByClassName
+        '''
+        return self._search(['classname'] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementsByClassName, className, root, useIndex)
+
+    def getElementsByTagName(self, tagName, root='root', useIndex=True):
+        '''
+            getElementsByTagName - Searches and returns all elements with a specific tag name, @see IndexedAdvancedHTMLParser.getElementsByTagName
+        '''
+        return self._search(['tagname'] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementsByTagName, tagName, root, useIndex)
+
+    def getElementsByAttr(self, attrName, attrValue, root='root', useIndex=True):
+        '''
+            getElementsByAttr - Searches the full tree for elements with a given attribute name and value combination, @see IndexedAdvancedHTMLParser.getElementsByAttr
+        '''
+        return self._search([ATTRIBUTE_INDEX_PREFIX + attrName] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementsByAttr, attrName, attrValue, root, useIndex)
+
+    def getElementsWithAttrValues(self, attrName, values, root='root', useIndex=True):
+        '''
+            getElementsWithAttrValues - Returns elements with an attribute matching one of several values, @see IndexedAdvancedHTMLParser.getElementsWithAttrValues
+        '''
+        return self._search([ATTRIBUTE_INDEX_PREFIX + attrName] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementsWithAttrValues, attrName, values, root, useIndex)
+
+    def getElementsWithAttr(self, attrName, root='root', useIndex=True):
+        '''
+            getElementsWithAttr - Returns elements which have an attribute, with any value, @see IndexedAdvancedHTMLParser.getElementsWithAttr
+        '''
+        return self._search(['attributenames'] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementsWithAttr, attrName, root, useIndex)
+
+    def getElementsWithAttrPrefix(self, prefix, root='root', useIndex=True):
+        '''
+            getElementsWithAttrPrefix - Returns elements which have an attribute with a name starting with #prefix, @see IndexedAdvancedHTMLParser.getElementsWithAttrPrefix
+        '''
+        return self._search(['attributenames'] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementsWithAttrPrefix, prefix, root, useIndex)
+
+    def getElementsByText(self, text, root='root', textContent=False, useIndex=True):
+        '''
+            getElementsByText - Returns elements with the words of #text in their text, @see IndexedAdvancedHTMLParser.getElementsByText
+        '''
+        return self._search(['text'] if useIndex is True else [], IndexedAdvancedHTMLParser.getElementsByText, text, root, textContent, useIndex)
+
+    def find(self, **kwargs):
+        '''
+            find - Perform a search of elements using attributes as keys and potential values as values, @see IndexedAdvancedHTMLParser.find
+
+                Each key given a single value is counted as a search by its index.
+        '''
+        indexNames = []
+        for (key, value) in kwargs.items():
+            key = key.lower()
+            # "text" is the text within a tag, not an attribute, so has no index here
+            if not value or isinstance(value, (list, tuple)) or key.endswith('contains') or key in ('id', 'text'):
+                continue
+
+            if key in ('tagname', 'name'):
+                indexNames.append(key)
+            elif key in ('classname', 'class'):
+                indexNames.append('classname')
+            else:
+                indexNames.append(ATTRIBUTE_INDEX_PREFIX + key)
+
+        return self._search(indexNames, IndexedAdvancedHTMLParser.find, **kwargs)
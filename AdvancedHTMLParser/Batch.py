@@ -0,0 +1,171 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    Batch - Parsing many documents across a pool of processes
+
+      @see AdvancedHTMLParser.parseMany
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+import multiprocessing
+import pickle
+import signal
+import traceback
+
+__all__ = ('ParseResult', 'parseMany')
+
+
+class ParseResult(object):
+    '''
+        ParseResult - The result of parsing a single document with AdvancedHTMLParser.parseMany
+
+            @ivar index <int> - The index of the source this result is for
+
+            @ivar value - The parser (if no extraction was requested), or the extracted data. None if an error occured.
+                A parser is the heaviest form to send back from a worker, @see AdvancedHTMLParser.parseMany
+
+            @ivar error <None/Exception> - The exception raised while parsing/extracting this document, or None on success.
+
+            @ivar errorTraceback <None/str> - The formatted traceback of #error, or None on success
+    '''
+
+    def __init__(self, index, value=None, error=None, errorTraceback=None):
+        self.index = index
+        self.value = value
+        self.error = error
+        self.errorTraceback = errorTraceback
+
+    @property
+    def isError(self):
+        '''
+            isError - True if an error occured parsing or extracting this document
+        '''
+        return self.error is not None
+
+    def __repr__(self):
+        if self.error is not None:
+            return '%s(index=%d, error=%s)' %(self.__class__.__name__, self.index, repr(self.error))
+
+        return '%s(index=%d, value=%s)' %(self.__class__.__name__, self.index, repr(self.value))
+
+
+# _workerConfig - The options for the parseMany job of a pool worker process, set once per process
+#   by the pool initializer so they are not sent along with every source.
+#   Only used within pool workers. Parsing in the calling process passes the options directly,
+#   as parseMany may be called again (e.x. from another thread, or an extract function) before it returns.
+_workerConfig = None
+
+def _initWorker(parserClass, encoding, extract, xpaths, sourcesAreFilenames):
+    global _workerConfig
+    _workerConfig = (parserClass, encoding, extract, xpaths, sourcesAreFilenames)
+
+    # A KeyboardInterrupt is handled by the parent, which stops the pool. The pool stops its workers with SIGTERM,
+    #   so that must not be ignored, even if it was by the process which started the pool.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _parseOne(indexAndSource, config):
+    '''
+        _parseOne - Parse a single source
+
+            @param indexAndSource tuple<int, str/bytes> - The index and source (html or filename)
+
+            @param config tuple - The options of the job: (parserClass, encoding, extract, xpaths, sourcesAreFilenames)
+
+            @return <ParseResult>
+    '''
+    (parserClass, encoding, extract, xpaths, sourcesAreFilenames) = config
+    (index, source) = indexAndSource
+
+    try:
+        parser = parserClass(encoding=encoding)
+        if sourcesAreFilenames is True:
+            parser.parseFile(source)
+        else:
+            parser.parseStr(source)
+
+        if extract is not None:
+            value = extract(parser)
+        elif xpaths is not None:
+            value = [ [ tag.outerHTML for tag in parser.getElementsByXPathExpression(xpathExprStr) ] for xpathExprStr in xpaths ]
+        else:
+            value = parser
+
+        return ParseResult(index, value)
+    except Exception as e:
+        return ParseResult(index, error=e, errorTraceback=traceback.format_exc())
+
+
+def _parseOneInWorker(indexAndSource):
+    '''
+        _parseOneInWorker - Parse a single source within a pool process
+
+            @return <bytes> - The pickled ParseResult. Pickling here, rather than leaving it to the pool,
+              allows a result which cannot be sent back to be reported as an error on that item.
+    '''
+    result = _parseOne(indexAndSource, _workerConfig)
+
+    if result.error is not None:
+        try:
+            pickle.loads(pickle.dumps(result.error, pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # Some exceptions (e.x. with required constructor args) cannot be restored, so send a plain copy
+            result.error = Exception('%s: %s' %(result.error.__class__.__name__, str(result.error)))
+
+    try:
+        return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        return pickle.dumps(ParseResult(result.index, error=Exception('Cannot send result: %s' %(str(e), )), errorTraceback=traceback.format_exc()), pickle.HIGHEST_PROTOCOL)
+
+
+def parseMany(parserClass, sources, workers=None, extract=None, xpaths=None, encoding='utf-8', sourcesAreFilenames=False, chunkSize=None):
+    '''
+        parseMany - Parse many documents using a pool of processes.
+
+            @see AdvancedHTMLParser.parseMany for parameters
+
+            @return list<ParseResult>
+    '''
+    if extract is not None and xpaths is not None:
+        raise ValueError('Only one of "extract" or "xpaths" may be provided.')
+
+    if xpaths is not None:
+        xpaths = list(xpaths)
+
+    indexedSources = list(enumerate(sources))
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    workers = min(workers, len(indexedSources))
+
+    if workers <= 1:
+        # Not worth the overhead of starting processes, parse in this one.
+        config = (parserClass, encoding, extract, xpaths, sourcesAreFilenames)
+
+        return [ _parseOne(indexAndSource, config) for indexAndSource in indexedSources ]
+
+    if not chunkSize:
+        # Several chunks per worker balances uneven document sizes against per-dispatch overhead
+        chunkSize = max(1, len(indexedSources) // (workers * 4))
+
+    pool = multiprocessing.Pool(workers, _initWorker, (parserClass, encoding, extract, xpaths, sourcesAreFilenames))
+    try:
+        # imap returns results in the same order as the sources
+        results = [ pickle.loads(pickledResult) for pickledResult in pool.imap(_parseOneInWorker, indexedSources, chunkSize) ]
+    except:
+        # On an error (or KeyboardInterrupt), stop the workers rather than waiting for the remaining sources
+        pool.terminate()
+        pool.join()
+        raise
+
+    pool.close()
+    pool.join()
+
+    return results
+
+# vim: set ts=4 sw=4 st=4 expandtab :
@@ -23,11 +23,10 @@ except NameError:
     from io import TextIOWrapper as file
 
 
-from .constants import PREFORMATTED_TAGS, IMPLICIT_SELF_CLOSING_TAGS, PRESERVE_CONTENTS_TAGS, INVISIBLE_ROOT_TAG, INVISIBLE_ROOT_TAG_START, INVISIBLE_ROOT_TAG_END
-from .exceptions import MultipleRootNodeException
+from .constants import PREFORMATTED_TAGS, IMPLICIT_SELF_CLOSING_TAGS, PRESERVE_CONTENTS_TAGS, INVISIBLE_ROOT_TAG
 from .Tags import AdvancedTag
 
-from .utils import addStartTag, stripIEConditionals
+from .utils import stripIEConditionals
 
 import codecs
 
@@ -40,6 +39,10 @@ class AdvancedHTMLFormatter(HTMLParser):
         It does, however, understand "pre", "code" and "script" tags and will not try to format their contents.
     '''
 
+    # multipleRootSwitchCount - Number of times (process-wide) a document being formatted was switched
+    #   in-place to use the invisible root tag. @see AdvancedHTMLParser.multipleRootSwitchCount
+    multipleRootSwitchCount = 0
+
     def __init__(self, indent='  ', encoding='utf-8'):
         '''
             Create a pretty formatter.
@@ -67,6 +70,9 @@ class AdvancedHTMLFormatter(HTMLParser):
         self._inTag = []
         self.doctype = None
 
+        self._leadingWhitespace = []
+        self._trailingWhitespace = []
+
 
 
     def feed(self, contents):
@@ -76,12 +82,7 @@ class AdvancedHTMLFormatter(HTMLParser):
             @param contents - HTML contents
         '''
         contents = stripIEConditionals(contents)
-        try:
-            HTMLParser.feed(self, contents)
-        except MultipleRootNodeException:
-            self.reset()
-
-            HTMLParser.feed(self, "%s%s" %(addStartTag(contents, INVISIBLE_ROOT_TAG_START), INVISIBLE_ROOT_TAG_END))
+        HTMLParser.feed(self, contents)
 
 
 
@@ -153,10 +154,42 @@ class AdvancedHTMLFormatter(HTMLParser):
         self.root = None
         self.doctype = None
         self.inPreformatted = 0
+        self._leadingWhitespace = []
+        self._trailingWhitespace = []
 
     def _getIndent(self):
         return '\n' + (self.indent * self.currentIndentLevel)
 
+    def _enterInvisibleRoot(self, data=''):
+        '''
+            _enterInvisibleRoot - Places the invisible root tag above what has been parsed so far and opens it,
+                when a second root node or text at the root level is found.
+
+                @param data <str> Default '' - Root-level text which triggered this, if any
+
+                @see AdvancedHTMLParser._enterInvisibleRoot
+        '''
+        AdvancedHTMLFormatter.multipleRootSwitchCount += 1
+
+        invisibleRoot = AdvancedTag(INVISIBLE_ROOT_TAG)
+        invisibleRoot._indent = self._getIndent()
+
+        oldRoot = self.root
+        self.root = invisibleRoot
+        self._inTag.append(invisibleRoot)
+
+        leadingWhitespace = '\n' + ''.join(self._leadingWhitespace)
+        trailingWhitespace = ''.join(self._trailingWhitespace)
+        self._leadingWhitespace = []
+        self._trailingWhitespace = []
+
+        if oldRoot is None:
+            self.handle_data(leadingWhitespace + data)
+        else:
+            self.handle_data(leadingWhitespace)
+            invisibleRoot.appendChild(oldRoot)
+            self.handle_data(trailingWhitespace + data)
+
     def handle_starttag(self, tagName, attributeList, isSelfClosing=False):
         '''
             handle_starttag - Internal for parsing
@@ -170,10 +203,10 @@ class AdvancedHTMLFormatter(HTMLParser):
         newTag = AdvancedTag(tagName, attributeList, isSelfClosing)
         if self.root is None:
             self.root = newTag
-        elif len(inTag) > 0:
-            inTag[-1].appendChild(newTag)
         else:
-            raise MultipleRootNodeException()
+            if len(inTag) == 0:
+                self._enterInvisibleRoot()
+            inTag[-1].appendChild(newTag)
 
         if self.inPreformatted == 0:
             newTag._indent = self._getIndent()
@@ -241,43 +274,45 @@ class AdvancedHTMLFormatter(HTMLParser):
                 inTag[-1].appendText(data)
             elif data.strip():
                 # Must be text prior to or after root node
-                raise MultipleRootNodeException()
+                self._enterInvisibleRoot(data)
+            elif self.root is None:
+                self._leadingWhitespace.append(data)
+            else:
+                self._trailingWhitespace.append(data)
 
     def handle_entityref(self, entity):
         '''
             Internal for parsing
         '''
         inTag = self._inTag
-        if len(inTag) > 0:
-            inTag[-1].appendText('&%s;' %(entity,))
-        else:
-            raise MultipleRootNodeException()
+        if len(inTag) == 0:
+            self._enterInvisibleRoot()
+        inTag[-1].appendText('&%s;' %(entity,))
 
     def handle_charref(self, charRef):
         '''
             Internal for parsing
         '''
         inTag = self._inTag
-        if len(inTag) > 0:
-            inTag[-1].appendText('&#%s;' %(charRef,))
-        else:
-            raise MultipleRootNodeException()
+        if len(inTag) == 0:
+            self._enterInvisibleRoot()
+        inTag[-1].appendText('&#%s;' %(charRef,))
 
     def handle_comment(self, comment):
         '''
             Internal for parsing
         '''
         inTag = self._inTag
-        if len(inTag) > 0:
-            inTag[-1].appendText('<!-- %s -->' %(comment,))
-        else:
-            raise MultipleRootNodeException()
+        if len(inTag) == 0:
+            self._enterInvisibleRoot()
+        inTag[-1].appendText('<!-- %s -->' %(comment,))
 
     def handle_decl(self, decl):
         '''
             Internal for parsing
         '''
         self.doctype = decl
+        self._leadingWhitespace = []
 
     def unknown_decl(self, decl):
         '''
@@ -401,10 +436,10 @@ def handle_starttag_slim(self, tagName, attributeList, isSelfClosing=False):
     newTag = AdvancedTagSlim(tagName, attributeList, isSelfClosing, slimSelfClosing=self.slimSelfClosing)
     if self.root is None:
         self.root = newTag
-    elif len(inTag) > 0:
-        inTag[-1].appendChild(newTag)
     else:
-        raise MultipleRootNodeException()
+        if len(inTag) == 0:
+            self._enterInvisibleRoot()
+        inTag[-1].appendChild(newTag)
 
     if self.inPreformatted == 0:
         newTag._indent = self._getIndent()
@@ -0,0 +1,725 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    Frozen - A read-only, columnar copy of a parsed document
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+import weakref
+
+from array import array
+
+from .constants import INVISIBLE_ROOT_TAG
+from .Lazy import _LazyBlocksMember
+from .Tags import AdvancedTag, TagCollection
+from .utils import tostr
+
+__all__ = ('FrozenDocument', 'FrozenTag')
+
+
+# BLOCK_CHILD - Value in the blocks column for "the next child tag", rather than the index of a text block
+BLOCK_CHILD = -1
+
+
+class _FrozenParentMember(object):
+    '''
+        _FrozenParentMember - Provides "parentNode" on a FrozenTag, by creating the view of the parent on first access.
+
+            The value is held in the AdvancedTag slot, which is left unset until then.
+    '''
+
+    def __init__(self):
+        self.slot = AdvancedTag.__dict__['parentNode']
+
+    def __get__(self, tag, tagClass=None):
+        if tag is None:
+            return self
+
+        try:
+            return self.slot.__get__(tag, tagClass)
+        except AttributeError:
+            tag._materializeParent()
+
+        return self.slot.__get__(tag, tagClass)
+
+    def __set__(self, tag, value):
+        self.slot.__set__(tag, value)
+
+    def __delete__(self, tag):
+        self.slot.__delete__(tag)
+
+
+class FrozenTag(AdvancedTag):
+    '''
+        FrozenTag - An AdvancedTag view of a node in a FrozenDocument, see FrozenDocument.getTag
+
+            The parent, children, and text are created from the FrozenDocument when first used.
+
+            This is a copy - changes made to it are not reflected in the FrozenDocument.
+    '''
+
+    __slots__ = ('_frozenDocument', '_frozenIndex')
+
+    blocks = _LazyBlocksMember('blocks')
+    children = _LazyBlocksMember('children')
+    parentNode = _FrozenParentMember()
+
+    def __init__(self, tagName, attrList=None, isSelfClosing=False, ownerDocument=None, frozenDocument=None, frozenIndex=None):
+        '''
+            __init__ - Construct
+
+                @param frozenDocument <None/FrozenDocument> - If provided, the parent, children, and text of this tag
+                    will be created from node #frozenIndex of this document when first used
+
+                @param frozenIndex <None/int> - The index of this node in #frozenDocument
+
+                @see AdvancedTag.__init__ for other params
+        '''
+        AdvancedTag.__init__(self, tagName, attrList, isSelfClosing, ownerDocument)
+
+        object.__setattr__(self, '_frozenDocument', frozenDocument)
+        object.__setattr__(self, '_frozenIndex', frozenIndex)
+
+        if frozenDocument is not None:
+            object.__delattr__(self, 'blocks')
+            object.__delattr__(self, 'children')
+            object.__delattr__(self, 'parentNode')
+            object.__setattr__(self, '_text', None)
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_frozenDocument', None)
+        object.__setattr__(self, '_frozenIndex', None)
+
+        AdvancedTag.__setstate__(self, state)
+
+    def getFrozenIndex(self):
+        '''
+            getFrozenIndex - Get the index of the node this is a view of, within its FrozenDocument
+
+                @return <int/None> - The index, or None if not a view
+        '''
+        return object.__getattribute__(self, '_frozenIndex')
+
+    def _materializeParent(self):
+        '''
+            _materializeParent - Set parentNode to the view of the parent node
+        '''
+        frozenDocument = object.__getattribute__(self, '_frozenDocument')
+
+        parentNode = None
+        if frozenDocument is not None:
+            parentIndex = frozenDocument.parents[ object.__getattribute__(self, '_frozenIndex') ]
+            if parentIndex != -1:
+                parentNode = frozenDocument.getTag(parentIndex)
+
+        object.__setattr__(self, 'parentNode', parentNode)
+
+    def _materializeBlocks(self):
+        '''
+            _materializeBlocks - Create the children (as FrozenTag views) and text blocks of this tag
+        '''
+        frozenDocument = object.__getattribute__(self, '_frozenDocument')
+        if frozenDocument is None:
+            return
+
+        index = object.__getattribute__(self, '_frozenIndex')
+
+        blocks = ['']
+        children = []
+
+        childIndex = frozenDocument.firstChilds[index]
+        for block in frozenDocument._iterBlocks(index):
+            if block == BLOCK_CHILD:
+                child = frozenDocument.getTag(childIndex)
+                object.__setattr__(child, 'parentNode', self)
+
+                blocks.append(child)
+                children.append(child)
+
+                childIndex = frozenDocument.nextSiblings[childIndex]
+            else:
+                blocks.append(frozenDocument.getTextBlock(block))
+
+        rawSet = object.__setattr__
+        rawSet(self, 'children', children)
+        rawSet(self, 'blocks', blocks)
+
+
+class FrozenDocument(object):
+    '''
+        FrozenDocument - A read-only copy of a parsed document, with the nodes held in parallel arrays (columns)
+            rather than as an AdvancedTag object per node. Create with AdvancedHTMLParser.freeze.
+
+            Nodes are numbered in document order (pre-order), starting with the root as 0. The columns are:
+
+                tagNameIds - Index of the tag name in #tagNames
+
+                parents, firstChilds, nextSiblings - Index of the parent, first child, and next sibling node, or -1 for none
+
+                depths - Depth of the node, with the root at 0
+
+                postOrders - Post-order number of the node. Node #a is within node #b if b < a and postOrders[a] < postOrders[b].
+                    The descendants of node #i are nodes i+1 through #getLastDescendantIndex(i).
+
+                attrStarts - Each node's attributes are attribute slots attrStarts[i] up to attrStarts[i+1], where each slot has:
+                    attrNameIds (index in #attrNames), attrNodes (the node index), and a value stored in the shared attribute value text
+
+                blockStarts - Each node's blocks (text and child tags, in order) are blockStarts[i] up to blockStarts[i+1] in the blocks column,
+                    where each block is either BLOCK_CHILD (the next child node), or the index of a text block in the shared text
+
+            Scans and navigation by node index (getTagName, getAttribute, getChildIndexes, getElementIndexesByTagName, etc) use
+              only the columns. getElementsBy* and getTag return AdvancedTag views (FrozenTag), created only for the nodes returned.
+    '''
+
+    def __init__(self, document):
+        '''
+            __init__ - Create a FrozenDocument from a parsed document
+
+                @param document <AdvancedHTMLParser> - The parsed document
+
+                @raises ValueError - If nothing was parsed
+        '''
+        root = document.getRoot()
+        if root is None:
+            raise ValueError('Did not parse anything. Use parseFile or parseStr')
+
+        self.doctype = document.doctype
+
+        # tagNames / attrNames - The interned names, and a map of name -> index
+        self.tagNames = []
+        self._tagNameIds = {}
+        self.attrNames = []
+        self._attrNameIds = {}
+
+        self.tagNameIds = array('i')
+        self.parents = array('i')
+        self.firstChilds = array('i')
+        self.nextSiblings = array('i')
+        self.depths = array('i')
+        self.postOrders = array('i')
+        self.selfClosings = array('b')
+
+        self.attrStarts = array('i')
+        self.attrNameIds = array('i')
+        self.attrNodes = array('i')
+        self.attrValueStarts = array('l')
+
+        self.blockStarts = array('i')
+        self.blocks = array('i')
+        self.textStarts = array('l')
+
+        self._freezeTree(root)
+
+        self._views = weakref.WeakValueDictionary()
+
+    def _freezeTree(self, root):
+        '''
+            _freezeTree - Fill the columns from the tree under #root
+        '''
+        tagNameIds = self.tagNameIds
+        parents = self.parents
+        firstChilds = self.firstChilds
+        nextSiblings = self.nextSiblings
+        depths = self.depths
+        selfClosings = self.selfClosings
+
+        attrStarts = self.attrStarts
+        attrNameIds = self.attrNameIds
+        attrNodes = self.attrNodes
+        attrValueStarts = self.attrValueStarts
+
+        blockStarts = self.blockStarts
+        blocks = self.blocks
+        textStarts = self.textStarts
+
+        attrValues = []
+        attrValueLength = 0
+        texts = []
+        textLength = 0
+
+        # lastChilds - The last child added to each node so far, to link the next sibling
+        lastChilds = []
+
+        # Visit in pre-order, with the children of each node pushed in reverse
+        stack = [ (root, -1) ]
+        while stack:
+            (tag, parentIndex) = stack.pop()
+
+            index = len(tagNameIds)
+
+            tagNameIds.append( self._internName(tag.tagName, self.tagNames, self._tagNameIds) )
+            parents.append(parentIndex)
+            firstChilds.append(-1)
+            nextSiblings.append(-1)
+            lastChilds.append(-1)
+            selfClosings.append( 1 if tag.isSelfClosing else 0 )
+
+            if parentIndex == -1:
+                depths.append(0)
+            else:
+                depths.append(depths[parentIndex] + 1)
+
+                prevSibling = lastChilds[parentIndex]
+                if prevSibling == -1:
+                    firstChilds[parentIndex] = index
+                else:
+                    nextSiblings[prevSibling] = index
+                lastChilds[parentIndex] = index
+
+            attrStarts.append(len(attrNameIds))
+            for (attrName, attrValue) in tag._getAttributesForRead().items():
+                if attrValue is None:
+                    attrValue = ''
+                else:
+                    attrValue = tostr(attrValue)
+
+                attrNameIds.append( self._internName(attrName, self.attrNames, self._attrNameIds) )
+                attrNodes.append(index)
+                attrValueStarts.append(attrValueLength)
+                attrValues.append(attrValue)
+                attrValueLength += len(attrValue)
+
+            blockStarts.append(len(blocks))
+            children = []
+            tagBlocks = tag.blocks
+            for i in range(len(tagBlocks)):
+                block = tagBlocks[i]
+                if issubclass(block.__class__, AdvancedTag):
+                    blocks.append(BLOCK_CHILD)
+                    children.append(block)
+                elif i != 0 or block:
+                    # The initial, empty-string block every tag has is not stored
+                    blocks.append(len(textStarts))
+                    textStarts.append(textLength)
+                    texts.append(block)
+                    textLength += len(block)
+
+            for child in reversed(children):
+                stack.append( (child, index) )
+
+        numNodes = len(tagNameIds)
+
+        attrStarts.append(len(attrNameIds))
+        attrValueStarts.append(attrValueLength)
+        blockStarts.append(len(blocks))
+        textStarts.append(textLength)
+
+        self.attrValueData = ''.join(attrValues)
+        self.textData = ''.join(texts)
+
+        # Post-order number is pre-order number + (number of descendants) - depth
+        numDescendants = array('i', [0]) * numNodes
+        for index in range(numNodes - 1, 0, -1):
+            numDescendants[parents[index]] += numDescendants[index] + 1
+
+        self.postOrders = array('i', [ index + numDescendants[index] - depths[index] for index in range(numNodes) ])
+
+    @staticmethod
+    def _internName(name, names, nameIds):
+        '''
+            _internName - Get the index of #name in #names, adding it if not present
+
+                @return <int>
+        '''
+        nameId = nameIds.get(name, None)
+        if nameId is None:
+            nameId = nameIds[name] = len(names)
+            names.append(name)
+
+        return nameId
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_views']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        self._views = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        '''
+            __len__ - The number of nodes
+        '''
+        return len(self.tagNameIds)
+
+    #########################################################
+    #####        Node access, by index                #######
+    #########################################################
+
+    def getTagName(self, index):
+        '''
+            getTagName - Get the tag name of node #index
+
+                @return <str>
+        '''
+        return self.tagNames[ self.tagNameIds[index] ]
+
+    def getParentIndex(self, index):
+        '''
+            getParentIndex - Get the index of the parent of node #index
+
+                @return <int> - The parent index, or -1 for the root
+        '''
+        return self.parents[index]
+
+    def getChildIndexes(self, index):
+        '''
+            getChildIndexes - Get the indexes of the child tags of node #index
+
+                @return list<int>
+        '''
+        ret = []
+
+        nextSiblings = self.nextSiblings
+
+        childIndex = self.firstChilds[index]
+        while childIndex != -1:
+            ret.append(childIndex)
+            childIndex = nextSiblings[childIndex]
+
+        return ret
+
+    def getDepth(self, index):
+        '''
+            getDepth - Get the depth of node #index, where the root is 0
+
+                @return <int>
+        '''
+        return self.depths[index]
+
+    def getLastDescendantIndex(self, index):
+        '''
+            getLastDescendantIndex - Get the index of the last node within node #index.
+
+                The descendants of node #index are the nodes index+1 through this index, which is #index itself if there are none.
+
+                @return <int>
+        '''
+        return self.postOrders[index] + self.depths[index]
+
+    def isDescendant(self, index, ancestorIndex):
+        '''
+            isDescendant - Check if node #index is within node #ancestorIndex
+
+                @return <bool>
+        '''
+        return ancestorIndex < index and self.postOrders[index] < self.postOrders[ancestorIndex]
+
+    def _iterAttributeSlots(self, index):
+        '''
+            _iterAttributeSlots - The range of attribute slots for node #index
+        '''
+        return range(self.attrStarts[index], self.attrStarts[index + 1])
+
+    def _getAttributeValue(self, slot):
+        '''
+            _getAttributeValue - Get the value of attribute slot #slot
+        '''
+        attrValueStarts = self.attrValueStarts
+
+        return self.attrValueData[ attrValueStarts[slot] : attrValueStarts[slot + 1] ]
+
+    def getAttribute(self, index, attrName, defaultValue=None):
+        '''
+            getAttribute - Get the value of an attribute on node #index
+
+                @param attrName <lowercase str> - The attribute name
+
+                @param defaultValue - The value returned if the attribute is not present
+
+                @return <str> - The attribute value, or #defaultValue
+        '''
+        attrNameId = self._attrNameIds.get(attrName, None)
+        if attrNameId is not None:
+            attrNameIds = self.attrNameIds
+            for slot in self._iterAttributeSlots(index):
+                if attrNameIds[slot] == attrNameId:
+                    return self._getAttributeValue(slot)
+
+        return defaultValue
+
+    def getAttributesList(self, index):
+        '''
+            getAttributesList - Get all attributes of node #index
+
+                @return list< tuple<str, str> > - (name, value) pairs
+        '''
+        attrNames = self.attrNames
+        attrNameIds = self.attrNameIds
+
+        return [ (attrNames[ attrNameIds[slot] ], self._getAttributeValue(slot)) for slot in self._iterAttributeSlots(index) ]
+
+    def _iterBlocks(self, index):
+        '''
+            _iterBlocks - Iterate the blocks column of node #index
+        '''
+        blocks = self.blocks
+        for i in range(self.blockStarts[index], self.blockStarts[index + 1]):
+            yield blocks[i]
+
+    def getTextBlock(self, textIndex):
+        '''
+            getTextBlock - Get a text block from the shared text
+
+                @param textIndex <int> - The index of the text block
+
+                @return <str>
+        '''
+        textStarts = self.textStarts
+
+        return self.textData[ textStarts[textIndex] : textStarts[textIndex + 1] ]
+
+    def getText(self, index):
+        '''
+            getText - Get the text directly within node #index (not within child tags), as AdvancedTag.text
+
+                @return <str>
+        '''
+        getTextBlock = self.getTextBlock
+
+        return ''.join([ getTextBlock(block) for block in self._iterBlocks(index) if block != BLOCK_CHILD ])
+
+    #########################################################
+    #####        Views                                #######
+    #########################################################
+
+    def getTag(self, index):
+        '''
+            getTag - Get an AdvancedTag view of node #index.
+
+                The same view is returned while it is in use. Its parent, children, and text are created when first used.
+
+                @return <FrozenTag>
+        '''
+        view = self._views.get(index, None)
+        if view is None:
+            view = FrozenTag(self.getTagName(index), self.getAttributesList(index), bool(self.selfClosings[index]), None, self, index)
+            self._views[index] = view
+
+        return view
+
+    def getTags(self, indexes):
+        '''
+            getTags - Get AdvancedTag views of several nodes
+
+                @param indexes list<int> - The node indexes
+
+                @return TagCollection<FrozenTag>
+        '''
+        getTag = self.getTag
+
+        return TagCollection([ getTag(index) for index in indexes ])
+
+    def getRoot(self):
+        '''
+            getRoot - Get a view of the root node.
+
+                NOTE: If there are multiple roots, this will be a special tag. @see getRootNodes
+
+                @return <FrozenTag>
+        '''
+        return self.getTag(0)
+
+    def getRootNodes(self):
+        '''
+            getRootNodes - Get views of all the nodes at the root level
+
+                @return list<FrozenTag>
+        '''
+        if self.getTagName(0) == INVISIBLE_ROOT_TAG:
+            return list(self.getTags(self.getChildIndexes(0)))
+
+        return [self.getTag(0)]
+
+    def getHTML(self):
+        '''
+            getHTML - Get the full HTML of this document, as AdvancedHTMLParser.getHTML
+
+                NOTE: This creates a view of every node.
+
+                @return <str>
+        '''
+        if self.doctype:
+            doctypeStr = '<!%s>\n' %(self.doctype)
+        else:
+            doctypeStr = ''
+
+        rootNode = self.getRoot()
+        if rootNode.tagName == INVISIBLE_ROOT_TAG:
+            return doctypeStr + rootNode.innerHTML
+        else:
+            return doctypeStr + rootNode.outerHTML
+
+    #########################################################
+    #####        Searching                            #######
+    #########################################################
+
+    def _getSearchRange(self, root):
+        '''
+            _getSearchRange - Get the range of node indexes to search.
+
+                @param root <None/int> - None to search the whole document, otherwise search within node #root (not including it)
+
+                @return range
+        '''
+        if root is None:
+            return range(0, len(self.tagNameIds))
+
+        return range(root + 1, self.getLastDescendantIndex(root) + 1)
+
+    def _getAttributeSlots(self, attrName, root):
+        '''
+            _getAttributeSlots - Get the attribute slots named #attrName on nodes within the search range
+
+                @return list<int>
+        '''
+        attrNameId = self._attrNameIds.get(attrName, None)
+        if attrNameId is None:
+            return []
+
+        searchRange = self._getSearchRange(root)
+        if not searchRange:
+            return []
+
+        attrNameIds = self.attrNameIds
+        attrStarts = self.attrStarts
+
+        return [ slot for slot in range(attrStarts[searchRange[0]], attrStarts[searchRange[-1] + 1]) if attrNameIds[slot] == attrNameId ]
+
+    def getElementIndexesByTagName(self, tagName, root=None):
+        '''
+            getElementIndexesByTagName - Get the indexes of all nodes with a given tag name
+
+                @param tagName <lowercase str> - The tag name
+
+                @param root <None/int> Default None - If None, search the whole document. Otherwise, search within node #root.
+
+                @return list<int>
+        '''
+        tagNameId = self._tagNameIds.get(tagName, None)
+        if tagNameId is None:
+            return []
+
+        tagNameIds = self.tagNameIds
+
+        return [ index for index in self._getSearchRange(root) if tagNameIds[index] == tagNameId ]
+
+    def getElementIndexesByAttr(self, attrName, attrValue, root=None):
+        '''
+            getElementIndexesByAttr - Get the indexes of all nodes with a given attribute value
+
+                @param attrName <lowercase str> - The attribute name
+
+                @param attrValue <str> - The value
+
+                @param root <None/int> Default None - If None, search the whole document. Otherwise, search within node #root.
+
+                @return list<int>
+        '''
+        attrNodes = self.attrNodes
+        attrValueStarts = self.attrValueStarts
+        attrValueData = self.attrValueData
+
+        valueLength = len(attrValue)
+
+        ret = []
+        for slot in self._getAttributeSlots(attrName, root):
+            valueStart = attrValueStarts[slot]
+            if attrValueStarts[slot + 1] - valueStart == valueLength and attrValueData[valueStart : valueStart + valueLength] == attrValue:
+                ret.append(attrNodes[slot])
+
+        return ret
+
+    def getElementIndexesByClassName(self, className, root=None):
+        '''
+            getElementIndexesByClassName - Get the indexes of all nodes with all of the given class names
+
+                @param className <str> - One or more space-separated class names
+
+                @param root <None/int> Default None - If None, search the whole document. Otherwise, search within node #root.
+
+                @return list<int>
+        '''
+        classNames = className.split()
+        if not classNames:
+            return []
+
+        attrNodes = self.attrNodes
+        getAttributeValue = self._getAttributeValue
+
+        ret = []
+        for slot in self._getAttributeSlots('class', root):
+            attrValue = getAttributeValue(slot)
+            if classNames[0] not in attrValue:
+                continue
+
+            nodeClassNames = attrValue.split()
+            for matchClassName in classNames:
+                if matchClassName not in nodeClassNames:
+                    break
+            else:
+                ret.append(attrNodes[slot])
+
+        return ret
+
+    def getElementsByTagName(self, tagName, root=None):
+        '''
+            getElementsByTagName - Get views of all nodes with a given tag name
+
+                @see getElementIndexesByTagName
+
+                @return TagCollection<FrozenTag>
+        '''
+        return self.getTags( self.getElementIndexesByTagName(tagName, root) )
+
+    def getElementsByAttr(self, attrName, attrValue, root=None):
+        '''
+            getElementsByAttr - Get views of all nodes with a given attribute value
+
+                @see getElementIndexesByAttr
+
+                @return TagCollection<FrozenTag>
+        '''
+        return self.getTags( self.getElementIndexesByAttr(attrName, attrValue, root) )
+
+    def getElementsByName(self, name, root=None):
+        '''
+            getElementsByName - Get views of all nodes with a given name
+
+                @return TagCollection<FrozenTag>
+        '''
+        return self.getElementsByAttr('name', name, root)
+
+    def getElementsByClassName(self, className, root=None):
+        '''
+            getElementsByClassName - Get views of all nodes with all of the given class names
+
+                @see getElementIndexesByClassName
+
+                @return TagCollection<FrozenTag>
+        '''
+        return self.getTags( self.getElementIndexesByClassName(className, root) )
+
+    def getElementById(self, _id, root=None):
+        '''
+            getElementById - Get a view of the first node with a given id
+
+                @param _id <str> - The id
+
+                @param root <None/int> Default None - If None, search the whole document. Otherwise, search within node #root.
+
+                @return <FrozenTag/None>
+        '''
+        indexes = self.getElementIndexesByAttr('id', _id, root)
+        if not indexes:
+            return None
+
+        return self.getTag(indexes[0])
+
+# vim: set ts=4 sw=4 st=4 expandtab :
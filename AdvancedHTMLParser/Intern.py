@@ -0,0 +1,197 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    Intern - Sharing of the repeated names and values found while parsing
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+from sys import getsizeof
+
+__all__ = ('InternTable', 'DEFAULT_INTERN_MAX_SIZE', 'DEFAULT_INTERN_VALUE_MAX_LENGTH')
+
+
+# DEFAULT_INTERN_MAX_SIZE - Default maximum number of distinct strings (and class name lists) held by an InternTable
+DEFAULT_INTERN_MAX_SIZE = 65536
+
+# DEFAULT_INTERN_VALUE_MAX_LENGTH - Default maximum length of an attribute value to intern
+DEFAULT_INTERN_VALUE_MAX_LENGTH = 64
+
+
+class InternTable(object):
+    '''
+        InternTable - A bounded table of strings, so that each tag name, attribute name, short attribute value,
+            and list of class names found while parsing is held once, and shared by every tag which uses it.
+
+            Used by AdvancedHTMLParser (see the "internTable" argument). One table may be shared by several parsers.
+
+            Once #maxSize entries are held, new strings are no longer added (those already held are still shared).
+    '''
+
+    def __init__(self, maxSize=DEFAULT_INTERN_MAX_SIZE, maxValueLength=DEFAULT_INTERN_VALUE_MAX_LENGTH):
+        '''
+            __init__ - Create an InternTable
+
+                @param maxSize <int> Default DEFAULT_INTERN_MAX_SIZE - The maximum number of entries held
+
+                @param maxValueLength <int> Default DEFAULT_INTERN_VALUE_MAX_LENGTH - Attribute values longer than this are not interned.
+                    0 to only intern names.
+        '''
+        self.maxSize = maxSize
+        self.maxValueLength = maxValueLength
+
+        self.clear()
+
+    def clear(self):
+        '''
+            clear - Remove all entries, and reset the stats
+        '''
+        self._strings = {}
+        self._classNames = {}
+
+        self.lookups = 0
+        self.hits = 0
+        self.bytesSaved = 0
+
+    def __len__(self):
+        return len(self._strings) + len(self._classNames)
+
+    def intern(self, value):
+        '''
+            intern - Get the shared copy of a string
+
+                @param value <str> - The string
+
+                @return <str> - An equal string, shared by everything interned from this table
+        '''
+        self.lookups += 1
+
+        ret = self._strings.get(value, None)
+        if ret is not None:
+            self.hits += 1
+            self.bytesSaved += getsizeof(value)
+            return ret
+
+        if len(self._strings) + len(self._classNames) < self.maxSize:
+            self._strings[value] = value
+
+        return value
+
+    def internName(self, name):
+        '''
+            internName - Get the shared, lowercase, copy of a tag or attribute name
+
+                @param name <str> - The name
+
+                @return <str> - The lowercase name
+        '''
+        if not name.islower():
+            name = name.lower()
+
+        return self.intern(name)
+
+    def internAttributes(self, attributeList):
+        '''
+            internAttributes - Intern the names, and short values, of a list of attributes
+
+                @param attributeList list< tuple<str, str/None> > - The attributes, as given by the tokenizer
+
+                @return list< tuple<str, str/None> > - The attributes, with lowercase names
+        '''
+        # This is called for every tag with attributes while parsing, so #intern is inlined here
+        strings = self._strings
+        maxValueLength = self.maxValueLength
+        canAdd = bool( len(strings) + len(self._classNames) < self.maxSize )
+
+        numValues = 0
+        hits = 0
+        bytesSaved = 0
+
+        ret = []
+        for (attrName, attrValue) in attributeList:
+            if not attrName.islower():
+                attrName = attrName.lower()
+
+            sharedName = strings.get(attrName, None)
+            if sharedName is not None:
+                hits += 1
+                bytesSaved += getsizeof(attrName)
+                attrName = sharedName
+            elif canAdd is True:
+                strings[attrName] = attrName
+
+            if attrValue is not None and len(attrValue) <= maxValueLength:
+                numValues += 1
+
+                sharedValue = strings.get(attrValue, None)
+                if sharedValue is not None:
+                    hits += 1
+                    bytesSaved += getsizeof(attrValue)
+                    attrValue = sharedValue
+                elif canAdd is True:
+                    strings[attrValue] = attrValue
+
+            ret.append( (attrName, attrValue) )
+
+        self.lookups += len(ret) + numValues
+        self.hits += hits
+        self.bytesSaved += bytesSaved
+
+        return ret
+
+    def internClassNames(self, className):
+        '''
+            internClassNames - Get the shared class names for a "class" attribute value
+
+                @param className <str> - The value of the "class" attribute, stripped to single spaces
+
+                @return tuple<str> - The class names
+        '''
+        self.lookups += 1
+
+        ret = self._classNames.get(className, None)
+        if ret is not None:
+            self.hits += 1
+            # A list of the class names would otherwise be held by the tag
+            self.bytesSaved += getsizeof(list(ret)) + sum([ getsizeof(x) for x in ret ])
+            return ret
+
+        ret = tuple([ self.intern(x) for x in className.split(' ') if x ])
+
+        if len(self._strings) + len(self._classNames) < self.maxSize:
+            self._classNames[className] = ret
+
+        return ret
+
+    def getStats(self):
+        '''
+            getStats - Get statistics on the use of this table
+
+                @return dict - With keys:
+
+                    size - Number of entries held
+
+                    lookups - Number of times a string (or class names) was interned
+
+                    hits - Number of those which were already held, and so shared
+
+                    hitRate - hits / lookups, 0.0 if none
+
+                    bytesSaved - Approximate number of bytes saved by sharing (the size of the copies which would otherwise be held)
+        '''
+        lookups = self.lookups
+
+        return {
+            'size' : len(self),
+            'lookups' : lookups,
+            'hits' : self.hits,
+            'hitRate' : (float(self.hits) / lookups) if lookups else 0.0,
+            'bytesSaved' : self.bytesSaved,
+        }
+
+    def __repr__(self):
+        return '%s(maxSize=%d, maxValueLength=%d)' %(self.__class__.__name__, self.maxSize, self.maxValueLength)
+
+# vim: set ts=4 sw=4 st=4 expandtab :
@@ -0,0 +1,159 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    KeepFilter - Decides which elements are kept when parsing with a keep filter
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+import re
+
+from .compat import STRING_TYPES
+
+__all__ = ('KeepFilter', )
+
+
+# SIMPLE_SELECTOR_RE - Matches one simple selector, e.x. div.product#main[data-x="1"]
+SIMPLE_SELECTOR_RE = re.compile(r'''^(?P<tagName>[a-zA-Z][-a-zA-Z0-9:_]*|\*)?(?P<rest>(?:[#.][-a-zA-Z0-9_:]+|\[[^\]]+\])*)$''')
+
+# SELECTOR_PART_RE - Splits the "rest" of a simple selector into its #id, .class, and [attr] parts
+SELECTOR_PART_RE = re.compile(r'''([#.])([-a-zA-Z0-9_:]+)|\[\s*([-a-zA-Z0-9_:.]+)\s*(?:(=)\s*(?:"([^"]*)"|'([^']*)'|([^\]\s]*))\s*)?\]''')
+
+
+class KeepFilter(object):
+    '''
+        KeepFilter - Decides which elements (along with everything within them) are kept
+            when parsing with the "keepFilter" argument of AdvancedHTMLParser.
+
+            The filter may be:
+
+                * A simple selector string, e.x. "div", "div.product", "#main", "a[href]", "input[type=checkbox]", "*[data-id]".
+                    Any number of #id, .class, and [attr] or [attr=value] parts may follow an optional tag name.
+                    Several selectors may be separated by commas, and an element is kept if any of them match.
+
+                * A function, which is passed the lowercase tag name and a dict of attributes (lowercase name -> value),
+                    and returns True if the element should be kept.
+
+                * A list of either of the above, where an element is kept if any of them match.
+    '''
+
+    def __init__(self, keepFilter):
+        '''
+            __init__ - Create a KeepFilter
+
+                @param keepFilter <str/function/list/KeepFilter> - The selector(s) and/or function(s), see class docstring
+
+                @raises ValueError - If a selector cannot be parsed
+        '''
+        if isinstance(keepFilter, KeepFilter):
+            self.selectors = list(keepFilter.selectors)
+            self.functions = list(keepFilter.functions)
+            return
+
+        if not isinstance(keepFilter, (list, tuple)):
+            keepFilter = [keepFilter]
+
+        # selectors - list of (tagName or None, [ (attrName, attrValue or None) ], [ classNames ])
+        self.selectors = []
+        # functions - list of functions( tagName, attributesDict ) -> bool
+        self.functions = []
+
+        for item in keepFilter:
+            if isinstance(item, STRING_TYPES):
+                for selectorStr in item.split(','):
+                    self.selectors.append( self._parseSelector(selectorStr) )
+            elif callable(item):
+                self.functions.append(item)
+            else:
+                raise ValueError('Unknown keep filter: %s. Expected a selector string or a function.' %(repr(item), ))
+
+    @staticmethod
+    def _parseSelector(selectorStr):
+        '''
+            _parseSelector - Parse a single simple selector
+
+                @param selectorStr <str> - The selector, e.x. "div.product"
+
+                @return tuple( tagName <str/None>, attributes list< tuple<str, str/None> >, classNames list<str> )
+        '''
+        selectorStr = selectorStr.strip()
+
+        matchObj = SIMPLE_SELECTOR_RE.match(selectorStr)
+        if not selectorStr or matchObj is None:
+            raise ValueError('Cannot parse keep filter selector: %s. Only simple selectors (tag name followed by #id, .class, and [attr=value] parts) are supported.' %(repr(selectorStr), ))
+
+        tagName = matchObj.group('tagName')
+        if tagName == '*':
+            tagName = None
+        elif tagName:
+            tagName = tagName.lower()
+
+        attributes = []
+        classNames = []
+
+        for (prefix, name, attrName, hasValue, doubleQuotedValue, singleQuotedValue, plainValue) in SELECTOR_PART_RE.findall(matchObj.group('rest')):
+            if prefix == '#':
+                attributes.append( ('id', name) )
+            elif prefix == '.':
+                classNames.append(name)
+            else:
+                if hasValue:
+                    attrValue = doubleQuotedValue or singleQuotedValue or plainValue
+                else:
+                    attrValue = None
+
+                attributes.append( (attrName.lower(), attrValue) )
+
+        return (tagName, attributes, classNames)
+
+    def matches(self, tagName, attributeList):
+        '''
+            matches - Check if an element should be kept
+
+                @param tagName <str> - The lowercase tag name
+
+                @param attributeList list< tuple<str, str/None> > - The attributes, as given by the tokenizer
+
+                @return <bool> - True if the element should be kept
+        '''
+        attributesDict = None
+
+        for (selectorTagName, selectorAttributes, selectorClassNames) in self.selectors:
+            if selectorTagName is not None and selectorTagName != tagName:
+                continue
+
+            if attributesDict is None:
+                attributesDict = dict( (attrName.lower(), attrValue) for (attrName, attrValue) in attributeList )
+
+            isMatch = True
+            for (attrName, attrValue) in selectorAttributes:
+                if attrName not in attributesDict or ( attrValue is not None and attributesDict[attrName] != attrValue ):
+                    isMatch = False
+                    break
+
+            if isMatch and selectorClassNames:
+                classNames = (attributesDict.get('class') or '').split()
+                for className in selectorClassNames:
+                    if className not in classNames:
+                        isMatch = False
+                        break
+
+            if isMatch:
+                return True
+
+        if self.functions:
+            if attributesDict is None:
+                attributesDict = dict( (attrName.lower(), attrValue) for (attrName, attrValue) in attributeList )
+
+            for function in self.functions:
+                if function(tagName, attributesDict):
+                    return True
+
+        return False
+
+    def __repr__(self):
+        return '%s(%s)' %(self.__class__.__name__, repr(self.selectors + self.functions))
+
+# vim: set ts=4 sw=4 st=4 expandtab :
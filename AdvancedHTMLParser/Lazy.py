@@ -0,0 +1,379 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    Lazy - A parser which only creates AdvancedTag objects for the parts of the document which are used
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+from .constants import TAG_ITEM_BINARY_ATTRIBUTES
+from .Parser import AdvancedHTMLParser
+from .Tags import AdvancedTag, TagCollection
+
+__all__ = ('LazyAdvancedHTMLParser', 'LazyAdvancedTag')
+
+
+class TagRecord(object):
+    '''
+        TagRecord - The compact record of a tag kept by LazyAdvancedHTMLParser until an AdvancedTag is needed.
+
+            Supports the appendChild / appendText calls made while parsing.
+    '''
+
+    __slots__ = ('tagName', 'attributeList', 'isSelfClosing', 'blocks')
+
+    def __init__(self, tagName, attributeList, isSelfClosing):
+        self.tagName = tagName
+        self.attributeList = attributeList
+        self.isSelfClosing = isSelfClosing
+        # blocks - The text (str) and child tags (TagRecord) in order, as in AdvancedTag.blocks but without the leading ''
+        self.blocks = []
+
+    def appendChild(self, child):
+        self.isSelfClosing = False
+        self.blocks.append(child)
+        return child
+
+    def appendText(self, text):
+        self.isSelfClosing = False
+        self.blocks.append(text)
+
+    def hasAttribute(self, attrName, attrValue=None):
+        '''
+            hasAttribute - Check if this record has an attribute named #attrName, and if provided, with value #attrValue.
+
+                Used to find which records might match a query, the match is then confirmed against the AdvancedTag.
+        '''
+        for (name, value) in self.attributeList:
+            if name.lower() == attrName and ( attrValue is None or value == attrValue ):
+                return True
+
+        return False
+
+    def hasClassName(self, className):
+        for (name, value) in self.attributeList:
+            if name.lower() == 'class' and value and className in value:
+                return True
+
+        return False
+
+
+class _LazyBlocksMember(object):
+    '''
+        _LazyBlocksMember - Provides "blocks" and "children" on a LazyAdvancedTag
+            by creating them from the tag record on first access.
+
+            The values are held in the AdvancedTag slot of the same name, which is left unset until then.
+    '''
+
+    def __init__(self, name):
+        self.name = name
+        self.slot = AdvancedTag.__dict__[name]
+
+    def __get__(self, tag, tagClass=None):
+        if tag is None:
+            return self
+
+        try:
+            return self.slot.__get__(tag, tagClass)
+        except AttributeError:
+            tag._materializeBlocks()
+
+        return self.slot.__get__(tag, tagClass)
+
+    def __set__(self, tag, value):
+        self.slot.__set__(tag, value)
+
+    def __delete__(self, tag):
+        self.slot.__delete__(tag)
+
+
+class LazyAdvancedTag(AdvancedTag):
+    '''
+        LazyAdvancedTag - An AdvancedTag created by LazyAdvancedHTMLParser. The child tags are not created until
+            the blocks, children, or text of this tag are first used.
+
+            "text" is joined from the blocks (see AdvancedTag.text), so accessing it creates them.
+
+            If not given a record, this behaves exactly as an AdvancedTag.
+    '''
+
+    __slots__ = ('_tagRecord', )
+
+    blocks = _LazyBlocksMember('blocks')
+    children = _LazyBlocksMember('children')
+
+    def __init__(self, tagName, attrList=None, isSelfClosing=False, ownerDocument=None, tagRecord=None):
+        '''
+            __init__ - Construct
+
+                @param tagRecord <None/TagRecord> - If provided, the children and text of this tag will be created from this record when first used
+
+                @see AdvancedTag.__init__ for other params
+        '''
+        AdvancedTag.__init__(self, tagName, attrList, isSelfClosing, ownerDocument)
+
+        object.__setattr__(self, '_tagRecord', tagRecord)
+
+        if tagRecord is not None:
+            object.__delattr__(self, 'blocks')
+            object.__delattr__(self, 'children')
+            object.__setattr__(self, '_text', None)
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_tagRecord', None)
+
+        AdvancedTag.__setstate__(self, state)
+
+    def _isMaterialized(self):
+        '''
+            _isMaterialized - Check if the children and text of this tag have been created
+
+                @return <bool>
+        '''
+        return object.__getattribute__(self, '_tagRecord') is None
+
+    def _getTagRecord(self):
+        '''
+            _getTagRecord - Get the record this tag's children have not yet been created from, or None if they have been
+        '''
+        return object.__getattribute__(self, '_tagRecord')
+
+    def _materializeBlocks(self):
+        '''
+            _materializeBlocks - Create the children (as LazyAdvancedTag) and text of this tag from its record
+        '''
+        tagRecord = object.__getattribute__(self, '_tagRecord')
+        if tagRecord is None:
+            return
+
+        ownerDocument = object.__getattribute__(self, 'ownerDocument')
+
+        blocks = ['']
+        children = []
+
+        for block in tagRecord.blocks:
+            if block.__class__ is TagRecord:
+                child = LazyAdvancedTag(block.tagName, block.attributeList, block.isSelfClosing, ownerDocument, block)
+            elif isinstance(block, AdvancedTag):
+                # A root node which was already created, then placed under the invisible root
+                child = block
+            else:
+                blocks.append(block)
+                continue
+
+            object.__setattr__(child, 'parentNode', self)
+            blocks.append(child)
+            children.append(child)
+
+        rawSet = object.__setattr__
+        rawSet(self, 'children', children)
+        rawSet(self, 'blocks', blocks)
+        rawSet(self, '_tagRecord', None)
+
+
+class LazyAdvancedHTMLParser(AdvancedHTMLParser):
+    '''
+        LazyAdvancedHTMLParser - An AdvancedHTMLParser which records a compact skeleton of the document while parsing,
+            and only creates AdvancedTag objects as they are reached (through navigation, getElement* methods, xpath, etc).
+
+            For read-mostly work which only touches a small part of each document, this greatly reduces parse time and memory.
+
+            The document is available once parsing completes (after parseStr / parseFile, or #close if using #feedChunk).
+              Anything which visits every node (e.x. getHTML, getAllNodes, getElementsCustomFilter) will create every tag.
+    '''
+
+    # Tags are not created while parsing, so neither are the summaries of the names within them
+    _buildsSubtreeSummaries = False
+
+    def _createTag(self, tagName, attributeList=None, isSelfClosing=False):
+        '''
+            _createTag - Create a record of a tag found while parsing
+
+                @return <TagRecord>
+        '''
+        return TagRecord(tagName, attributeList or [], isSelfClosing)
+
+    def _finishLazyRoot(self):
+        '''
+            _finishLazyRoot - Create the root tag from its record, after parsing
+        '''
+        root = self.root
+        if root.__class__ is TagRecord:
+            self.root = LazyAdvancedTag(root.tagName, root.attributeList, root.isSelfClosing, self, root)
+
+    def feed(self, contents):
+        AdvancedHTMLParser.feed(self, contents)
+        self._finishLazyRoot()
+
+    def close(self):
+        AdvancedHTMLParser.close(self)
+        self._finishLazyRoot()
+
+    def iterparse(self, *args, **kwargs):
+        '''
+            iterparse - Not available on LazyAdvancedHTMLParser. The events of iterparse are of tags as they are parsed,
+                but this parser does not create tags while parsing. Use AdvancedHTMLParser.iterparse instead.
+
+                @raises TypeError
+        '''
+        raise TypeError('iterparse is not available on LazyAdvancedHTMLParser, as tags are not created while parsing. Use AdvancedHTMLParser.iterparse instead.')
+
+    def _getElementsLazily(self, recordMayMatch, tagMatches, root, firstOnly=False):
+        '''
+            _getElementsLazily - Find elements under #root for which #tagMatches returns True.
+
+                Within parts of the tree which have not yet been created, only the tags along the path to a record
+                  for which #recordMayMatch returns True are created.
+
+                @param recordMayMatch <function>(TagRecord) - Returns True if the record may match.
+                    Must be True for any record that would match as a tag.
+
+                @param tagMatches <function>(AdvancedTag) - Returns True if the tag matches
+
+                @param root <AdvancedTag> - Search the children of this node
+
+                @param firstOnly <bool> Default False - If True, stop after the first match
+
+                @return list<AdvancedTag> - The matched elements, in document order
+        '''
+        elements = []
+
+        # subtreeMayMatchCache - Map of id(TagRecord) -> bool if any record below may match
+        subtreeMayMatchCache = {}
+
+        def _recordSubtreeMayMatch(tagRecord):
+            recordId = id(tagRecord)
+            if recordId in subtreeMayMatchCache:
+                return subtreeMayMatchCache[recordId]
+
+            ret = False
+            for block in tagRecord.blocks:
+                if block.__class__ is TagRecord:
+                    if recordMayMatch(block) or _recordSubtreeMayMatch(block):
+                        ret = True
+                        break
+                elif isinstance(block, AdvancedTag):
+                    # Created tags are searched directly
+                    ret = True
+                    break
+
+            subtreeMayMatchCache[recordId] = ret
+            return ret
+
+        def _search(node):
+            if isinstance(node, LazyAdvancedTag):
+                tagRecord = node._getTagRecord()
+                if tagRecord is not None and not _recordSubtreeMayMatch(tagRecord):
+                    return False
+
+            for child in node.children:
+                if tagMatches(child):
+                    elements.append(child)
+                    if firstOnly is True:
+                        return True
+
+                if _search(child) is True:
+                    return True
+
+            return False
+
+        _search(root)
+
+        return elements
+
+    def getElementsByTagName(self, tagName, root='root'):
+        '''
+            getElementsByTagName - Searches and returns all elements with a specific tag name.
+
+                @see AdvancedHTMLParser.getElementsByTagName
+        '''
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        elements = []
+        if isFromRoot is True and root.tagName == tagName:
+            elements.append(root)
+
+        elements += self._getElementsLazily( lambda tagRecord : tagRecord.tagName == tagName, lambda tag : tag.tagName == tagName, root )
+
+        return TagCollection(elements)
+
+    def getElementsByName(self, name, root='root'):
+        '''
+            getElementsByName - Searches and returns all elements with a specific name.
+
+                @see AdvancedHTMLParser.getElementsByName
+        '''
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        elements = []
+        if isFromRoot is True and root.name == name:
+            elements.append(root)
+
+        elements += self._getElementsLazily( lambda tagRecord : tagRecord.hasAttribute('name', name), lambda tag : tag.getAttribute('name') == name, root )
+
+        return TagCollection(elements)
+
+    def getElementById(self, _id, root='root'):
+        '''
+            getElementById - Searches and returns the first (should only be one) element with the given ID.
+
+                @see AdvancedHTMLParser.getElementById
+        '''
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        if isFromRoot is True and root.id == _id:
+            return root
+
+        elements = self._getElementsLazily( lambda tagRecord : tagRecord.hasAttribute('id', _id), lambda tag : tag.getAttribute('id') == _id, root, firstOnly=True )
+        if elements:
+            return elements[0]
+
+        return None
+
+    def getElementsByClassName(self, className, root='root'):
+        '''
+            getElementsByClassName - Searches and returns all elements containing a given class name.
+
+                @see AdvancedHTMLParser.getElementsByClassName
+        '''
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        classNames = [x.strip() for x in className.strip().split(' ') if x.strip()]
+
+        firstClassName = classNames.pop(0)
+
+        elements = []
+        if isFromRoot is True and firstClassName in root.classNames:
+            elements.append(root)
+
+        elements += self._getElementsLazily( lambda tagRecord : tagRecord.hasClassName(firstClassName), lambda tag : firstClassName in tag.classNames, root )
+
+        if len(classNames) > 0:
+            elements = [ em for em in elements for matchClassName in classNames  if matchClassName in em.classList ]
+
+        return TagCollection(elements)
+
+    def getElementsByAttr(self, attrName, attrValue, root='root'):
+        '''
+            getElementsByAttr - Searches the full tree for elements with a given attribute name and value combination.
+
+                @see AdvancedHTMLParser.getElementsByAttr
+        '''
+        if attrValue is None or attrName in TAG_ITEM_BINARY_ATTRIBUTES:
+            # These may match tags without the attribute
+            return AdvancedHTMLParser.getElementsByAttr(self, attrName, attrValue, root)
+
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        elements = []
+        if isFromRoot is True and root.getAttribute(attrName) == attrValue:
+            elements.append(root)
+
+        elements += self._getElementsLazily( lambda tagRecord : tagRecord.hasAttribute(attrName), lambda tag : tag.getAttribute(attrName) == attrValue, root )
+
+        return TagCollection(elements)
+
+# vim: set ts=4 sw=4 st=4 expandtab :
@@ -9,9 +9,13 @@
 
 # In general below, all "tag names" (body, div, etc) should be lowercase. The parser will lowercase internally. All attribute names (like `id` in id="123") provided to search functions should be lowercase. Values are not lowercase. This is because doing tons of searches, lowercasing every search can quickly build up. Lowercase it once in your code, not every time you call a function.
 
+import functools
+import itertools
+import mmap
+import os
+import pickle
 import re
 #import sys
-import uuid
 
 # Python 2/3 compatibility:
 try:
@@ -28,13 +32,17 @@ except NameError:
 
 from collections import defaultdict
 
-from .constants import IMPLICIT_SELF_CLOSING_TAGS, INVISIBLE_ROOT_TAG, INVISIBLE_ROOT_TAG_START, INVISIBLE_ROOT_TAG_END
+from .constants import IMPLICIT_SELF_CLOSING_TAGS, INVISIBLE_ROOT_TAG, TAG_ITEM_BINARY_ATTRIBUTES
 from .exceptions import MultipleRootNodeException
-from .Tags import AdvancedTag, TagCollection, canFilterTags, FilterableTagCollection
+from .Tags import AdvancedTag, TagCollection, canFilterTags, FilterableTagCollection, UID_TYPES, _onTagChangedDocument
+from .Tokenizer import HTMLParserTokenizer
+from .KeepFilter import KeepFilter
+from .Intern import InternTable
+from .SubtreeSummary import getTagNameBit, getClassNameBit, getAttributeNameBit, getSubtreeSummary, clearSubtreeSummary
 
 import codecs
 
-from .utils import stripIEConditionals, addStartTag
+from .utils import stripIEConditionals, sniffEncoding, ENCODING_SNIFF_SIZE, getTextWords, containsWords, isstr
 
 __all__ = ('AdvancedHTMLParser', 'IndexedAdvancedHTMLParser')
 
@@ -51,14 +59,35 @@ def isInvisibleRootTag(tag):
 class AdvancedHTMLParser(HTMLParser):
     '''
         AdvancedHTMLParser - This class parses and allows searching of  documents
+
+          Each tag holds a summary of the names (tag names, class names, attribute names) of the tags within it,
+            so searches skip the tags which can not contain a match (@see SubtreeSummary). If you modify the
+            "children" or "blocks" of a tag directly, call clearSubtreeSummaries() after.
     '''
 
-    def __init__(self, filename=None, encoding='utf-8'):
+    # multipleRootSwitchCount - Number of times (process-wide) a document being parsed was found to
+    #   have multiple root nodes (or text at the root level), and was switched in-place to use the
+    #   invisible root tag. Prior to 9.1.0 each of these caused the full document to be re-parsed.
+    multipleRootSwitchCount = 0
+
+    # _buildsSubtreeSummaries - If True, the summary of the names within each tag (@see SubtreeSummary), which searches use
+    #   to skip the tags which can not contain a match, is built as each tag is closed while parsing. Otherwise when first used.
+    _buildsSubtreeSummaries = True
+
+    def __init__(self, filename=None, encoding='utf-8', tokenizer=None, keepFilter=None, internTable=True):
         '''
             __init__ - Creates an Advanced HTML parser object. For read-only parsing, consider IndexedAdvancedHTMLParser for faster searching.
 
                 @param filename <str>         - Optional filename to parse. Otherwise use parseFile or parseStr methods.
                 @param encoding <str>         - Specifies the document encoding. Default utf-8
+                @param tokenizer <None/class> - Tokenizer backend class, from the Tokenizer module. Default (None) is HTMLParserTokenizer,
+                                                  or use RegexTokenizer for faster parsing.
+                @param keepFilter <None/str/function/list/KeepFilter> - If provided, only elements matching this filter (and everything within them)
+                                                  are built while parsing, and the document holds just those elements as its root nodes.
+                                                  May be a simple selector like "div.product", or a function( tagName, attributesDict ) -> bool. @see KeepFilter
+                @param internTable <bool/InternTable> - Default True, share a single copy of each tag name, attribute name, short attribute value
+                                                  and list of class names between the tags of documents parsed by this parser, using a new InternTable.
+                                                  May be an InternTable, to share one between several parsers, or False to disable. @see getInternStats
 
         '''
         HTMLParser.__init__(self)
@@ -68,10 +97,44 @@ class AdvancedHTMLParser(HTMLParser):
         # Encoding to use for this document
         self.encoding = encoding
 
+        # The encoding the current document was decoded with. This is #encoding, unless it was detected
+        #   from the document itself (@see parseBytes)
+        self.documentEncoding = encoding
+
+        if tokenizer is None:
+            tokenizer = HTMLParserTokenizer
+        self._tokenizer = tokenizer(self)
+
+        if keepFilter is not None:
+            keepFilter = KeepFilter(keepFilter)
+        self.keepFilter = keepFilter
+
+        if internTable is True:
+            internTable = InternTable()
+        elif internTable is False:
+            internTable = None
+        self.internTable = internTable
+
+        # Tag names of the elements opened but not kept, when using a keep filter
+        self._skippedTagNames = []
+
         self._inTag = []
         self.root = None
         self.doctype = None
 
+        # Whitespace found at the root level before and after the root node,
+        #   which is only retained if we switch to the invisible root
+        self._leadingWhitespace = []
+        self._trailingWhitespace = []
+
+        # State while running #iterparse
+        self._iterParseState = None
+
+        # State for documents fed via feedChunk
+        self._chunkDecoder = None
+        self._chunkRemainder = []
+        self._chunkHasComment = False
+
         self.reset = self._reset # Must assign after first call, otherwise members won't yet be present
 
         if filename is not None:
@@ -87,10 +150,10 @@ class AdvancedHTMLParser(HTMLParser):
 
                 @return <dict>
         '''
-        state = self.__dict__
+        state = self.__dict__.copy()
 
         # Python2 compat
-        del state['reset']
+        state.pop('reset', None)
 
         return state
 
@@ -108,11 +171,21 @@ class AdvancedHTMLParser(HTMLParser):
 
 
     def _hasTagInParentLine(self, tag, root):
-        if tag == root or tag.parentNode == root:
-            return True
-        if tag.parentNode is None:
-            return False
-        return self._hasTagInParentLine(tag.parentNode, root)
+        '''
+            _hasTagInParentLine - Check if #tag is #root, or is within #root
+
+                @param tag <AdvancedTag> - The tag
+
+                @param root <AdvancedTag> - The tag which may contain #tag
+
+                @return <bool>
+        '''
+        while tag is not None:
+            if tag is root:
+                return True
+            tag = tag.parentNode
+
+        return False
 
     def _handleRootArg(self, root):
         # Check if tag is string of root and apply to real root.
@@ -125,27 +198,126 @@ class AdvancedHTMLParser(HTMLParser):
 
     ######## Parsing #########
 
+    def _enterInvisibleRoot(self, data=''):
+        '''
+            _enterInvisibleRoot - Called during parsing when a second root node, or text at the root level, is found.
+
+                Places the invisible root tag above whatever has been parsed so far and opens it, so parsing
+                  can continue in-place (rather than resetting and parsing the whole document again)
+
+                @param data <str> Default '' - Root-level text which triggered this, if any
+        '''
+        AdvancedHTMLParser.multipleRootSwitchCount += 1
+
+        invisibleRoot = self._createTag(INVISIBLE_ROOT_TAG)
+
+        oldRoot = self.root
+        self.root = invisibleRoot
+        self._inTag.append(invisibleRoot)
+
+        # Retain the root-level whitespace as if the invisible root start tag was at the start of the document
+        leadingWhitespace = '\n' + ''.join(self._leadingWhitespace)
+        trailingWhitespace = ''.join(self._trailingWhitespace)
+        self._leadingWhitespace = []
+        self._trailingWhitespace = []
+
+        if oldRoot is None:
+            self.handle_data(leadingWhitespace + data)
+        else:
+            self.handle_data(leadingWhitespace)
+            invisibleRoot.appendChild(oldRoot)
+            self.handle_data(trailingWhitespace + data)
+
+    def _createTag(self, tagName, attributeList=None, isSelfClosing=False):
+        '''
+            _createTag - Create a tag found while parsing, associated with this document
+
+                @return <AdvancedTag>
+        '''
+        return AdvancedTag(tagName, attributeList, isSelfClosing, ownerDocument=self)
+
+    def _isInKeptTag(self):
+        '''
+            _isInKeptTag - When using a keep filter, check if parsing is within a kept element
+
+                @return <bool>
+        '''
+        inTag = self._inTag
+
+        return bool(inTag) and inTag[-1].tagName != INVISIBLE_ROOT_TAG
+
+    def _handleSkippedEndTag(self, tagName):
+        '''
+            _handleSkippedEndTag - When using a keep filter, handle an end tag which closes an element that was not kept.
+
+                As in a full parse, this also closes any kept elements which were opened within it.
+
+                @param tagName <str> - The lowercase tag name
+
+                @return <bool> - True if handled, False if the end tag should be handled as normal
+        '''
+        inTag = self._inTag
+        skippedTagNames = self._skippedTagNames
+
+        for tag in inTag:
+            if tag.tagName == tagName:
+                return False
+
+        if tagName not in skippedTagNames:
+            # Not open, so ignored
+            return True
+
+        # Close every kept element (but not the invisible root), as they are within the closed element
+        while inTag and inTag[-1].tagName != INVISIBLE_ROOT_TAG:
+            tag = inTag.pop()
+            if self._iterParseState is not None:
+                self._addIterParseEvent('end', tag)
+
+        while skippedTagNames.pop() != tagName:
+            pass
+
+        return True
+
     def handle_starttag(self, tagName, attributeList, isSelfClosing=False):
         '''
             Internal for parsing
         '''
-        tagName = tagName.lower()
+        if not tagName.islower():
+            tagName = tagName.lower()
         inTag = self._inTag
 
         if isSelfClosing is False and tagName in IMPLICIT_SELF_CLOSING_TAGS:
             isSelfClosing = True
 
-        newTag = AdvancedTag(tagName, attributeList, isSelfClosing, ownerDocument=self)
+        keepFilter = self.keepFilter
+        if keepFilter is not None and not self._isInKeptTag() and not keepFilter.matches(tagName, attributeList):
+            # Not kept, so only the name is tracked to match up the end tag
+            if isSelfClosing is False:
+                self._skippedTagNames.append(tagName)
+            return None
+
+        internTable = self.internTable
+        if internTable is not None:
+            tagName = internTable.intern(tagName)
+            if attributeList:
+                attributeList = internTable.internAttributes(attributeList)
+
+        newTag = self._createTag(tagName, attributeList, isSelfClosing)
         if self.root is None:
             self.root = newTag
-        elif len(inTag) > 0:
-            inTag[-1].appendChild(newTag)
         else:
-            raise MultipleRootNodeException()
+            if len(inTag) == 0:
+                self._enterInvisibleRoot()
+            inTag[-1].appendChild(newTag)
 
         if isSelfClosing is False:
             inTag.append(newTag)
 
+        if self._iterParseState is not None:
+            self._addIterParseEvent('start', newTag)
+            if isSelfClosing is True:
+                self._addIterParseEvent('end', newTag)
+
         return newTag
 
     def handle_startendtag(self, tagName, attributeList):
@@ -158,6 +330,9 @@ class AdvancedHTMLParser(HTMLParser):
         '''
             Internal for parsing
         '''
+        if self.keepFilter is not None and self._handleSkippedEndTag(tagName):
+            return
+
         try:
             foundIt = False
             inTag = self._inTag
@@ -168,11 +343,25 @@ class AdvancedHTMLParser(HTMLParser):
 
             if not foundIt:
                 return
+
+            if self._iterParseState is not None:
+                # Report every tag closed, including those which should have been closed but weren't
+                while inTag[-1].tagName != tagName:
+                    self._addIterParseEvent('end', inTag.pop())
+
+                self._addIterParseEvent('end', inTag.pop())
+                return
+
             # Handle closing tags which should have been closed but weren't
             while inTag[-1].tagName != tagName:
-                inTag.pop()
-
-            inTag.pop()
+                closedTag = inTag.pop()
+                if self._buildsSubtreeSummaries is True:
+                    getSubtreeSummary(closedTag)
+
+            closedTag = inTag.pop()
+            if self._buildsSubtreeSummaries is True:
+                # The tags within have been closed, so this is built from their summaries
+                getSubtreeSummary(closedTag)
         except:
             pass
 
@@ -183,47 +372,72 @@ class AdvancedHTMLParser(HTMLParser):
         '''
         if data:
             inTag = self._inTag
+            if self.keepFilter is not None and not self._isInKeptTag():
+                # Not within a kept element
+                return
             if len(inTag) > 0:
                 inTag[-1].appendText(data)
             elif data.strip(): #and not self.getRoot():
                 # Must be text prior to or after root node
-                raise MultipleRootNodeException()
+                self._enterInvisibleRoot(data)
+            elif self.root is None:
+                self._leadingWhitespace.append(data)
+            else:
+                self._trailingWhitespace.append(data)
 
     def handle_entityref(self, entity):
         '''
             Internal for parsing
         '''
+        if self.keepFilter is not None and not self._isInKeptTag():
+            return
         inTag = self._inTag
-        if len(inTag) > 0:
-            inTag[-1].appendText('&%s;' %(entity,))
-        else:
-            raise MultipleRootNodeException()
+        if len(inTag) == 0:
+            self._enterInvisibleRoot()
+        inTag[-1].appendText('&%s;' %(entity,))
 
     def handle_charref(self, charRef):
         '''
             Internal for parsing
         '''
+        if self.keepFilter is not None and not self._isInKeptTag():
+            return
         inTag = self._inTag
-        if len(inTag) > 0:
-            inTag[-1].appendText('&#%s;' %(charRef,))
-        else:
-            raise MultipleRootNodeException()
+        if len(inTag) == 0:
+            self._enterInvisibleRoot()
+        inTag[-1].appendText('&#%s;' %(charRef,))
 
     def handle_comment(self, comment):
         '''
             Internal for parsing
         '''
+        if self.keepFilter is not None and not self._isInKeptTag():
+            return
         inTag = self._inTag
-        if len(inTag) > 0:
-            inTag[-1].appendText('<!-- %s -->' %(comment,))
-        else:
-            raise MultipleRootNodeException()
+        if len(inTag) == 0:
+            self._enterInvisibleRoot()
+        inTag[-1].appendText('<!-- %s -->' %(comment,))
+
+    def _addIterParseEvent(self, event, tag):
+        '''
+            _addIterParseEvent - Queue an event for #iterparse, if it is one requested
+
+                @param event <str> - "start" or "end"
+
+                @param tag <AdvancedTag> - The tag which started or ended
+        '''
+        (pendingEvents, events, tagNames) = self._iterParseState
+
+        if event in events and (tagNames is None or tag.tagName in tagNames):
+            pendingEvents.append( (event, tag) )
 
     def handle_decl(self, decl):
         '''
             Internal for parsing
         '''
         self.doctype = decl
+        # Whitespace prior to the doctype is not retained
+        self._leadingWhitespace = []
 
     def unknown_decl(self, decl):
         '''
@@ -317,13 +531,17 @@ class AdvancedHTMLParser(HTMLParser):
         if isFromRoot is True and root.tagName == tagName:
             elements.append(root)
 
+        # Only the children with a matching tag within them are searched, @see SubtreeSummary
+        summaryBit = getTagNameBit(tagName)
+
         getElementsByTagName = self.getElementsByTagName
         for child in root.children:
 
             if child.tagName == tagName:
                 elements.append(child)
 
-            elements += getElementsByTagName(tagName, child)
+            if getSubtreeSummary(child) & summaryBit:
+                elements += getElementsByTagName(tagName, child)
 
         return TagCollection(elements)
 
@@ -341,13 +559,16 @@ class AdvancedHTMLParser(HTMLParser):
         if isFromRoot is True and root.name == name:
             elements.append(root)
 
+        summaryBit = self._getAttributeSummaryBit('name', name)
+
         getElementsByName = self.getElementsByName
         for child in root.children:
 
             if child.getAttribute('name') == name:
                 elements.append(child)
 
-            elements += getElementsByName(name, child)
+            if getSubtreeSummary(child) & summaryBit == summaryBit:
+                elements += getElementsByName(name, child)
 
         return TagCollection(elements)
 
@@ -363,15 +584,18 @@ class AdvancedHTMLParser(HTMLParser):
         if isFromRoot is True and root.id == _id:
             return root
 
+        summaryBit = self._getAttributeSummaryBit('id', _id)
+
         getElementById = self.getElementById
         for child in root.children:
 
             if child.getAttribute('id') == _id:
                 return child
 
-            potential = getElementById(_id, child)
-            if potential is not None:
-                return potential
+            if getSubtreeSummary(child) & summaryBit == summaryBit:
+                potential = getElementById(_id, child)
+                if potential is not None:
+                    return potential
 
         return None
 
@@ -396,18 +620,21 @@ class AdvancedHTMLParser(HTMLParser):
         if isFromRoot is True and className in root.classNames:
             elements.append(root)
 
+        summaryBit = getClassNameBit(className)
+
         getElementsByClassName = self.getElementsByClassName
         for child in root.children:
 
             if className in child.classNames:
                 elements.append(child)
 
-            elements += getElementsByClassName(className, child)
+            if getSubtreeSummary(child) & summaryBit:
+                elements += getElementsByClassName(className, child)
 
 
         # Check if we need to match against any other names
         if len(classNames) > 0:
-            elements = [ em for em in elements for matchClassName in classNames  if matchClassName in em.classList ]
+            elements = [ em for em in elements if all( [ matchClassName in em.classNames for matchClassName in classNames ] ) ]
 
         return TagCollection(elements)
 
@@ -426,13 +653,16 @@ class AdvancedHTMLParser(HTMLParser):
         if isFromRoot is True and root.getAttribute(attrName) == attrValue:
             elements.append(root)
 
+        summaryBit = self._getAttributeSummaryBit(attrName, attrValue)
+
         getElementsByAttr = self.getElementsByAttr
         for child in root.children:
 
             if child.getAttribute(attrName) == attrValue:
                 elements.append(child)
 
-            elements += getElementsByAttr(attrName, attrValue, child)
+            if getSubtreeSummary(child) & summaryBit == summaryBit:
+                elements += getElementsByAttr(attrName, attrValue, child)
 
         return TagCollection(elements)
 
@@ -454,6 +684,75 @@ class AdvancedHTMLParser(HTMLParser):
 
         return root.getElementsWithAttrValues(attrName, attrValues)
 
+    def getElementsWithAttr(self, attrName, root='root'):
+        '''
+            getElementsWithAttr - Returns elements which have an attribute, with any value. This is always a full scan.
+
+            @param attrName <lowercase str> - A lowercase attribute name
+            @param root <AdvancedTag/'root'> - Search starting at a specific node, if provided. if string 'root', the root of the parsed tree will be used.
+
+            @return - TagCollection of all matching elements
+        '''
+        attrName = attrName.lower()
+
+        return self._getElementsCustomFilter(lambda tag : tag.hasAttribute(attrName), root, getAttributeNameBit(attrName))
+
+    def getElementsWithAttrPrefix(self, prefix, root='root'):
+        '''
+            getElementsWithAttrPrefix - Returns elements which have an attribute with a name starting with #prefix (e.x. "data-"). This is always a full scan.
+
+            @param prefix <lowercase str> - The start of an attribute name
+            @param root <AdvancedTag/'root'> - Search starting at a specific node, if provided. if string 'root', the root of the parsed tree will be used.
+
+            @return - TagCollection of all matching elements
+        '''
+        prefix = prefix.lower()
+
+        def _hasAttrWithPrefix(tag):
+            for attrName in tag._getAttributesForRead().keys():
+                if attrName.startswith(prefix):
+                    return True
+            return False
+
+        return self.getElementsCustomFilter(_hasAttrWithPrefix, root)
+
+    def getElementsByText(self, text, root='root', textContent=False):
+        '''
+            getElementsByText - Returns elements with the words of #text (a word, or a phrase of several words in order) in their text.
+
+                Words are matched whole and case-insensitively, ignoring punctuation and whitespace. This is always a full scan.
+
+                @param text <str> - A word or phrase
+                @param root <AdvancedTag/'root'> - Search starting at a specific node, if provided. if string 'root', the root of the parsed tree will be used.
+                @param textContent <bool> Default False - If False, match only the text directly within a tag (the "text" property).
+                                                             If True, also match the tags containing those, as with the "textContent"
+                                                             property, except a phrase must be within the text of a single tag.
+
+                @return - TagCollection of all matching elements
+        '''
+        words = getTextWords(text)
+        if not words:
+            return TagCollection()
+
+        elements = self.getElementsCustomFilter(lambda tag : containsWords(getTextWords(tag.text), words), root)
+
+        if textContent is True and elements:
+            (root, isFromRoot) = self._handleRootArg(root)
+
+            # Every tag the matched tags are within (up to the root) also match
+            matchedIds = set()
+            for tag in elements:
+                while tag is not None and tag is not root and id(tag) not in matchedIds:
+                    matchedIds.add(id(tag))
+                    tag = tag.parentNode
+
+            if isFromRoot is True:
+                matchedIds.add(id(root))
+
+            elements = self.getElementsCustomFilter(lambda tag : id(tag) in matchedIds, root)
+
+        return elements
+
 
     def getElementsCustomFilter(self, filterFunc, root='root'):
         '''
@@ -480,6 +779,56 @@ class AdvancedHTMLParser(HTMLParser):
 
         return TagCollection(elements)
 
+    def _getElementsCustomFilter(self, filterFunc, root, summaryBits):
+        '''
+            _getElementsCustomFilter - Scan elements using a provided function, which only matches tags with certain names,
+                skipping the tags which do not have all of those names within them (@see SubtreeSummary)
+
+            @param filterFunc <function>(node) - @see getElementsCustomFilter
+
+            @param root <AdvancedTag/'root'> - @see getElementsCustomFilter
+
+            @param summaryBits <int> - The bits of the names (from the SubtreeSummary module) a tag must have to match
+
+            @return - TagCollection of all matching elements
+        '''
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        elements = []
+
+        if isFromRoot is True and filterFunc(root) is True:
+            elements.append(root)
+
+        # Without recursion, as this is not overridden
+        stack = [ iter(root.children) ]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+
+            if filterFunc(child) is True:
+                elements.append(child)
+
+            if getSubtreeSummary(child) & summaryBits == summaryBits:
+                stack.append( iter(child.children) )
+
+        return TagCollection(elements)
+
+    @staticmethod
+    def _getAttributeSummaryBit(attrName, attrValue):
+        '''
+            _getAttributeSummaryBit - Get the bit of the summary (@see SubtreeSummary) a tag must have within it to contain
+                a tag with the value #attrValue for the attribute #attrName
+
+                @return <int> - The bit, or 0 if a tag without the attribute may match (i.e. any tag may match)
+        '''
+        if attrValue is None or attrName in TAG_ITEM_BINARY_ATTRIBUTES:
+            # getAttribute gives these for tags without the attribute
+            return 0
+
+        return getAttributeNameBit(attrName)
+
 
 
     def getElementsByXPathExpression(self, xpathExprStr):
@@ -619,7 +968,7 @@ class AdvancedHTMLParser(HTMLParser):
         '''
             Check if #uid is found anywhere within this element tree
 
-            @param uid <uuid.UUID> - Uid
+            @param uid <int/uuid.UUID> - Uid
 
             @return <bool> - If #uid is found within this tree
         '''
@@ -630,12 +979,12 @@ class AdvancedHTMLParser(HTMLParser):
         return False
 
     def __contains__(self, other):
-        if isinstance(other, uuid.UUID):
+        if isinstance(other, UID_TYPES):
             return self.containsUid(other)
         elif issubclass(other.__class__, AdvancedTag):
             return self.contains(other)
         else:
-            raise TypeError('Invalid operand, should be either a uuid.UUID object or an AdvancedTag')
+            raise TypeError('Invalid operand, should be either a uid (int or uuid.UUID object) or an AdvancedTag')
 
 
     def filter(self, **kwargs):
@@ -708,6 +1057,7 @@ class AdvancedHTMLParser(HTMLParser):
 
                tagname    - The tag name of the element
                text       - The text within an element
+               classname  - One or more space-separated class names, all of which the element must have
 
             NOTE: Empty string means both "not set" and "no value" in this implementation.
 
@@ -722,6 +1072,45 @@ class AdvancedHTMLParser(HTMLParser):
         if not kwargs:
             return TagCollection()
 
+        return self._getElementsCustomFilter(self._getFindMatchFunction(kwargs), 'root', self._getFindSummaryBits(kwargs))
+
+    @staticmethod
+    def _getFindSummaryBits(kwargs):
+        '''
+            _getFindSummaryBits - Get the bits of the summary (@see SubtreeSummary) a tag must have to match the criteria given to #find
+
+                @param kwargs <dict> - The criteria, @see find
+
+                @return <int> - The bits of the tag name, class names and attribute names a matching tag must have
+        '''
+        summaryBits = 0
+
+        for (key, value) in kwargs.items():
+            key = key.lower()
+
+            # A list of values, or an empty value, may match tags without the name
+            if not isstr(value) or not value or key.endswith('contains'):
+                continue
+
+            if key == 'tagname':
+                summaryBits |= getTagNameBit(value)
+            elif key == 'classname':
+                for className in value.split():
+                    summaryBits |= getClassNameBit(className)
+            elif key != 'text' and key not in TAG_ITEM_BINARY_ATTRIBUTES:
+                summaryBits |= getAttributeNameBit(key)
+
+        return summaryBits
+
+    @staticmethod
+    def _getFindMatchFunction(kwargs):
+        '''
+            _getFindMatchFunction - Get the function which tests if a tag matches the criteria given to #find
+
+                @param kwargs <dict> - The criteria, @see find
+
+                @return <function>(tag) - Returns True if the tag matches all the criteria
+        '''
 
         # Because of how closures work in python, need a function to generate these lambdas
         #  because the closure basically references "current key in iteration" and not
@@ -735,6 +1124,14 @@ class AdvancedHTMLParser(HTMLParser):
         def _makeTagnameInLambda(tagNames):
             return lambda em : em.tagName in tagNames
 
+        def _makeClassNamesLambda(_value):
+            classNames = _value.split()
+            return lambda em : all( [ className in em.classNames for className in classNames ] )
+
+        def _makeClassNamesInLambda(_values):
+            classNamesLst = [ _value.split() for _value in _values ]
+            return lambda em : any( [ all( [ className in em.classNames for className in classNames ] ) for classNames in classNamesLst ] )
+
         def _makeAttributeInLambda(_key, _values):
             return lambda em : em.getAttribute(_key, '') in _values
 
@@ -808,8 +1205,8 @@ class AdvancedHTMLParser(HTMLParser):
 
             if endsIContains or endsContains:
                 key = re.sub('__[i]{0,1}contains$', '', key)
-                if key == 'tagname':
-                    raise ValueError('tagname is not supported for contains')
+                if key in ('tagname', 'classname'):
+                    raise ValueError('%s is not supported for contains' %(key, ))
 
                 if isValueList:
                     if key == 'text':
@@ -828,6 +1225,8 @@ class AdvancedHTMLParser(HTMLParser):
                 if isValueList:
                     if key == 'tagname':
                         thisFunc = _makeTagnameInLambda(value)
+                    elif key == 'classname':
+                        thisFunc = _makeClassNamesInLambda(value)
                     elif key == 'text':
                         thisFunc = _makeTextInLambda(value)
                     else:
@@ -835,6 +1234,8 @@ class AdvancedHTMLParser(HTMLParser):
                 else:
                     if key == 'tagname':
                         thisFunc = _makeTagnameLambda(value)
+                    elif key == 'classname':
+                        thisFunc = _makeClassNamesLambda(value)
                     elif key == 'text':
                         thisFunc = _makeTextLambda(value)
                     else:
@@ -853,7 +1254,7 @@ class AdvancedHTMLParser(HTMLParser):
 
             return True
 
-        return self.getElementsCustomFilter(doMatchFunc)
+        return doMatchFunc
 
 
     def getHTML(self):
@@ -936,26 +1337,127 @@ class AdvancedHTMLParser(HTMLParser):
         self.root = None
         self.doctype = None
         self._inTag = []
+        self._skippedTagNames = []
+        self._leadingWhitespace = []
+        self._trailingWhitespace = []
+        self._chunkDecoder = None
+        self._chunkRemainder = []
+        self._chunkHasComment = False
+        self.documentEncoding = self.encoding
+
+    def _startChunks(self, encoding):
+        '''
+            _startChunks - Start a new document to be fed via #feedChunk, decoding bytes with #encoding
+
+                @param encoding <str> - The encoding of the document
+        '''
+        self.reset()
+        self._chunkDecoder = codecs.getincrementaldecoder(encoding)()
+        self.documentEncoding = encoding
 
     def feed(self, contents):
         '''
             feed - Feed contents. Use  parseStr or parseFile instead.
 
+                If multiple root nodes (or text at the root level) are found, the invisible root tag
+                  will be placed at the top of the tree during the same pass.
+
             @param contents - Contents
         '''
         contents = stripIEConditionals(contents)
-        try:
-            HTMLParser.feed(self, contents)
-        except MultipleRootNodeException:
-            self.reset()
-            HTMLParser.feed(self, "%s%s" %(addStartTag(contents, INVISIBLE_ROOT_TAG_START), INVISIBLE_ROOT_TAG_END))
+        self._tokenizer.feed(contents)
+
+    def feedChunk(self, chunk):
+        '''
+            feedChunk - Feed the next chunk of a document. The DOM tree (and indexes) are built as chunks arrive,
+                so a document can be parsed while it is still being read (e.x. from a pipe or socket)
+
+                The first call starts a new document (resetting this parser). Call #close after the last chunk.
+
+                @param chunk <bytes/str> - The next chunk of the document. Bytes are decoded using the document encoding,
+                    and a multi-byte character may be split across chunks.
+        '''
+        if self._chunkDecoder is None:
+            self._startChunks(self.encoding)
+
+        if isinstance(chunk, bytes):
+            chunk = self._chunkDecoder.decode(chunk)
+
+        chunkRemainder = self._chunkRemainder
+
+        # IE conditionals are stripped a line at a time, so a line containing the start of a comment
+        #   is held back until it is complete
+        splitIdx = chunk.rfind('\n')
+        if splitIdx != -1:
+            chunkRemainder.append(chunk[:splitIdx+1])
+
+            contents = ''.join(chunkRemainder)
+            chunkRemainder = self._chunkRemainder = []
+            self._chunkHasComment = False
+
+            self._tokenizer.feed(stripIEConditionals(contents, addHtmlIfMissing=False))
+
+            chunk = chunk[splitIdx+1:]
 
-    def parseFile(self, filename):
+        if self._chunkHasComment is True:
+            chunkRemainder.append(chunk)
+            return
+
+        # Not holding a comment, so the remainder is at most a partial "<!--"
+        if chunkRemainder:
+            chunk = ''.join(chunkRemainder) + chunk
+            del chunkRemainder[:]
+
+        commentIdx = chunk.find('<!--')
+        if commentIdx != -1:
+            self._chunkHasComment = True
+            chunkRemainder.append(chunk[commentIdx:])
+            chunk = chunk[:commentIdx]
+        else:
+            for partialLen in (3, 2, 1):
+                if chunk.endswith('<!--'[:partialLen]):
+                    chunkRemainder.append(chunk[-partialLen:])
+                    chunk = chunk[:-partialLen]
+                    break
+
+        if chunk:
+            self._tokenizer.feed(chunk)
+
+    def close(self):
+        '''
+            close - Finish parsing a document fed via #feedChunk. Any remaining data is processed.
+        '''
+        chunkDecoder = self._chunkDecoder
+        if chunkDecoder is not None:
+            self._chunkRemainder.append(chunkDecoder.decode(b'', True))
+
+            contents = ''.join(self._chunkRemainder)
+
+            self._chunkDecoder = None
+            self._chunkRemainder = []
+            self._chunkHasComment = False
+
+            if contents:
+                self._tokenizer.feed(stripIEConditionals(contents, addHtmlIfMissing=False))
+
+        self._tokenizer.close()
+
+    def parseFile(self, filename, detectEncoding=False):
         '''
             parseFile - Parses a file and creates the DOM tree and indexes
 
                 @param filename <str/file> - A string to a filename or a file object. If file object, it will not be closed, you must close.
+
+                @param detectEncoding <bool> Default False - If True, detect the encoding from a byte order mark or <meta> charset, @see parseBytes.
+                    #filename must be a filename or a file object opened in binary mode.
         '''
+        if detectEncoding is True:
+            if hasattr(filename, 'read'):
+                return self.parseBytes(filename)
+
+            with open(filename, 'rb') as f:
+                return self.parseBytes(f)
+
         self.reset()
 
         if isinstance(filename, file):
@@ -966,222 +1468,1227 @@ class AdvancedHTMLParser(HTMLParser):
 
         self.feed(contents)
 
-    def parseStr(self, html):
+    def iterparse(self, source, events=('start', 'end'), tags=None, release=False, chunkSize=65536):
         '''
-            parseStr - Parses a string and creates the DOM tree and indexes.
+            iterparse - Parse a file incrementally, yielding as each tag starts and/or ends.
 
-                @param html <str> - valid HTML
-        '''
-        self.reset()
+                Each "end" event is given once the tag and all of its children have been parsed, so subtrees
+                  can be extracted while the rest of the document is still being read.
 
-        if isinstance(html, bytes):
-            self.feed(html.decode(self.encoding))
-        else:
-            self.feed(html)
+                @param source <str/file> - A filename, or a file object (binary or text). If file object, it will not be closed, you must close.
 
+                @param events tuple<str> Default ('start', 'end') - Which events to yield, any of "start" and "end"
 
-    def createElement(self, tagName):
-        '''
-            createElement - Create an unattached tag with the given tag name
+                @param tags <None/str/list<str>> Default None - If provided, a lowercase tag name (or a list of them) to limit events to.
+                    If None, events for every tag are yielded.
 
-            @param tagName <str> - Name of tag
+                @param release <bool> Default False - If True, each tag is removed from its parent once its "end" event has been handled
+                    (i.e. when the next event is requested). This allows the subtree to be freed, so memory stays flat when each matching tag is only needed once.
 
-            @return <AdvancedTag> - A tag with the given tag name
-        '''
-        return AdvancedTag(tagName=tagName.lower())
+                    As this happens per event, the children of a tag at its "end" event do not depend on #chunkSize: those which had an "end" event
+                      of their own have already been removed.
 
+                    With an IndexedAdvancedHTMLParser, a released tag (and the tags within it) is also removed from the indexes, as with AdvancedTag.remove
 
-    @classmethod
-    def createElementFromHTML(cls, html, encoding='utf-8'):
+                @param chunkSize <int> Default 65536 - Number of bytes/characters to read from #source at a time
+
+                @return generator< tuple<str, AdvancedTag> > - Yields (event, tag) pairs, e.x. ('end', <AdvancedTag>)
+
+                After iteration completes this parser holds the parsed document, less any released tags.
         '''
-            createElementFromHTML - Creates an element from a string of HTML.
+        for event in events:
+            if event not in ('start', 'end'):
+                raise ValueError('Unknown iterparse event: %s. Expected "start" or "end".' %(repr(event), ))
 
-                If this could create multiple root-level elements (children are okay),
-                  you must use #createElementsFromHTML which returns a list of elements created.
+        if tags is not None:
+            if not isinstance(tags, (list, tuple, set)):
+                tags = [tags]
+            tags = set([tagName.lower() for tagName in tags])
 
-            @param html <str> - Some html data
+        if hasattr(source, 'read'):
+            fileObj = source
+        else:
+            fileObj = open(source, 'rb')
 
-            @param encoding <str> - Encoding to use for document
+        pendingEvents = []
+        self._iterParseState = (pendingEvents, tuple(events), tags)
 
-            @raises MultipleRootNodeException - If given html would produce multiple root-level elements (use #createElementsFromHTML instead)
+        try:
+            feedChunk = self.feedChunk
 
-            @return AdvancedTag - A single AdvancedTag
+            while True:
+                chunk = fileObj.read(chunkSize)
+                if not chunk:
+                    break
 
-            NOTE: If there is text outside the tag, they will be lost in this.
-              Use createBlocksFromHTML instead if you need to retain both text and tags.
+                feedChunk(chunk)
 
-              Also, if you are just appending to an existing tag, use AdvancedTag.appendInnerHTML
-        '''
+                for event, tag in self._popIterParseEvents(release):
+                    yield (event, tag)
 
-        parser = cls(encoding=encoding)
+            self.close()
 
-        html = stripIEConditionals(html)
-        try:
-            HTMLParser.feed(parser, html)
-        except MultipleRootNodeException:
-            raise MultipleRootNodeException('Multiple nodes passed to createElementFromHTML method. Use #createElementsFromHTML instead to get a list of AdvancedTag elements.')
+            # Report any tags left open at the end of the document
+            for tag in reversed(self._inTag):
+                if not isInvisibleRootTag(tag):
+                    self._addIterParseEvent('end', tag)
 
-        rootNode = parser.getRoot()
-        rootNode.remove()
+            for event, tag in self._popIterParseEvents(release):
+                yield (event, tag)
+        finally:
+            self._iterParseState = None
 
-        return rootNode
+            if fileObj is not source:
+                fileObj.close()
 
+    def _popIterParseEvents(self, release):
+        '''
+            _popIterParseEvents - Yields and clears the pending #iterparse events.
 
-    @classmethod
-    def createElementsFromHTML(cls, html, encoding='utf-8'):
+                @param release <bool> - If True, each tag is removed from its parent after its "end" event is handled
         '''
-            createElementsFromHTML - Creates elements from provided html, and returns a list of the root-level elements
-                children of these root-level nodes are accessable via the usual means.
+        pendingEvents = self._iterParseState[0]
+        if not pendingEvents:
+            return
 
-            @param html <str> - Some html data
+        currentEvents = pendingEvents[:]
+        del pendingEvents[:]
 
-            @param encoding <str> - Encoding to use for document
+        _releaseTag = self._releaseTag
 
-            @return list<AdvancedTag> - The root (top-level) tags from parsed html.
+        for event, tag in currentEvents:
+            yield (event, tag)
 
-            NOTE: If there is text outside the tags, they will be lost in this.
-              Use createBlocksFromHTML instead if you need to retain both text and tags.
+            if release is True and event == 'end':
+                _releaseTag(tag)
 
-              Also, if you are just appending to an existing tag, use AdvancedTag.appendInnerHTML
+    @staticmethod
+    def _releaseTag(tag):
         '''
-        # TODO: If text is present outside a tag, it will be lost.
+            _releaseTag - Remove #tag from its parent, as with AdvancedTag.remove
 
-        parser = cls(encoding=encoding)
+                The tag was parsed within the current chunk, so it is searched for from the end of its parent's children and blocks,
+                  rather than from the start (which grows with the number of preceding siblings which were not released).
 
-        parser.parseStr(html)
+                @param tag <AdvancedTag> - The tag to remove
+        '''
+        parentNode = tag.parentNode
+        if parentNode is None:
+            return
 
-        rootNode = parser.getRoot()
+        for blockList in (parentNode.children, parentNode.blocks):
+            for i in range(len(blockList) - 1, -1, -1):
+                if blockList[i] is tag:
+                    del blockList[i]
+                    break
 
-        rootNode.remove() # Detatch from temp document
+        tag.parentNode = None
 
-        if isInvisibleRootTag(rootNode):
-            return rootNode.children
+        clearSubtreeSummary(parentNode)
 
-        return [rootNode]
+        oldDocument = tag.ownerDocument
 
-    @classmethod
-    def createBlocksFromHTML(cls, html, encoding='utf-8'):
+        tag.ownerDocument = None
+        for subChild in tag.getAllChildNodes():
+            subChild.ownerDocument = None
+
+        if oldDocument is not None:
+            _onTagChangedDocument(tag, oldDocument, None)
+
+    def parseMappedFile(self, filename, windowSize=1048576, detectEncoding=False):
+        '''
+            parseMappedFile - Parses a file by memory-mapping it, then decoding and feeding it to the parser #windowSize bytes at a time.
+
+                This is intended for very large files, as a full decoded copy of the file is never held in memory.
+
+                @param filename <str/file> - A string to a filename, or a file object opened in binary mode. If file object, it will not be closed, you must close.
+
+                @param windowSize <int> Default 1048576 (1MB) - Number of bytes to decode and feed at a time
+
+                @param detectEncoding <bool> Default False - If True, detect the encoding from a byte order mark or <meta> charset, @see parseBytes
+
+                @see feedChunk
+        '''
+        if hasattr(filename, 'fileno'):
+            fileObj = filename
+        else:
+            fileObj = open(filename, 'rb')
+
+        try:
+            if os.fstat(fileObj.fileno()).st_size == 0:
+                # Cannot map an empty file
+                self.reset()
+                return
+
+            mappedFile = mmap.mmap(fileObj.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                fileSize = len(mappedFile)
+                feedChunk = self.feedChunk
+
+                startOffset = 0
+                if detectEncoding is True:
+                    (encoding, startOffset) = sniffEncoding(mappedFile[:ENCODING_SNIFF_SIZE])
+                    self._startChunks(encoding or self.encoding)
+
+                for offset in range(startOffset, fileSize, windowSize):
+                    feedChunk(mappedFile[offset : offset + windowSize])
+
+                self.close()
+            finally:
+                mappedFile.close()
+        finally:
+            if fileObj is not filename:
+                fileObj.close()
+
+    def parseStr(self, html, detectEncoding=False):
+        '''
+            parseStr - Parses a string and creates the DOM tree and indexes.
+
+                @param html <str/bytes> - valid HTML. Bytes are decoded using the document encoding
+
+                @param detectEncoding <bool> Default False - If True and #html is bytes, detect the encoding from a byte order mark or <meta> charset, @see parseBytes
+        '''
+        if detectEncoding is True and isinstance(html, bytes):
+            return self.parseBytes(html)
+
+        self.reset()
+
+        if isinstance(html, bytes):
+            self.feed(html.decode(self.encoding))
+        else:
+            self.feed(html)
+
+    def parseBytes(self, data, chunkSize=65536):
+        '''
+            parseBytes - Parses an html document given as bytes (or a binary file object), detecting its encoding.
+
+                The encoding is taken from a byte order mark, or a <meta charset="..."> / <meta http-equiv="Content-Type" content="...; charset=...">
+                  declaration within the first few KB (@see utils.sniffEncoding). If neither is present, the document encoding (#encoding) is used.
+
+                The bytes are decoded once, in a single pass (incrementally for file objects), and the encoding used is recorded as #documentEncoding.
+
+                @param data <bytes/file> - The document, or a file object opened in binary mode. If file object, it will not be closed, you must close.
+
+                @param chunkSize <int> Default 65536 - For a file object, the number of bytes to read, decode, and feed at a time
+        '''
+        if not hasattr(data, 'read'):
+            (encoding, bomLength) = sniffEncoding(data[:ENCODING_SNIFF_SIZE])
+
+            self.reset()
+            if encoding is not None:
+                self.documentEncoding = encoding
+            else:
+                encoding = self.encoding
+
+            self.feed(data[bomLength:].decode(encoding))
+            return
+
+        fileObj = data
+
+        # Read until there is enough to sniff the encoding, or the end of the file
+        headChunks = []
+        headLength = 0
+        while headLength < ENCODING_SNIFF_SIZE:
+            chunk = fileObj.read(max(chunkSize, ENCODING_SNIFF_SIZE) - headLength)
+            if not chunk:
+                break
+
+            headChunks.append(chunk)
+            headLength += len(chunk)
+
+        head = b''.join(headChunks)
+
+        (encoding, bomLength) = sniffEncoding(head)
+
+        self._startChunks(encoding or self.encoding)
+
+        feedChunk = self.feedChunk
+
+        feedChunk(head[bomLength:])
+        while True:
+            chunk = fileObj.read(chunkSize)
+            if not chunk:
+                break
+
+            feedChunk(chunk)
+
+        self.close()
+
+    @classmethod
+    def parseMany(cls, sources, workers=None, extract=None, xpaths=None, encoding='utf-8', sourcesAreFilenames=False, chunkSize=None):
+        '''
+            parseMany - Parse many documents, spreading the work across a pool of processes.
+
+                Each document is parsed into a new parser of this class (so IndexedAdvancedHTMLParser.parseMany
+                  will produce indexed parsers), within a worker process.
+
+                @param sources list<str/bytes> - The html of each document, or filenames if #sourcesAreFilenames is True
+
+                @param workers <None/int> Default None - Number of processes to use. If None, the number of cpus.
+                    If 1 (or there is only one source), documents are parsed in this process.
+
+                @param extract <None/function> Default None - If provided, a function which takes the parser
+                    and returns the data to keep from that document. Must be picklable (i.e. defined at module level),
+                    and should return plain data (strings, lists, dicts, etc) so it is cheap to send back.
+
+                @param xpaths <None/list<str>> Default None - If provided, a list of XPath expressions to evaluate against each document.
+                    The value for each document will be a list, containing a list of the outerHTML of the matches for each expression.
+
+                    Only one of #extract or #xpaths may be provided. If neither are, the value for each document is the parser itself.
+
+                    NOTE: Sending back the parser itself is the heaviest form, as every tag is pickled in the worker and created again in this process.
+                      If a read-only tree is enough, pass extract=AdvancedHTMLParser.freeze to get a compact FrozenDocument for each document instead.
+
+                @param encoding <str> Default 'utf-8' - The encoding passed to each parser
+
+                @param sourcesAreFilenames <bool> Default False - If True, #sources are filenames to parse rather than html
+
+                @param chunkSize <None/int> Default None - Number of sources sent to a worker at a time. If None, chosen automatically.
+
+                @return list<Batch.ParseResult> - A result for each source, in the same order as #sources.
+                    Exceptions are captured on the result (as #error) rather than raised, so one bad document does not stop the batch.
+        '''
+        # Late-binding import
+        from .Batch import parseMany
+
+        return parseMany(cls, sources, workers=workers, extract=extract, xpaths=xpaths, encoding=encoding,
+            sourcesAreFilenames=sourcesAreFilenames, chunkSize=chunkSize)
+
+
+    def clearSubtreeSummaries(self):
+        '''
+            clearSubtreeSummaries - Clear the summary of the names within each tag of the document (@see SubtreeSummary),
+                to be built again when next used.
+
+                The summaries are kept up to date as tags are added, or given names, through AdvancedTag's methods
+                  (appendChild, insertBefore, setAttribute, addClass, etc). Call this if you modify the "children"
+                  or "blocks" of a tag directly, then search it.
+        '''
+        if self.root is None:
+            return
+
+        setRaw = object.__setattr__
+        for tag in self.root.getAllNodes():
+            setRaw(tag, '_subtreeSummary', None)
+
+    def getInternStats(self):
+        '''
+            getInternStats - Get statistics on the sharing of names and values by this parser's InternTable
+
+                @return <dict/None> - @see InternTable.getStats , or None if interning is disabled
+        '''
+        if self.internTable is None:
+            return None
+
+        return self.internTable.getStats()
+
+    def freeze(self):
+        '''
+            freeze - Create a read-only, compact copy of this document, with the nodes held in parallel arrays (columns)
+                rather than as an AdvancedTag per node. Useful for analytics over very large documents.
+
+                Changes made to this document after freezing are not reflected in the copy.
+
+                @return <Frozen.FrozenDocument>
+
+                @raises ValueError - If nothing has been parsed
+        '''
+        # Late-binding import
+        from .Frozen import FrozenDocument
+
+        return FrozenDocument(self)
+
+
+    def createElement(self, tagName):
+        '''
+            createElement - Create an unattached tag with the given tag name
+
+            @param tagName <str> - Name of tag
+
+            @return <AdvancedTag> - A tag with the given tag name
+        '''
+        return AdvancedTag(tagName=tagName.lower())
+
+
+    @classmethod
+    def createElementFromHTML(cls, html, encoding='utf-8'):
+        '''
+            createElementFromHTML - Creates an element from a string of HTML.
+
+                If this could create multiple root-level elements (children are okay),
+                  you must use #createElementsFromHTML which returns a list of elements created.
+
+            @param html <str> - Some html data
+
+            @param encoding <str> - Encoding to use for document
+
+            @raises MultipleRootNodeException - If given html would produce multiple root-level elements (use #createElementsFromHTML instead)
+
+            @return AdvancedTag - A single AdvancedTag
+
+            NOTE: If there is text outside the tag, they will be lost in this.
+              Use createBlocksFromHTML instead if you need to retain both text and tags.
+
+              Also, if you are just appending to an existing tag, use AdvancedTag.appendInnerHTML
+        '''
+
+        parser = cls(encoding=encoding)
+
+        html = stripIEConditionals(html)
+        parser._tokenizer.feed(html)
+
+        rootNode = parser.getRoot()
+        if isInvisibleRootTag(rootNode):
+            raise MultipleRootNodeException('Multiple nodes passed to createElementFromHTML method. Use #createElementsFromHTML instead to get a list of AdvancedTag elements.')
+
+        rootNode.remove()
+
+        return rootNode
+
+
+    @classmethod
+    def createElementsFromHTML(cls, html, encoding='utf-8'):
+        '''
+            createElementsFromHTML - Creates elements from provided html, and returns a list of the root-level elements
+                children of these root-level nodes are accessable via the usual means.
+
+            @param html <str> - Some html data
+
+            @param encoding <str> - Encoding to use for document
+
+            @return list<AdvancedTag> - The root (top-level) tags from parsed html.
+
+            NOTE: If there is text outside the tags, they will be lost in this.
+              Use createBlocksFromHTML instead if you need to retain both text and tags.
+
+              Also, if you are just appending to an existing tag, use AdvancedTag.appendInnerHTML
+        '''
+        # TODO: If text is present outside a tag, it will be lost.
+
+        parser = cls(encoding=encoding)
+
+        parser.parseStr(html)
+
+        rootNode = parser.getRoot()
+
+        rootNode.remove() # Detatch from temp document
+
+        if isInvisibleRootTag(rootNode):
+            return rootNode.children
+
+        return [rootNode]
+
+    @classmethod
+    def createBlocksFromHTML(cls, html, encoding='utf-8'):
         '''
             createBlocksFromHTML - Returns the root level node (unless multiple nodes), and
                 a list of "blocks" added (text and nodes).
 
-            @return list< str/AdvancedTag > - List of blocks created. May be strings (text nodes) or AdvancedTag (tags)
+            @return list< str/AdvancedTag > - List of blocks created. May be strings (text nodes) or AdvancedTag (tags)
+
+            NOTE:
+                Results may be checked by:
+
+                    issubclass(block.__class__, AdvancedTag)
+
+                If True, block is a tag, otherwise, it is a text node
+        '''
+
+        parser = cls(encoding=encoding)
+
+        parser.parseStr(html)
+
+        rootNode = parser.getRoot()
+
+        rootNode.remove()
+
+        return rootNode.blocks
+
+
+# TREE_ORDER_SPACING - The difference between consecutive numbers given to tags when an IndexedAdvancedHTMLParser numbers its tree.
+#   This leaves room to number tags added later between those already numbered.
+TREE_ORDER_SPACING = 1 << 32
+
+# TREE_ORDER_MAX_INSERT_SPACING - The largest difference between the numbers given to added tags, so that the room
+#   after them is left for tags added after them (e.x. when appending several children)
+TREE_ORDER_MAX_INSERT_SPACING = 1 << 16
+
+# PLAN_SCAN_COST - The cost of checking a tag while scanning the tags within a root, relative to the cost of checking
+#   if a tag from an index is within the root. Used by IndexedAdvancedHTMLParser to plan searches given a root.
+PLAN_SCAN_COST = 8
+
+
+class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
+    '''
+        An AdvancedHTMLParser that indexes for much much faster searching. If you are doing searching/validation, this is your bet.
+
+          The indexes are kept up to date as tags in the document are added, removed, or have their attributes changed
+            through AdvancedTag's methods (appendChild, removeChild, insertBefore, setAttribute, addClass, id/name/className, etc.)
+            Tags indexed by such a change come after those indexed while parsing in the results from an index.
+
+          If you modify the "children" or "blocks" of a tag directly, call reindex() after.
+
+          Each tag within the document is numbered (in a single pass over the tree, the first time it is needed), such that
+            the tags within a tag have numbers between the numbers given to that tag. This means checking if a tag is within
+            another (searches given a "root", AdvancedTag.contains) is two comparisons, rather than a walk up the tree.
+
+          With indexText=True, the words of the text of each tag are indexed for getElementsByText. As text arrives in many
+            blocks while parsing, and may change through appendText, removeText, etc, the tags whose text has changed are
+            only recorded, and their words are indexed at the next text search.
+
+          With lazyIndexes=True, nothing is indexed while parsing. Instead each index is built, in a single pass over the tree,
+            the first time a search uses it, and from then on is kept up to date as above. reindex() (or parsing again)
+            discards the indexes, to be built again when next used.
+
+          A search given a root either checks which tags from the index are within the root, or scans the tags within the
+            root as AdvancedHTMLParser does, whichever is estimated to be cheaper from the number of tags in the index entry
+            and the number of tags within the root (@see getLastSearchPlan). The same tags are found either way.
+    '''
+
+    # _INDEXES - For each index enabled by an index* setting: its name, the setting, the name of its index function,
+    #   and the members which hold it
+    _INDEXES = (
+        ('id', 'indexIDs', '_indexID', ('_idMap', )),
+        ('name', 'indexNames', '_indexName', ('_nameMap', )),
+        ('classname', 'indexClassNames', '_indexClassName', ('_classNameMap', )),
+        ('tagname', 'indexTagNames', '_indexTagName', ('_tagNameMap', )),
+        ('attributenames', 'indexAttributeNames', '_indexAttributeNames', ('_attributeNameMap', )),
+        ('text', 'indexText', '_indexText', ('_textMap', '_textWordsByTag', '_textChangedTags')),
+    )
+
+    # Searches use the indexes, so the summaries of the names within each tag are only built if a full search is done
+    _buildsSubtreeSummaries = False
+
+    def __init__(self, filename=None, encoding='utf-8', indexIDs=True, indexNames=True, indexClassNames=True, indexTagNames=True, tokenizer=None, keepFilter=None, indexAttributeNames=True, indexText=False, lazyIndexes=False):
+        '''
+            __init__ - Creates an Advanced HTML parser object, with specific indexing settings.
+
+                For the various index* arguments, if True the index will be collected and use (if useIndex=True [default] on get* function)
+
+                @param filename <str>         - Optional filename to parse. Otherwise use parseFile or parseStr methods.
+                @param encoding <str> - Specifies the document encoding. Default utf-8
+                @param indexIDs <bool>        - True to create an index for getElementByID method.  <default True>
+                @param indexNames <bool>      - True to create an index for getElementsByName method  <default True>
+                @param indexClassNames <bool> - True to create an index for getElementsByClassName method. <default True>
+                @param indexTagNames <bool>   - True to create an index for tag names. <default True>
+                @param tokenizer <None/class> - Tokenizer backend class, @see AdvancedHTMLParser.__init__
+                @param keepFilter <None/str/function/list/KeepFilter> - Only build matching elements, @see AdvancedHTMLParser.__init__
+                @param indexAttributeNames <bool> - True to create an index of the attribute names each tag has, for the
+                                                      getElementsWithAttr and getElementsWithAttrPrefix methods. <default True>
+                @param indexText <bool>       - True to create an index of the words in the text of each tag, for the
+                                                  getElementsByText method. <default False>
+                @param lazyIndexes <bool>     - True to build each index the first time it is used, rather than while parsing.
+                                                  Parsing is then as fast as with AdvancedHTMLParser. <default False>
+
+                For indexing other attributes, see the more generic addIndexOnAttribute
+
+        '''
+        self.indexFunctions = []
+        self.otherAttributeIndexFunctions = {}
+        self._otherAttributeIndexes = {}
+        self._compositeIndexes = {}
+        self.indexIDs = indexIDs
+        self.indexNames = indexNames
+        self.indexClassNames = indexClassNames
+        self.indexTagNames = indexTagNames
+        self.indexAttributeNames = indexAttributeNames
+        self.indexText = indexText
+        self.lazyIndexes = lazyIndexes
+        self._lastSearchPlan = None
+
+        self._resetIndexInternal()
+
+        AdvancedHTMLParser.__init__(self, filename, encoding, tokenizer, keepFilter)
+
+        if filename is not None:
+            self.parseFile(filename)
+
+###########################################
+#####        INTERNAL               #######
+###########################################
+
+    def _resetIndexInternal(self):
+        # With lazyIndexes=True, each enabled index is held in _unbuiltIndexes, as name -> index function,
+        #   until it is first used, @see _buildIndex. Those of addIndexOnAttribute and addCompositeIndex are None until then.
+        self.indexFunctions = []
+        self._unbuiltIndexes = {}
+        for (name, settingName, indexFunctionName, memberNames) in self._INDEXES:
+            if getattr(self, settingName) is True:
+                indexFunction = getattr(self, indexFunctionName)
+                if self.lazyIndexes is True:
+                    self._unbuiltIndexes[name] = indexFunction
+                else:
+                    self.indexFunctions.append(indexFunction)
+
+        # Other than _idMap, each index maps a value to the tags which have it, as an (ordered) dict of id(tag) -> tag,
+        #   so that a tag can be removed from the index without a search
+        self._idMap = {}
+        self._nameMap = defaultdict(dict)
+        self._classNameMap = defaultdict(dict)
+        self._tagNameMap = defaultdict(dict)
+        self._attributeNameMap = defaultdict(dict)
+        for key in self._otherAttributeIndexes:
+            self._otherAttributeIndexes[key] = None if self.lazyIndexes is True else {}
+#        self._otherAttributeIndexes = {}
+
+        # Each composite index maps a tuple of values (one for each of its fields) to the tags which have them
+        for key in self._compositeIndexes:
+            self._compositeIndexes[key] = None if self.lazyIndexes is True else defaultdict(dict)
+
+        # The text index maps a word to the tags which have it in their text, as with the other indexes.
+        #   _textWordsByTag is id(tag) -> (tag, the words #tag is indexed under), and _textChangedTags
+        #   holds the tags to be indexed (again) at the next text search, @see _updateTextIndex
+        self._textMap = defaultdict(dict)
+        self._textWordsByTag = {}
+        self._textChangedTags = {}
+
+        # Set to False when the tree must be numbered again, @see _numberTree
+        self._isTreeNumbered = False
+
+    ######## Specific Indexing Functions #######
+
+    def _indexID(self, tag):
+        _id = tag.getAttribute('id')
+        if _id:
+            self._idMap[_id] = tag
+
+    def _indexName(self, tag):
+        name = tag.getAttribute('name')
+        if name:
+            self._nameMap[name][id(tag)] = tag
+
+    def _indexClassName(self, tag):
+        classNames = tag.classNames
+        for className in classNames:
+            self._classNameMap[className][id(tag)] = tag
+
+    def _indexTagName(self, tag):
+        self._tagNameMap[tag.tagName][id(tag)] = tag
+
+    @staticmethod
+    def _getAttributeNames(tag):
+        '''
+            _getAttributeNames - Get the names of the attributes a tag has, as with hasAttribute
+
+                This reads the attributes directly, as the keys() of the attributes dict regenerates the "class" and "style" attributes
+
+                @param tag <AdvancedTag> - The tag
+
+                @return list<str> - The attribute names
+        '''
+        attributes = object.__getattribute__(tag, '_attributesDict')
+        if attributes is None:
+            attrNames = []
+        else:
+            attrNames = [ attrName for attrName in dict.keys(attributes) if attrName != 'class' ]
+
+        if object.__getattribute__(tag, '_classNames'):
+            attrNames.append('class')
+
+        return attrNames
+
+    def _indexAttributeNames(self, tag):
+        _attributeNameMap = self._attributeNameMap
+        for attrName in self._getAttributeNames(tag):
+            _attributeNameMap[attrName][id(tag)] = tag
+
+    def _indexText(self, tag):
+        # The text is not complete while parsing, so this is done at the next text search
+        self._textChangedTags[id(tag)] = tag
+
+    def _updateTextIndex(self):
+        '''
+            _updateTextIndex - Index the words in the text of the tags added, or whose text has changed, since the last call
+        '''
+        textChangedTags = self._textChangedTags
+        if not textChangedTags:
+            return
+
+        _textMap = self._textMap
+        _textWordsByTag = self._textWordsByTag
+        _removeFromIndex = self._removeFromIndex
+
+        for (tagId, tag) in textChangedTags.items():
+            words = frozenset( getTextWords(tag.text) )
+
+            indexed = _textWordsByTag.get(tagId, None)
+            if indexed is not None:
+                oldWords = indexed[1]
+                for word in oldWords:
+                    if word not in words:
+                        _removeFromIndex(_textMap, word, tag)
+                for word in words:
+                    if word not in oldWords:
+                        _textMap[word][tagId] = tag
+            else:
+                for word in words:
+                    _textMap[word][tagId] = tag
+
+            _textWordsByTag[tagId] = (tag, words)
+
+        textChangedTags.clear()
+
+    @staticmethod
+    def _indexOtherAttribute(attributeName, self, tag):
+        '''
+            _indexOtherAttribute - Index an attribute added by addIndexOnAttribute. Called as (self, tag) via the partial in otherAttributeIndexFunctions
+        '''
+        attributeIndex = self._otherAttributeIndexes[attributeName]
+        if attributeIndex is None:
+            # Not yet built, @see _buildAttributeIndex
+            return
+
+        thisAttribute = tag.getAttribute(attributeName)
+        if thisAttribute is not None:
+            if thisAttribute not in attributeIndex:
+                attributeIndex[thisAttribute] = {}
+            attributeIndex[thisAttribute][id(tag)] = tag
+
+    @staticmethod
+    def _getCompositeKeys(fields, tag, changedField=None, changedValue=None):
+        '''
+            _getCompositeKeys - Get the keys a tag is indexed under in a composite index
+
+                @param fields tuple<str> - The fields of the composite index, @see addCompositeIndex
+
+                @param tag <AdvancedTag> - The tag
+
+                @param changedField <None/str> - A field to take from #changedValue rather than from the tag (e.x. the value before a change)
+
+                @param changedValue <None/str> - The value of #changedField
+
+                @return list<tuple> - A key for each combination of the values of the tag (e.x. one for each class name),
+                                        or an empty list if the tag does not have a value for every field
+        '''
+        fieldValues = []
+        for field in fields:
+            if field == changedField:
+                value = changedValue
+            elif field == 'tagname':
+                value = tag.tagName
+            elif field == 'classname':
+                value = tag.classNames
+            else:
+                value = tag.getAttribute(field)
+
+            if not value:
+                return []
+
+            if field == 'classname':
+                if not isinstance(value, (list, tuple)):
+                    value = value.split()
+                fieldValues.append(value)
+            else:
+                fieldValues.append( (value, ) )
+
+        return list(itertools.product(*fieldValues))
+
+    def _indexComposite(self, tag):
+        for (fields, index) in self._compositeIndexes.items():
+            if index is None:
+                continue
+            for key in self._getCompositeKeys(fields, tag):
+                index[key][id(tag)] = tag
+
+    @staticmethod
+    def _getIntersection(indexedTags):
+        '''
+            _getIntersection - Get the tags which are in all of several entries from indexes
+
+                @param indexedTags list<dict> - Entries from indexes (id(tag) -> tag)
+
+                @return list<AdvancedTag> - The tags within every entry, in the order of the smallest entry
+        '''
+        # Start from the smallest, so the fewest tags are checked against the others
+        indexedTags = sorted(indexedTags, key=len)
+
+        otherIndexedTags = indexedTags[1:]
+        if not otherIndexedTags:
+            return list(indexedTags[0].values())
+
+        return [ tag for (tagId, tag) in indexedTags[0].items() if all( [ tagId in tags for tags in otherIndexedTags ] ) ]
+
+    @staticmethod
+    def _removeFromIndex(index, value, tag):
+        '''
+            _removeFromIndex - Remove a tag from the tags indexed under a value, if present
+
+                @param index <dict> - The index, value -> dict of id(tag) -> tag
+
+                @param value <str> - The value #tag was indexed under
+
+                @param tag <AdvancedTag> - The tag
+        '''
+        tags = index.get(value, None)
+        if tags is not None:
+            tags.pop(id(tag), None)
+            if not tags:
+                del index[value]
+
+    def _unindexID(self, tag, _id):
+        if _id and self._idMap.get(_id, None) is tag:
+            del self._idMap[_id]
+
+    def _unindexTag(self, tag):
+        '''
+            _unindexTag - Remove a tag from all the indexes, and clear its numbers (@see _numberTree)
+        '''
+        object.__setattr__(tag, '_treeEnter', None)
+        object.__setattr__(tag, '_treeExit', None)
+
+        _removeFromIndex = self._removeFromIndex
+
+        if self.indexIDs is True:
+            self._unindexID(tag, tag.getAttribute('id'))
+        if self.indexNames is True:
+            _removeFromIndex(self._nameMap, tag.getAttribute('name'), tag)
+        if self.indexClassNames is True:
+            for className in tag.classNames:
+                _removeFromIndex(self._classNameMap, className, tag)
+        if self.indexTagNames is True:
+            _removeFromIndex(self._tagNameMap, tag.tagName, tag)
+        if self.indexAttributeNames is True:
+            for attrName in self._getAttributeNames(tag):
+                _removeFromIndex(self._attributeNameMap, attrName, tag)
+
+        for (attributeName, attributeIndex) in self._otherAttributeIndexes.items():
+            if attributeIndex is not None:
+                _removeFromIndex(attributeIndex, tag.getAttribute(attributeName), tag)
+
+        for (fields, index) in self._compositeIndexes.items():
+            if index is None:
+                continue
+            for key in self._getCompositeKeys(fields, tag):
+                _removeFromIndex(index, key, tag)
+
+        if self.indexText is True:
+            self._textChangedTags.pop(id(tag), None)
+            indexed = self._textWordsByTag.pop(id(tag), None)
+            if indexed is not None:
+                for word in indexed[1]:
+                    _removeFromIndex(self._textMap, word, tag)
+
+    def _unindexTagRecursive(self, tag):
+        self._unindexTag(tag)
+
+        _unindexTagRecursive = self._unindexTagRecursive
+        for child in tag.children:
+            _unindexTagRecursive(child)
+
+
+    ######### Index parent functions #########
+
+    def _indexTag(self, tag):
+        for indexFunction in self.indexFunctions:
+            indexFunction(tag)
+
+        for attributeIndexFunction in self.otherAttributeIndexFunctions.values():
+            attributeIndexFunction(self, tag)
+
+        if self._compositeIndexes:
+            self._indexComposite(tag)
+
+    def _indexTagRecursive(self, tag):
+        self._indexTag(tag)
+
+        _indexTagRecursive = self._indexTagRecursive
+        for child in tag.children:
+            _indexTagRecursive(child)
+
+    ######### Lazy building of indexes #########
+
+    def _getTreeTags(self):
+        '''
+            _getTreeTags - Get the root and every tag within it
+
+                @return list<AdvancedTag>
+        '''
+        if self.root is None:
+            return []
+
+        return [self.root] + list(self.root.getAllChildNodes())
+
+    def _buildIndex(self, name):
+        '''
+            _buildIndex - With lazyIndexes=True, build an index in a single pass over the tree, if it has not been built.
+                From then on it is updated with the document, as its index function is added to indexFunctions.
+
+                An index which is not built may still hold entries from attributes changed since parsing,
+                  but as those are of tags within the tree, and indexing a tag again is harmless, they are kept.
+
+                @param name <str> - The name of the index: "id", "name", "classname", "tagname", "attributenames", or "text"
+        '''
+        indexFunction = self._unbuiltIndexes.pop(name, None)
+        if indexFunction is None:
+            return
+
+        for tag in self._getTreeTags():
+            indexFunction(tag)
+
+        self.indexFunctions.append(indexFunction)
+
+    def _buildAttributeIndex(self, attributeName):
+        '''
+            _buildAttributeIndex - With lazyIndexes=True, build an index added by addIndexOnAttribute, if it has not been built
+
+                @param attributeName <lowercase str> - The attribute name
+        '''
+        if attributeName in self._otherAttributeIndexes and self._otherAttributeIndexes[attributeName] is None:
+            self._otherAttributeIndexes[attributeName] = {}
+
+            indexFunction = self.otherAttributeIndexFunctions[attributeName]
+            for tag in self._getTreeTags():
+                indexFunction(self, tag)
+
+    def _buildCompositeIndex(self, fields):
+        '''
+            _buildCompositeIndex - With lazyIndexes=True, build an index added by addCompositeIndex, if it has not been built
+
+                @param fields tuple<lowercase str> - The fields of the index
+        '''
+        if fields in self._compositeIndexes and self._compositeIndexes[fields] is None:
+            index = self._compositeIndexes[fields] = defaultdict(dict)
+
+            for tag in self._getTreeTags():
+                for key in self._getCompositeKeys(fields, tag):
+                    index[key][id(tag)] = tag
+
+    def _buildAllIndexes(self):
+        '''
+            _buildAllIndexes - Build every index which has not been built
+        '''
+        for name in list(self._unbuiltIndexes.keys()):
+            self._buildIndex(name)
+
+        for attributeName in list(self._otherAttributeIndexes.keys()):
+            self._buildAttributeIndex(attributeName)
+
+        for fields in list(self._compositeIndexes.keys()):
+            self._buildCompositeIndex(fields)
+
+    ######## Numbering of the tree #########
+
+    @staticmethod
+    def _numberTags(tag, number, spacing):
+        '''
+            _numberTags - Number #tag and all the tags within it. The "enter" number of a tag is given before the tags within it
+                are numbered, and the "exit" number after, so the tags within a tag have numbers between its numbers.
+
+                @param tag <AdvancedTag> - The tag
+
+                @param number <int> - The number before the first number to give
+
+                @param spacing <int> - The difference between consecutive numbers
+
+                @return <int> - The last number given
+        '''
+        setRaw = object.__setattr__
+
+        number += spacing
+        setRaw(tag, '_treeEnter', number)
+
+        stack = [ (tag, iter(tag.children)) ]
+        while stack:
+            (tag, childIter) = stack[-1]
+
+            child = next(childIter, None)
+            if child is None:
+                stack.pop()
+                number += spacing
+                setRaw(tag, '_treeExit', number)
+            else:
+                number += spacing
+                setRaw(child, '_treeEnter', number)
+                stack.append( (child, iter(child.children)) )
+
+        return number
+
+    def _numberTree(self):
+        '''
+            _numberTree - Number every tag in the tree (@see _numberTags), leaving TREE_ORDER_SPACING between consecutive numbers
+        '''
+        if self.root is not None:
+            self._numberTags(self.root, 0, TREE_ORDER_SPACING)
+
+        self._isTreeNumbered = True
+
+    def _numberAddedTag(self, tag):
+        '''
+            _numberAddedTag - Number a tag (and the tags within it) added to the tree, between the numbers of the tags before and after it.
+
+                If there is not room, the tree will be numbered again when next needed.
+
+                @param tag <AdvancedTag> - The added tag
+        '''
+        parentNode = tag.parentNode
+        siblings = parentNode.children
+
+        for (idx, sibling) in enumerate(siblings):
+            if sibling is tag:
+                break
+
+        if idx > 0:
+            numberBefore = siblings[idx - 1]._treeExit
+        else:
+            numberBefore = parentNode._treeEnter
+
+        if idx + 1 < len(siblings):
+            numberAfter = siblings[idx + 1]._treeEnter
+        else:
+            numberAfter = parentNode._treeExit
+
+        if numberBefore is not None and numberAfter is not None:
+            # Two numbers per tag
+            numNumbers = 2 * len(tag.getAllNodes())
+
+            spacing = min( (numberAfter - numberBefore) // (numNumbers + 1), TREE_ORDER_MAX_INSERT_SPACING )
+            if spacing > 0:
+                self._numberTags(tag, numberBefore, spacing)
+                return
+
+        self._isTreeNumbered = False
+
+    def _getTagsWithin(self, tags, root):
+        '''
+            _getTagsWithin - Get the tags which are #root, or within #root
+
+                @param tags list<AdvancedTag> - Tags within this document (e.x. from an index)
+
+                @param root <AdvancedTag> - The tag which may contain them
+
+                @return list<AdvancedTag> - Those of #tags within #root, in the same order
+        '''
+        if root.ownerDocument is self:
+            if self._isTreeNumbered is False:
+                self._numberTree()
+
+            rootEnter = root._treeEnter
+            if rootEnter is not None:
+                rootExit = root._treeExit
+
+                # As tags are numbered in order, a tag is within #root if it was numbered during #root
+                try:
+                    return [ tag for tag in tags if rootEnter <= tag._treeEnter <= rootExit ]
+                except TypeError:
+                    # A tag without a number, which may happen if the tree was modified directly and not reindexed
+                    pass
+
+        _hasTagInParentLine = AdvancedHTMLParser._hasTagInParentLine
+        return [ tag for tag in tags if _hasTagInParentLine(self, tag, root) ]
+
+    def _hasTagInParentLine(self, tag, root):
+        return bool( self._getTagsWithin( [tag], root ) )
+
+    def _getTagsInOrder(self, tags):
+        '''
+            _getTagsInOrder - Sort tags within this document (e.x. from several index entries) into document order
+
+                @param tags list<AdvancedTag> - Tags within this document
+
+                @return list<AdvancedTag> - #tags, in document order
+        '''
+        if self._isTreeNumbered is False:
+            self._numberTree()
+
+        try:
+            return sorted(tags, key=lambda tag : tag._treeEnter)
+        except TypeError:
+            # A tag without a number, @see _getTagsWithin
+            return list(tags)
 
-            NOTE:
-                Results may be checked by:
+    ######## Planning searches within a root #########
 
-                    issubclass(block.__class__, AdvancedTag)
+    def _getSubtreeSize(self, root):
+        '''
+            _getSubtreeSize - Estimate the number of tags within #root (including #root) from the numbers given to them.
 
-                If True, block is a tag, otherwise, it is a text node
+                The tags numbered together (@see _numberTags) have the same difference between consecutive numbers, so the
+                  estimate is exact unless tags have been added to or removed from #root since.
+
+                @param root <AdvancedTag> - The tag
+
+                @return <int/None> - The estimate, or None if #root is not numbered
         '''
+        if root.ownerDocument is not self:
+            return None
 
-        parser = cls(encoding=encoding)
+        if self._isTreeNumbered is False:
+            self._numberTree()
 
-        parser.parseStr(html)
+        rootEnter = root._treeEnter
+        rootExit = root._treeExit
+        if rootEnter is None or rootExit is None:
+            return None
 
-        rootNode = parser.getRoot()
+        children = root.children
+        if not children:
+            return 1
 
-        rootNode.remove()
+        childEnter = children[0]._treeEnter
+        if childEnter is None or childEnter <= rootEnter:
+            return None
 
-        return rootNode.blocks
+        # Two numbers per tag
+        return ( (rootExit - rootEnter) // (childEnter - rootEnter) + 1 ) // 2
 
+    def _planSearch(self, searchName, root, isFromRoot, numIndexed):
+        '''
+            _planSearch - Choose how a search given a root will find the tags within it, and record the choice (@see getLastSearchPlan)
 
-class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
-    '''
-        An AdvancedHTMLParser that indexes for much much faster searching. If you are doing searching/validation, this is your bet.
-          If you are writing/modifying, you may use this, but be sure to call reindex() after changes.
-    '''
+                @param searchName <str> - The name of the search method
+
+                @param root <AdvancedTag> - The root of the search
 
-    def __init__(self, filename=None, encoding='utf-8', indexIDs=True, indexNames=True, indexClassNames=True, indexTagNames=True):
+                @param isFromRoot <bool> - True if #root is the root of the document, so every indexed tag is within it
+
+                @param numIndexed <int> - The number of tags in the index entry (or entries) for the search
+
+                @return <str> - "index" to check which tags from the index are within #root, or "scan" to check each tag within #root
         '''
-            __init__ - Creates an Advanced HTML parser object, with specific indexing settings.
+        if isFromRoot is True:
+            subtreeSize = None
+            plan = 'index'
+        else:
+            subtreeSize = self._getSubtreeSize(root)
+            if subtreeSize is not None and subtreeSize * PLAN_SCAN_COST < numIndexed:
+                plan = 'scan'
+            else:
+                plan = 'index'
 
-                For the various index* arguments, if True the index will be collected and use (if useIndex=True [default] on get* function)
+        self._lastSearchPlan = {
+            'search' : searchName,
+            'plan' : plan,
+            'numIndexed' : numIndexed,
+            'subtreeSize' : subtreeSize,
+        }
 
-                @param filename <str>         - Optional filename to parse. Otherwise use parseFile or parseStr methods.
-                @param encoding <str> - Specifies the document encoding. Default utf-8
-                @param indexIDs <bool>        - True to create an index for getElementByID method.  <default True>
-                @param indexNames <bool>      - True to create an index for getElementsByName method  <default True>
-                @param indexClassNames <bool> - True to create an index for getElementsByClassName method. <default True>
-                @param indexTagNames <bool>   - True to create an index for tag names. <default True>
+        return plan
 
-                For indexing other attributes, see the more generic addIndexOnAttribute
+    @staticmethod
+    def _scanWithin(root, matchFunction):
+        '''
+            _scanWithin - Get the tags which are #root, or within #root, for which #matchFunction returns True
+
+                @param root <AdvancedTag> - The root of the search
+
+                @param matchFunction <function>(tag) - Returns True if the tag matches the search
 
+                @return list<AdvancedTag> - The matching tags, in document order
         '''
-        self.indexFunctions = []
-        self.otherAttributeIndexFunctions = {}
-        self._otherAttributeIndexes = {}
-        self.indexIDs = indexIDs
-        self.indexNames = indexNames
-        self.indexClassNames = indexClassNames
-        self.indexTagNames = indexTagNames
+        return [ tag for tag in [root] + list(root.getAllChildNodes()) if matchFunction(tag) ]
 
-        self._resetIndexInternal()
+    ######## Updating on changes #########
 
-        AdvancedHTMLParser.__init__(self, filename, encoding)
+    def _isTagAttached(self, tag):
+        '''
+            _isTagAttached - Check if a tag is within the tree of this document (and so, is indexed)
 
-        if filename is not None:
-            self.parseFile(filename)
+                @param tag <AdvancedTag> - The tag
 
-###########################################
-#####        INTERNAL               #######
-###########################################
+                @return <bool>
+        '''
+        root = self.root
+        while tag is not None:
+            if tag is root:
+                return True
+            tag = tag.parentNode
 
-    def _resetIndexInternal(self):
-        self.indexFunctions = []
-        if self.indexIDs is True:
-            self.indexFunctions.append(self._indexID)
-        if self.indexNames is True:
-            self.indexFunctions.append(self._indexName)
-        if self.indexClassNames is True:
-            self.indexFunctions.append(self._indexClassName)
-        if self.indexTagNames is True:
-            self.indexFunctions.append(self._indexTagName)
+        return False
 
-        self._idMap = {}
-        self._nameMap = defaultdict(list)
-        self._classNameMap = defaultdict(list)
-        self._tagNameMap = defaultdict(list)
-        for key in self._otherAttributeIndexes:
-            self._otherAttributeIndexes[key] = {}
-#        self._otherAttributeIndexes = {}
+    def _onTagAttached(self, tag):
+        '''
+            _onTagAttached - Called when #tag (and its children) has been added to a tag associated with this document.
 
-    ######## Specific Indexing Functions #######
+                @see AdvancedTag.appendChild
+        '''
+        if self._isTagAttached(tag):
+            self._indexTagRecursive(tag)
 
-    def _indexID(self, tag):
-        _id = tag.getAttribute('id')
-        if _id:
-            self._idMap[_id] = tag
+            if self._isTreeNumbered is True:
+                self._numberAddedTag(tag)
 
-    def _indexName(self, tag):
-        name = tag.getAttribute('name')
-        if name:
-            self._nameMap[name].append(tag)
+    def _onTagDetached(self, tag):
+        '''
+            _onTagDetached - Called when #tag (and its children) is no longer associated with this document.
 
-    def _indexClassName(self, tag):
-        classNames = tag.classNames
-        for className in classNames:
-            self._classNameMap[className].append(tag)
+                @see AdvancedTag.removeChild
+        '''
+        self._unindexTagRecursive(tag)
 
-    def _indexTagName(self, tag):
-        self._tagNameMap[tag.tagName].append(tag)
+    def _onAttributeChange(self, tag, attrName, oldValue, newValue):
+        '''
+            _onAttributeChange - Called when an attribute of a tag associated with this document has been changed.
 
+                @param tag <AdvancedTag> - The tag
 
-    ######### Index parent functions #########
+                @param attrName <str> - The lowercase attribute name
 
-    def _indexTag(self, tag):
-        for indexFunction in self.indexFunctions:
-            indexFunction(tag)
+                @param oldValue <str/None> - The value before the change, or None if it was not set
 
-        for attributeIndexFunction in self.otherAttributeIndexFunctions.values():
-            attributeIndexFunction(self, tag)
+                @param newValue <str/None> - The value after the change, or None if it was removed
+        '''
+        if not self._isTagAttached(tag):
+            # Not yet added to the tree (as while parsing), so not indexed
+            return
 
-    def _indexTagRecursive(self, tag):
-        self._indexTag(tag)
+        _removeFromIndex = self._removeFromIndex
 
-        _indexTagRecursive = self._indexTagRecursive
-        for child in tag.children:
-            _indexTagRecursive(child)
+        if attrName == 'id':
+            if self.indexIDs is True:
+                self._unindexID(tag, oldValue)
+                if newValue:
+                    self._idMap[newValue] = tag
+
+        elif attrName == 'name':
+            if self.indexNames is True:
+                _removeFromIndex(self._nameMap, oldValue, tag)
+                if newValue:
+                    self._nameMap[newValue][id(tag)] = tag
+
+        elif attrName == 'class':
+            if self.indexClassNames is True:
+                oldClassNames = set(oldValue.split(' ')) if oldValue else set()
+                newClassNames = tag.classNames
+
+                for className in oldClassNames:
+                    if className not in newClassNames:
+                        _removeFromIndex(self._classNameMap, className, tag)
+                for className in newClassNames:
+                    if className not in oldClassNames:
+                        self._classNameMap[className][id(tag)] = tag
+
+        if self.indexAttributeNames is True:
+            if tag.hasAttribute(attrName):
+                self._attributeNameMap[attrName][id(tag)] = tag
+            else:
+                _removeFromIndex(self._attributeNameMap, attrName, tag)
+
+        attributeIndex = self._otherAttributeIndexes.get(attrName, None)
+        if attributeIndex is not None:
+            _removeFromIndex(attributeIndex, oldValue, tag)
+            self.otherAttributeIndexFunctions[attrName](self, tag)
+
+        fieldName = attrName if attrName != 'class' else 'classname'
+        for (fields, index) in self._compositeIndexes.items():
+            if index is not None and fieldName in fields:
+                for key in self._getCompositeKeys(fields, tag, fieldName, oldValue):
+                    _removeFromIndex(index, key, tag)
+                for key in self._getCompositeKeys(fields, tag):
+                    index[key][id(tag)] = tag
+
+    def _onTextChange(self, tag):
+        '''
+            _onTextChange - Called when the text directly within a tag associated with this document has changed.
+
+                @see AdvancedTag.appendText
+        '''
+        # Not set while this document is being unpickled, in which case the text index is already complete
+        _textWordsByTag = self.__dict__.get('_textWordsByTag', None)
+
+        # Only tags already indexed (so within the tree) are recorded, the rest will be when indexed
+        tagId = id(tag)
+        if _textWordsByTag and tagId in _textWordsByTag:
+            self._textChangedTags[tagId] = tag
 
     ######## Parsing #########
 
@@ -1190,10 +2697,25 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
             internal for parsing
         '''
         newTag = AdvancedHTMLParser.handle_starttag(self, tagName, attributeList, isSelfClosing)
-        self._indexTag(newTag)
+        if newTag is not None:
+            self._indexTag(newTag)
+
+            # When parsing in chunks, the tree may have been numbered between chunks
+            self._isTreeNumbered = False
 
         return newTag
 
+    def _enterInvisibleRoot(self, data=''):
+        '''
+            internal for parsing, @see AdvancedHTMLParser._enterInvisibleRoot
+        '''
+        AdvancedHTMLParser._enterInvisibleRoot(self, data)
+
+        # The invisible root (and any root-level text) is indexed as it would be by reindex
+        self._indexTag(self.root)
+
+        self._isTreeNumbered = False
+
     def setRoot(self, root):
         '''
             Sets the root node, and reprocesses the indexes
@@ -1203,20 +2725,45 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
         AdvancedHTMLParser.setRoot(self, root)
         self.reindex()
 
+    def __setstate__(self, state):
+        '''
+            __setstate__ - Restore state for loading pickle
+
+                The indexes are keyed by id(tag), so are keyed again by the loaded tags, and the loaded tags are not numbered.
+
+                @param state <dict> - The state
+        '''
+        AdvancedHTMLParser.__setstate__(self, state)
+
+        self._isTreeNumbered = False
+
+        for index in [ self._nameMap, self._classNameMap, self._tagNameMap, self._attributeNameMap, self._textMap ] + list(self._otherAttributeIndexes.values()) + list(self._compositeIndexes.values()):
+            if index is None:
+                continue
+            for (value, tags) in index.items():
+                index[value] = dict( (id(tag), tag) for tag in tags.values() )
+
+        self._textWordsByTag = dict( (id(indexed[0]), indexed) for indexed in self._textWordsByTag.values() )
+        self._textChangedTags = dict( (id(tag), tag) for tag in self._textChangedTags.values() )
+
 ##########################################################
 #                 Public
 ##########################################################
 
 
-    # This should be called if you modify a parsed tree at an element level, then search it.
-    def reindex(self, newIndexIDs=None, newIndexNames=None, newIndexClassNames=None, newIndexTagNames=None):
+    # The indexes are updated as the tree is modified, but this should be called if you modify
+    #   the "children" or "blocks" of a tag directly, then search it.
+    def reindex(self, newIndexIDs=None, newIndexNames=None, newIndexClassNames=None, newIndexTagNames=None, newIndexAttributeNames=None, newIndexText=None):
         '''
             reindex - reindex the tree. Optionally, change what fields are indexed.
+                With lazyIndexes=True, the indexes are instead discarded, to be built again when next used.
 
                 @param newIndexIDs <bool/None>        - None to leave same, otherwise new value to index IDs
                 @parma newIndexNames <bool/None>      - None to leave same, otherwise new value to index names
                 @param newIndexClassNames <bool/None> - None to leave same, otherwise new value to index class names
                 @param newIndexTagNames <bool/None>   - None to leave same, otherwise new value to index tag names
+                @param newIndexAttributeNames <bool/None> - None to leave same, otherwise new value to index attribute names
+                @param newIndexText <bool/None>       - None to leave same, otherwise new value to index text
         '''
         if newIndexIDs is not None:
             self.indexIDs = newIndexIDs
@@ -1226,9 +2773,17 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
             self.newIndexClassNames = newIndexClassNames
         if newIndexTagNames is not None:
             self.newIndexTagNames = newIndexTagNames
+        if newIndexAttributeNames is not None:
+            self.indexAttributeNames = newIndexAttributeNames
+        if newIndexText is not None:
+            self.indexText = newIndexText
 
         self._resetIndexInternal()
-        self._indexTagRecursive(self.root)
+        if self.lazyIndexes is False:
+            self._indexTagRecursive(self.root)
+
+        self._numberTree()
+        self.clearSubtreeSummaries()
 
     def disableIndexing(self):
         '''
@@ -1236,28 +2791,22 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
               Maybe useful in some scenarios where you want to parse, add a ton of elements, then index
               and do a bunch of searching.
         '''
-        self.indexIDs = self.indexNames = self.indexClassNames = self.indexTagNames = False
+        self.indexIDs = self.indexNames = self.indexClassNames = self.indexTagNames = self.indexAttributeNames = self.indexText = False
         self._resetIndexInternal()
 
     def addIndexOnAttribute(self, attributeName):
         '''
             addIndexOnAttribute - Add an index for an arbitrary attribute. This will be used by the getElementsByAttr function.
-                You should do this prior to parsing, or call reindex. Otherwise it will be blank. "name" and "id" will have no effect.
+                You should do this prior to parsing, or call reindex. Otherwise it will be blank (unless lazyIndexes=True, where it is built when first used).
+                "name" and "id" will have no effect.
 
                 @param attributeName <lowercase str> - An attribute name. Will be lowercased.
         '''
         attributeName = attributeName.lower()
-        self._otherAttributeIndexes[attributeName] = {}
-
-        def _otherIndexFunction(self, tag):
-            thisAttribute = tag.getAttribute(attributeName)
-            if thisAttribute is not None:
-                if thisAttribute not in self._otherAttributeIndexes[attributeName]:
-                    self._otherAttributeIndexes[attributeName][thisAttribute] = []
-                self._otherAttributeIndexes[attributeName][thisAttribute].append(tag)
+        self._otherAttributeIndexes[attributeName] = None if self.lazyIndexes is True else {}
 
-
-        self.otherAttributeIndexFunctions[attributeName] = _otherIndexFunction
+        # A partial (rather than a function defined here) so that the parser can be pickled
+        self.otherAttributeIndexFunctions[attributeName] = functools.partial(IndexedAdvancedHTMLParser._indexOtherAttribute, attributeName)
 
     def removeIndexOnAttribute(self, attributeName):
         '''
@@ -1271,6 +2820,126 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
         if attributeName in self._otherAttributeIndexes:
                 del self._otherAttributeIndexes[attributeName]
 
+    def addCompositeIndex(self, *fields):
+        '''
+            addCompositeIndex - Add an index on a combination of fields, used by #find when given all of them.
+                For example, addCompositeIndex('tagname', 'classname') for find(tagname='li', classname='item'),
+                or addCompositeIndex('tagname', 'type') for find(tagname='input', type='checkbox')
+
+                A tag is indexed under each combination of its values, and only if it has a value for every field.
+
+                @param fields <lowercase str> - Two or more of: "tagname", "classname" (each class name), or an attribute name. Will be lowercased.
+        '''
+        fields = tuple( [ field.lower() for field in fields ] )
+        if len(fields) < 2:
+            raise ValueError('A composite index needs at least two fields, use addIndexOnAttribute for one.')
+
+        # Index the tags already parsed, unless built when first used
+        self._compositeIndexes[fields] = None
+        if self.lazyIndexes is False:
+            self._buildCompositeIndex(fields)
+
+    def removeCompositeIndex(self, *fields):
+        '''
+            removeCompositeIndex - Remove an index added by addCompositeIndex, and the indexed data.
+
+                @param fields <lowercase str> - The same fields given to addCompositeIndex. Will be lowercased.
+        '''
+        fields = tuple( [ field.lower() for field in fields ] )
+        self._compositeIndexes.pop(fields, None)
+
+    def getLastSearchPlan(self):
+        '''
+            getLastSearchPlan - Get how the last indexed search found its tags, for debugging.
+
+                A search given a root (other than the root of the document) either checks which tags from the index entry are
+                  within the root ("index"), or checks each tag within the root ("scan"), whichever is estimated to be cheaper.
+
+                Searches of getElementsByTagName, getElementsByName, getElementsByClassName, getElementsByAttr,
+                  getElementsWithAttrValues, getElementsWithAttr, and getElementsWithAttrPrefix with an index are planned.
+
+                @return <dict/None> - None if no search has been planned, otherwise a dict of:
+
+                    "search" <str> - The name of the search method
+
+                    "plan" <str> - "index" or "scan"
+
+                    "numIndexed" <int> - The number of tags in the index entry (or entries) for the search
+
+                    "subtreeSize" <int/None> - The estimated number of tags within the root, or None if the search was from
+                                                 the root of the document, or the root is not numbered
+        '''
+        if self._lastSearchPlan is None:
+            return None
+
+        return dict(self._lastSearchPlan)
+
+    def getSnapshot(self):
+        '''
+            getSnapshot - Get a snapshot of this document together with its indexes, which can be loaded
+                by #loadSnapshotBytes without parsing or indexing again. Much faster to load than a pickle
+                of the parser, which holds the tags as objects.
+
+                The tree is stored as a FrozenDocument, and each index as the numbers of its tags in document order.
+
+                @return <bytes> - The snapshot
+
+                @raises ValueError - If nothing has been parsed
+        '''
+        # Late-binding import
+        from .Snapshot import getSnapshotState
+
+        return pickle.dumps(getSnapshotState(self), pickle.HIGHEST_PROTOCOL)
+
+    def saveSnapshot(self, filename):
+        '''
+            saveSnapshot - Save a snapshot of this document together with its indexes to a file, @see getSnapshot
+
+                @param filename <str/file> - A filename, or a file object opened in binary mode. If file object, it will not be closed.
+
+                @raises ValueError - If nothing has been parsed
+        '''
+        snapshot = self.getSnapshot()
+
+        if hasattr(filename, 'write'):
+            filename.write(snapshot)
+        else:
+            with open(filename, 'wb') as f:
+                f.write(snapshot)
+
+    def loadSnapshotBytes(self, snapshot):
+        '''
+            loadSnapshotBytes - Load a snapshot from #getSnapshot, replacing the document and indexes of this parser.
+
+                The index settings (index*, addIndexOnAttribute, addCompositeIndex) become those the snapshot was taken with.
+
+                NOTE: A snapshot is a pickle, so like any pickle, only load snapshots you have created.
+
+                @param snapshot <bytes> - The snapshot
+
+                @raises ValueError - If this is not a snapshot, or is one of an unsupported version
+        '''
+        # Late-binding import
+        from .Snapshot import loadSnapshotState
+
+        loadSnapshotState(self, pickle.loads(snapshot))
+
+    def loadSnapshot(self, filename):
+        '''
+            loadSnapshot - Load a snapshot saved by #saveSnapshot, replacing the document and indexes of this parser, @see loadSnapshotBytes
+
+                @param filename <str/file> - A filename, or a file object opened in binary mode. If file object, it will not be closed.
+
+                @raises ValueError - If this is not a snapshot, or is one of an unsupported version
+        '''
+        if hasattr(filename, 'read'):
+            snapshot = filename.read()
+        else:
+            with open(filename, 'rb') as f:
+                snapshot = f.read()
+
+        self.loadSnapshotBytes(snapshot)
+
 
     def getElementsByTagName(self, tagName, root='root', useIndex=True):
         '''
@@ -1284,10 +2953,13 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
         (root, isFromRoot) = self._handleRootArg(root)
 
         if useIndex is True and self.indexTagNames is True:
-            elements = self._tagNameMap.get(tagName, []) # Use .get here as to not create a lot of extra indexes on the defaultdict for misses
-            if isFromRoot is False:
-                _hasTagInParentLine = self._hasTagInParentLine
-                elements = [x for x in elements if _hasTagInParentLine(x, root)]
+            self._buildIndex('tagname')
+
+            elements = self._tagNameMap.get(tagName, {}).values() # Use .get here as to not create a lot of extra indexes on the defaultdict for misses
+            if self._planSearch('getElementsByTagName', root, isFromRoot, len(elements)) == 'scan':
+                elements = self._scanWithin(root, lambda tag : tag.tagName == tagName)
+            elif isFromRoot is False:
+                elements = self._getTagsWithin(elements, root)
 
             return TagCollection(elements)
 
@@ -1306,12 +2978,14 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
 
         elements = []
         if useIndex is True and self.indexNames is True:
+            self._buildIndex('name')
 
-            elements = self._nameMap.get(name, [])
+            elements = self._nameMap.get(name, {}).values()
 
-            if isFromRoot is False:
-                _hasTagInParentLine = self._hasTagInParentLine
-                elements = [x for x in elements if _hasTagInParentLine(x, root)]
+            if self._planSearch('getElementsByName', root, isFromRoot, len(elements)) == 'scan':
+                elements = self._scanWithin(root, lambda tag : tag.getAttribute('name') == name)
+            elif isFromRoot is False:
+                elements = self._getTagsWithin(elements, root)
 
             return TagCollection(elements)
 
@@ -1329,6 +3003,7 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
         (root, isFromRoot) = self._handleRootArg(root)
 
         if useIndex is True and self.indexIDs is True:
+            self._buildIndex('id')
 
             element = self._idMap.get(_id, None)
 
@@ -1357,12 +3032,26 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
         (root, isFromRoot) = self._handleRootArg(root)
 
         if useIndex is True and self.indexClassNames is True:
+            self._buildIndex('classname')
+
+            classNames = className.split()
+            if not classNames:
+                return TagCollection()
+
+            _classNameMap = self._classNameMap
+            indexedTags = [ _classNameMap.get(className, {}) for className in set(classNames) ]
 
-            elements = self._classNameMap.get(className, [])
+            # The tags with all of the class names are among those with the least common one
+            if self._planSearch('getElementsByClassName', root, isFromRoot, min( [ len(tags) for tags in indexedTags ] )) == 'scan':
+                return TagCollection(self._scanWithin(root, lambda tag : all( [ className in tag.classNames for className in classNames ] )))
+
+            if len(indexedTags) == 1:
+                elements = indexedTags[0].values()
+            else:
+                elements = self._getIntersection(indexedTags)
 
             if isFromRoot is False:
-                _hasTagInParentLine = self._hasTagInParentLine
-                elements = [x for x in elements if _hasTagInParentLine(x, root)]
+                elements = self._getTagsWithin(elements, root)
 
             return TagCollection(elements)
 
@@ -1382,12 +3071,14 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
         (root, isFromRoot) = self._handleRootArg(root)
 
         if useIndex is True and attrName in self._otherAttributeIndexes:
+            self._buildAttributeIndex(attrName)
 
-            elements = self._otherAttributeIndexes[attrName].get(attrValue, [])
+            elements = self._otherAttributeIndexes[attrName].get(attrValue, {}).values()
 
-            if isFromRoot is False:
-                _hasTagInParentLine = self._hasTagInParentLine
-                elements = [x for x in elements if _hasTagInParentLine(x, root)]
+            if self._planSearch('getElementsByAttr', root, isFromRoot, len(elements)) == 'scan':
+                elements = self._scanWithin(root, lambda tag : tag.getAttribute(attrName) == attrValue)
+            elif isFromRoot is False:
+                elements = self._getTagsWithin(elements, root)
 
             return TagCollection(elements)
 
@@ -1407,15 +3098,235 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
 
         _otherAttributeIndexes = self._otherAttributeIndexes
         if useIndex is True and attrName in _otherAttributeIndexes:
+            self._buildAttributeIndex(attrName)
+
+            index = _otherAttributeIndexes[attrName]
+            numIndexed = sum( [ len(index.get(value, {})) for value in values ] )
+            if self._planSearch('getElementsWithAttrValues', root, isFromRoot, numIndexed) == 'scan':
+                return TagCollection(self._scanWithin(root, lambda tag : tag.getAttribute(attrName) in values))
 
             elements = TagCollection()
 
             for value in values:
-                elements += TagCollection(_otherAttributeIndexes[attrName].get(value, []))
+                tags = index.get(value, {}).values()
+                if isFromRoot is False:
+                    tags = self._getTagsWithin(tags, root)
+
+                elements += tags
 
             return elements
 
-        return AdvancedHTMLParser.getElementsWithAttrValues(self, attrName, values, root, useIndex)
+        return AdvancedHTMLParser.getElementsWithAttrValues(self, attrName, values, root)
+
+
+    def getElementsWithAttr(self, attrName, root='root', useIndex=True):
+        '''
+            getElementsWithAttr - Returns elements which have an attribute, with any value
+
+                @param attrName <lowercase str> - A lowercase attribute name
+                @param root <AdvancedTag/'root'> - Search starting at a specific node, if provided. if string 'root', the root of the parsed tree will be used.
+                @param useIndex <bool> If useIndex is True and attribute names are indexed [see constructor] only the index will be used. Otherwise a full search is performed.
+
+                @return - TagCollection of all matching elements
+        '''
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        if useIndex is True and self.indexAttributeNames is True:
+            self._buildIndex('attributenames')
+
+            attrName = attrName.lower()
+            elements = self._attributeNameMap.get(attrName, {}).values()
+
+            if self._planSearch('getElementsWithAttr', root, isFromRoot, len(elements)) == 'scan':
+                _getAttributeNames = self._getAttributeNames
+                elements = self._scanWithin(root, lambda tag : attrName in _getAttributeNames(tag))
+            elif isFromRoot is False:
+                elements = self._getTagsWithin(elements, root)
+
+            return TagCollection(elements)
+
+        return AdvancedHTMLParser.getElementsWithAttr(self, attrName, root)
+
+    def getElementsWithAttrPrefix(self, prefix, root='root', useIndex=True):
+        '''
+            getElementsWithAttrPrefix - Returns elements which have an attribute with a name starting with #prefix (e.x. "data-")
+
+                @param prefix <lowercase str> - The start of an attribute name
+                @param root <AdvancedTag/'root'> - Search starting at a specific node, if provided. if string 'root', the root of the parsed tree will be used.
+                @param useIndex <bool> If useIndex is True and attribute names are indexed [see constructor] only the index will be used. Otherwise a full search is performed.
+
+                @return - TagCollection of all matching elements, in document order
+        '''
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        if useIndex is True and self.indexAttributeNames is True:
+            self._buildIndex('attributenames')
+            prefix = prefix.lower()
+
+            # The number of distinct attribute names is small, so each is checked for the prefix
+            foundTags = {}
+            numNames = 0
+            for (attrName, tags) in self._attributeNameMap.items():
+                if attrName.startswith(prefix):
+                    foundTags.update(tags)
+                    numNames += 1
+
+            if self._planSearch('getElementsWithAttrPrefix', root, isFromRoot, len(foundTags)) == 'scan':
+                _getAttributeNames = self._getAttributeNames
+                return TagCollection(self._scanWithin(root, lambda tag : any( [ attrName.startswith(prefix) for attrName in _getAttributeNames(tag) ] )))
+
+            elements = foundTags.values()
+            if numNames > 1:
+                elements = self._getTagsInOrder(elements)
+
+            if isFromRoot is False:
+                elements = self._getTagsWithin(elements, root)
+
+            return TagCollection(elements)
+
+        return AdvancedHTMLParser.getElementsWithAttrPrefix(self, prefix, root)
+
+    def getElementsByText(self, text, root='root', textContent=False, useIndex=True):
+        '''
+            getElementsByText - Returns elements with the words of #text (a word, or a phrase of several words in order) in their text.
+
+                Words are matched whole and case-insensitively, ignoring punctuation and whitespace.
+
+                @param text <str> - A word or phrase
+                @param root <AdvancedTag/'root'> - Search starting at a specific node, if provided. if string 'root', the root of the parsed tree will be used.
+                @param textContent <bool> Default False - If False, match only the text directly within a tag (the "text" property).
+                                                             If True, also match the tags containing those, as with the "textContent"
+                                                             property, except a phrase must be within the text of a single tag.
+                @param useIndex <bool> If useIndex is True and text is indexed [see constructor] the index will be used. Otherwise a full search is performed.
+
+                @return - TagCollection of all matching elements
+        '''
+        (root, isFromRoot) = self._handleRootArg(root)
+
+        if useIndex is True and self.indexText is True:
+            words = getTextWords(text)
+            if not words:
+                return TagCollection()
+
+            self._buildIndex('text')
+            self._updateTextIndex()
+
+            # The tags with every word
+            _textMap = self._textMap
+            elements = self._getIntersection( [ _textMap.get(word, {}) for word in set(words) ] )
+
+            if len(words) > 1:
+                # Having the words does not mean having them in order
+                elements = [ tag for tag in elements if containsWords(getTextWords(tag.text), words) ]
+
+            if textContent is True and elements:
+                matchedTags = {}
+                for tag in elements:
+                    while tag is not None and id(tag) not in matchedTags:
+                        matchedTags[id(tag)] = tag
+                        tag = tag.parentNode
+
+                elements = self._getTagsInOrder(matchedTags.values())
+
+            if isFromRoot is False:
+                elements = self._getTagsWithin(elements, root)
+
+            return TagCollection(elements)
+
+        return AdvancedHTMLParser.getElementsByText(self, text, root, textContent)
+
+    def find(self, **kwargs):
+        '''
+            find - Perform a search of elements using attributes as keys and potential values as values, @see AdvancedHTMLParser.find
+
+                For each key given a single value which is indexed (tagname, classname, name, class, those added by addIndexOnAttribute),
+                  the tags within the index entries for it are found, starting with the smallest entry, and then checked against
+                  the rest of the criteria. A composite index (@see addCompositeIndex) is used in place of the indexes for its fields,
+                  where all of them are given.
+
+                If none of the keys are indexed, a full search is performed.
+
+            @return TagCollection<AdvancedTag> - A list of tags that matched the filter criteria
+        '''
+        if not kwargs:
+            return TagCollection()
+
+        (indexedTags, matchedKeys) = self._getFindIndexedTags(kwargs)
+        if not indexedTags:
+            return AdvancedHTMLParser.find(self, **kwargs)
+
+        elements = self._getIntersection(indexedTags)
+
+        # The tags within the index entries already match those keys
+        otherKwargs = dict( [ (key, value) for (key, value) in kwargs.items() if key.lower() not in matchedKeys ] )
+        if otherKwargs:
+            matchFunction = self._getFindMatchFunction(otherKwargs)
+            elements = [ tag for tag in elements if matchFunction(tag) ]
+
+        return TagCollection(elements)
+
+    def _getFindIndexedTags(self, kwargs):
+        '''
+            _getFindIndexedTags - Get the index entries for the criteria given to #find. Every match is within all of them.
+
+                @param kwargs <dict> - The criteria, @see find
+
+                @return tuple( list<dict>, set<str> ) - The index entries (id(tag) -> tag), empty if none of the criteria are indexed,
+                                                          and the keys which every tag within all the entries matches
+        '''
+        # Only keys given a single value can be looked up. An empty value also matches tags without the attribute.
+        values = {}
+        for (key, value) in kwargs.items():
+            key = key.lower()
+            # "text" is the text within a tag, not an attribute, even if an attribute named "text" is indexed
+            if value and not isinstance(value, (list, tuple)) and not key.endswith('contains') and key != 'text':
+                values[key] = value
+
+        indexedTags = []
+        usedKeys = set()
+
+        for fields in self._compositeIndexes:
+            if all( [ field in values for field in fields ] ):
+                self._buildCompositeIndex(fields)
+                index = self._compositeIndexes[fields]
+
+                fieldValues = [ values[field].split() if field == 'classname' else (values[field], ) for field in fields ]
+                for key in itertools.product(*fieldValues):
+                    indexedTags.append( index.get(key, {}) )
+
+                usedKeys.update(fields)
+
+        for (key, value) in values.items():
+            if key in usedKeys:
+                continue
+
+            if key == 'tagname':
+                if self.indexTagNames is True:
+                    self._buildIndex('tagname')
+                    indexedTags.append( self._tagNameMap.get(value, {}) )
+                    usedKeys.add(key)
+            elif key in ('classname', 'class'):
+                if self.indexClassNames is True:
+                    self._buildIndex('classname')
+                    for className in set(value.split()):
+                        indexedTags.append( self._classNameMap.get(className, {}) )
+
+                    # For "class" (the whole attribute value), a match has each of the class names, but may not be equal
+                    if key == 'classname':
+                        usedKeys.add(key)
+            elif key == 'name':
+                if self.indexNames is True:
+                    self._buildIndex('name')
+                    indexedTags.append( self._nameMap.get(value, {}) )
+                    usedKeys.add(key)
+            elif key in self._otherAttributeIndexes:
+                self._buildAttributeIndex(key)
+                indexedTags.append( self._otherAttributeIndexes[key].get(value, {}) )
+                usedKeys.add(key)
+
+            # The id index holds one tag per id, but find returns every tag with the id
+
+        return (indexedTags, usedKeys)
 
 
     # TODO: Write indexed alternates for XPath?
@@ -1424,7 +3335,7 @@ class IndexedAdvancedHTMLParser(AdvancedHTMLParser):
         '''
             _reset - reset this object. Assigned to .reset after __init__ call.
         '''
-        AdvancedHTMLParser.reset(self)
+        AdvancedHTMLParser._reset(self)
 
         self._resetIndexInternal()
 
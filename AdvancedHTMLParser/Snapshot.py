@@ -0,0 +1,226 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    Snapshot - Save an IndexedAdvancedHTMLParser document together with its indexes, and load it
+      again without parsing or indexing.
+
+      The tree is stored as a FrozenDocument (columns of node data, with nodes numbered in document order),
+        and each index as the node numbers of the tags under each value.
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+from array import array
+from collections import defaultdict
+
+from .Frozen import FrozenDocument, BLOCK_CHILD
+from .Tags import AdvancedTag
+
+__all__ = ('SNAPSHOT_VERSION', 'getSnapshotState', 'loadSnapshotState')
+
+
+# SNAPSHOT_VERSION - The version of the snapshot format. A snapshot of a different version can not be loaded.
+SNAPSHOT_VERSION = 1
+
+# SNAPSHOT_INDEX_SETTINGS - The settings of an IndexedAdvancedHTMLParser which are stored in a snapshot
+SNAPSHOT_INDEX_SETTINGS = ('indexIDs', 'indexNames', 'indexClassNames', 'indexTagNames', 'indexAttributeNames', 'indexText')
+
+# SNAPSHOT_INDEXES - The indexes (other than the id index, and those for specific attributes) stored in a snapshot
+SNAPSHOT_INDEXES = ('_nameMap', '_classNameMap', '_tagNameMap', '_attributeNameMap')
+
+
+def _getTagsInOrder(root):
+    '''
+        _getTagsInOrder - Get #root and all the tags within it, in document order (the order of the nodes of a FrozenDocument)
+
+            @param root <AdvancedTag> - The root tag
+
+            @return list<AdvancedTag>
+    '''
+    tags = []
+
+    stack = [root]
+    while stack:
+        tag = stack.pop()
+        tags.append(tag)
+
+        stack.extend( reversed(tag.children) )
+
+    return tags
+
+def _getNodeIndex(index, nodeNumbers):
+    '''
+        _getNodeIndex - Convert an index of value -> dict of id(tag) -> tag to value -> array of node numbers
+
+            @param index <dict> - The index
+
+            @param nodeNumbers <dict> - id(tag) -> node number
+
+            @return dict
+    '''
+    return dict( [ (value, array('i', [ nodeNumbers[tagId] for tagId in tags if tagId in nodeNumbers ]) ) for (value, tags) in index.items() ] )
+
+def _loadNodeIndex(nodeIndex, tags):
+    '''
+        _loadNodeIndex - Convert an index of value -> array of node numbers (@see _getNodeIndex) back to value -> dict of id(tag) -> tag
+
+            @param nodeIndex <dict> - The index of node numbers
+
+            @param tags list<AdvancedTag> - The tags, by node number
+
+            @return defaultdict
+    '''
+    index = defaultdict(dict)
+    for (value, numbers) in nodeIndex.items():
+        index[value] = dict( [ (id(tags[number]), tags[number]) for number in numbers ] )
+
+    return index
+
+def getSnapshotState(document):
+    '''
+        getSnapshotState - Get the state saved in a snapshot of an IndexedAdvancedHTMLParser
+
+            @param document <IndexedAdvancedHTMLParser> - The parsed document
+
+            @return <dict> - The state, which contains only simple types, arrays and a FrozenDocument
+
+            @raises ValueError - If nothing was parsed
+    '''
+    frozenDocument = FrozenDocument(document)
+
+    # With lazyIndexes=True, the indexes not yet used are built so that every index is in the snapshot
+    document._buildAllIndexes()
+
+    nodeNumbers = dict( [ (id(tag), number) for (number, tag) in enumerate(_getTagsInOrder(document.getRoot())) ] )
+
+    return {
+        'version' : SNAPSHOT_VERSION,
+        'document' : frozenDocument,
+        'encoding' : document.encoding,
+        'documentEncoding' : document.documentEncoding,
+        'settings' : dict( [ (name, getattr(document, name)) for name in SNAPSHOT_INDEX_SETTINGS ] ),
+        'idIndex' : dict( [ (_id, nodeNumbers[id(tag)]) for (_id, tag) in document._idMap.items() if id(tag) in nodeNumbers ] ),
+        'indexes' : dict( [ (name, _getNodeIndex(getattr(document, name), nodeNumbers)) for name in SNAPSHOT_INDEXES ] ),
+        'otherAttributeIndexes' : dict( [ (attributeName, _getNodeIndex(index, nodeNumbers)) for (attributeName, index) in document._otherAttributeIndexes.items() ] ),
+        'compositeIndexes' : dict( [ (fields, _getNodeIndex(index, nodeNumbers)) for (fields, index) in document._compositeIndexes.items() ] ),
+    }
+
+def _createTags(frozenDocument, ownerDocument):
+    '''
+        _createTags - Create the tags of the tree stored in a FrozenDocument
+
+            @param frozenDocument <FrozenDocument> - The stored tree
+
+            @param ownerDocument <AdvancedHTMLParser> - The document to associate the tags with
+
+            @return list<AdvancedTag> - The tags, by node number
+    '''
+    internTable = ownerDocument.internTable
+
+    tagNames = frozenDocument.tagNames
+    tagNameIds = frozenDocument.tagNameIds
+    selfClosings = frozenDocument.selfClosings
+    getAttributesList = frozenDocument.getAttributesList
+
+    tags = []
+    for number in range(len(frozenDocument)):
+        attributeList = getAttributesList(number)
+        if attributeList and internTable is not None:
+            attributeList = internTable.internAttributes(attributeList)
+
+        tags.append( AdvancedTag(tagNames[ tagNameIds[number] ], attributeList, bool(selfClosings[number]), ownerDocument=ownerDocument) )
+
+    # Link the tags together, directly setting the same members appendChild / appendText would
+    rawSet = object.__setattr__
+
+    parents = frozenDocument.parents
+    firstChilds = frozenDocument.firstChilds
+    nextSiblings = frozenDocument.nextSiblings
+    getTextBlock = frozenDocument.getTextBlock
+    iterBlocks = frozenDocument._iterBlocks
+
+    for (number, tag) in enumerate(tags):
+        blocks = ['']
+        children = []
+
+        childNumber = firstChilds[number]
+        for block in iterBlocks(number):
+            if block == BLOCK_CHILD:
+                child = tags[childNumber]
+                blocks.append(child)
+                children.append(child)
+
+                childNumber = nextSiblings[childNumber]
+            else:
+                blocks.append( getTextBlock(block) )
+
+        rawSet(tag, 'blocks', blocks)
+        rawSet(tag, 'children', children)
+        rawSet(tag, '_text', None)
+        rawSet(tag, 'isSelfClosing', bool(selfClosings[number]))
+        rawSet(tag, 'ownerDocument', ownerDocument)
+
+        parentNumber = parents[number]
+        if parentNumber != -1:
+            rawSet(tag, 'parentNode', tags[parentNumber])
+
+    return tags
+
+def loadSnapshotState(document, state):
+    '''
+        loadSnapshotState - Replace the document and indexes of an IndexedAdvancedHTMLParser with those from a snapshot
+
+            @param document <IndexedAdvancedHTMLParser> - The document to load into
+
+            @param state <dict> - The state, @see getSnapshotState
+
+            @raises ValueError - If the snapshot is not of a supported version
+    '''
+    if not isinstance(state, dict) or state.get('version', None) != SNAPSHOT_VERSION:
+        raise ValueError('Not a snapshot, or a snapshot of an unsupported version. Expected version %d.' %(SNAPSHOT_VERSION, ))
+
+    document.reset()
+
+    document.encoding = state['encoding']
+    document.documentEncoding = state['documentEncoding']
+
+    # The indexes are those of the snapshot
+    for (name, value) in state['settings'].items():
+        setattr(document, name, value)
+
+    for attributeName in list(document._otherAttributeIndexes.keys()):
+        document.removeIndexOnAttribute(attributeName)
+    for attributeName in state['otherAttributeIndexes']:
+        document.addIndexOnAttribute(attributeName)
+
+    document._compositeIndexes = dict( [ (fields, None) for fields in state['compositeIndexes'] ] )
+
+    # Every index is loaded, so none are left to be built (@see IndexedAdvancedHTMLParser._buildIndex)
+    lazyIndexes = document.lazyIndexes
+    document.lazyIndexes = False
+    document._resetIndexInternal()
+    document.lazyIndexes = lazyIndexes
+
+    frozenDocument = state['document']
+
+    tags = _createTags(frozenDocument, document)
+
+    document.root = tags[0]
+    document.doctype = frozenDocument.doctype
+
+    document._idMap = dict( [ (_id, tags[number]) for (_id, number) in state['idIndex'].items() ] )
+
+    for (name, nodeIndex) in state['indexes'].items():
+        setattr(document, name, _loadNodeIndex(nodeIndex, tags))
+
+    for (attributeName, nodeIndex) in state['otherAttributeIndexes'].items():
+        document._otherAttributeIndexes[attributeName] = dict( _loadNodeIndex(nodeIndex, tags) )
+
+    for (fields, nodeIndex) in state['compositeIndexes'].items():
+        document._compositeIndexes[fields] = _loadNodeIndex(nodeIndex, tags)
+
+    # The text index is built at the first text search, as after parsing
+    if document.indexText is True:
+        document._textChangedTags = dict( [ (id(tag), tag) for tag in tags ] )
@@ -15,6 +15,7 @@ from collections import OrderedDict
 from .utils import escapeQuotes, tostr, isstr, stripWordsOnly
 from .conversions import convertToBooleanString
 from .constants import TAG_ITEM_BINARY_ATTRIBUTES_STRING_ATTR
+from .SubtreeSummary import onTagNamesChanged
 
 __all__ = ('SpecialAttributesDict', 'AttributeNode', 'AttributeNodeMap', 'StyleAttribute', 'DOMTokenList' )
 
@@ -24,6 +25,8 @@ class SpecialAttributesDict(dict):
         SpecialAttributesDict - A dictionary that supports the various special members, to allow javascript-like syntax
     '''
 
+    __slots__ = ('_tagRef', )
+
     # A dict that supports returning special members
     def __init__(self, tag):
         dict.__init__(self)
@@ -87,7 +90,8 @@ class SpecialAttributesDict(dict):
 
     def __setitem__(self, key, value):
 
-        key = key.lower()
+        if not key.islower():
+            key = key.lower()
 
         tag = self.tag
 
@@ -103,7 +107,18 @@ class SpecialAttributesDict(dict):
         elif key in TAG_ITEM_BINARY_ATTRIBUTES_STRING_ATTR:
             value = convertToBooleanString(value)
 
-        dict.__setitem__(self, key,  value)
+        # The summaries of the tags containing this one cover its attribute names
+        if tag is not None and not dict.__contains__(self, key):
+            onTagNamesChanged(tag)
+
+        # A document which indexes its tags (e.x. IndexedAdvancedHTMLParser) is told of the change
+        onAttributeChange = getattr(tag.ownerDocument, '_onAttributeChange', None) if tag is not None else None
+        if onAttributeChange is None:
+            dict.__setitem__(self, key,  value)
+        else:
+            oldValue = dict.get(self, key, None)
+            dict.__setitem__(self, key,  value)
+            onAttributeChange(tag, key, oldValue, value)
 
         return value
 
@@ -124,10 +139,16 @@ class SpecialAttributesDict(dict):
             return
         else:
             try:
-                return dict.__delitem__(self, key)
+                oldValue = dict.__getitem__(self, key)
+                dict.__delitem__(self, key)
             except KeyError:
                 return None
 
+            tag = self.tag
+            onAttributeChange = getattr(tag.ownerDocument, '_onAttributeChange', None) if tag is not None else None
+            if onAttributeChange is not None:
+                onAttributeChange(tag, key, oldValue, None)
+
 
     def __contains__(self, key):
         # Hack in 'class' here
@@ -167,8 +188,9 @@ class SpecialAttributesDict(dict):
             except:
                 pass
 
-        styleAttr = self.tag.style
-        if styleAttr.isEmpty() is False:
+        # Read the style directly, as the StyleAttribute is not created until first used
+        styleAttr = self.tag._style
+        if styleAttr is not None and styleAttr.isEmpty() is False:
             dict.__setitem__(self, "style", styleAttr)
         else:
             try:
@@ -411,6 +433,8 @@ class StyleAttribute(object):
 
     RESERVED_ATTRIBUTES = ('_styleValue', '_styleDict', '_asStr', '_ensureHtmlAttribute', 'tag', '_tagRef', 'setTag', 'isEmpty', 'setProperty')
 
+    __slots__ = ('_styleValue', '_styleDict', '_tagRef', '__weakref__')
+
     def __init__(self, styleValue, tag=None):
         '''
             __init__ - Create a StyleAttribute object.
@@ -532,12 +556,18 @@ class StyleAttribute(object):
 
         if tag:
             styleDict = self._styleDict
-            tagAttributes = tag._attributes
+            if styleDict:
+                tagAttributes = tag._attributes
+            else:
+                # Nothing to remove if the tag has not yet created its attributes dict
+                tagAttributes = tag._attributesDict
 
             # If this is called before we have _attributes setup
             if not issubclass(tagAttributes.__class__, SpecialAttributesDict):
                 return
 
+            hadStyle = dict.__contains__(tagAttributes, 'style')
+
             # If we have any styles set, ensure we have the style="whatever" in the HTML representation,
             #   otherwise ensure we don't have style=""
             if not styleDict:
@@ -545,6 +575,18 @@ class StyleAttribute(object):
             else: #if 'style' not in tagAttributes.keys():
                 tagAttributes._direct_set('style', self)
 
+            if not hadStyle and styleDict:
+                onTagNamesChanged(tag)
+
+            # A document which indexes its tags is told when the "style" attribute is added or removed
+            if hadStyle != bool(styleDict):
+                onAttributeChange = getattr(tag.ownerDocument, '_onAttributeChange', None)
+                if onAttributeChange is not None:
+                    if hadStyle:
+                        onAttributeChange(tag, 'style', self, None)
+                    else:
+                        onAttributeChange(tag, 'style', None, self)
+
 
     def isEmpty(self):
         '''
@@ -0,0 +1,186 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    SubtreeSummary - A summary, held by each AdvancedTag, of the names of the tags within it, so that searches
+      can skip the tags which can not contain a match.
+
+      A summary is an int of three parts:
+
+        A bitset of the tag names within the tag. Each of the first SUBTREE_SUMMARY_TAG_NAME_BITS tag names seen
+          (in this process) is given its own bit, after which tag names share bits by their hash.
+
+        A bloom filter of the class names within the tag, each class name setting a bit by its hash.
+
+        A bloom filter of the attribute names within the tag, likewise.
+
+      So if a bit is not set, no tag within has that name, and if it is set, a tag within may have that name.
+
+      The summary of a tag is built when the tag is closed while parsing, or when first needed, and is cleared (along
+        with those of the tags containing it) when a tag is added within it, or a tag within it gets a new name.
+        Removing a tag or a name does not clear it, as the summary still covers every name within the tag.
+
+      Summaries are not pickled, as the bits of names differ between processes.
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+__all__ = ('SUBTREE_SUMMARY_TAG_NAME_BITS', 'SUBTREE_SUMMARY_NAME_BITS', 'getTagNameBit', 'getClassNameBit', 'getAttributeNameBit',
+           'getNamesSummary', 'getSubtreeSummary', 'clearSubtreeSummary', 'onTagNamesChanged',
+)
+
+
+# SUBTREE_SUMMARY_TAG_NAME_BITS - The number of bits of a summary for tag names
+SUBTREE_SUMMARY_TAG_NAME_BITS = 64
+
+# SUBTREE_SUMMARY_NAME_BITS - The number of bits of a summary for class names, and again for attribute names
+SUBTREE_SUMMARY_NAME_BITS = 64
+
+# _CLASS_NAME_FIRST_BIT / _ATTRIBUTE_NAME_FIRST_BIT - Where the bits for class names and attribute names start
+_CLASS_NAME_FIRST_BIT = SUBTREE_SUMMARY_TAG_NAME_BITS
+_ATTRIBUTE_NAME_FIRST_BIT = SUBTREE_SUMMARY_TAG_NAME_BITS + SUBTREE_SUMMARY_NAME_BITS
+
+# _tagNameBits - Tag name -> its bit, for the first SUBTREE_SUMMARY_TAG_NAME_BITS tag names seen
+_tagNameBits = {}
+
+
+def getTagNameBit(tagName):
+    '''
+        getTagNameBit - Get the bit of a summary for a tag name
+
+            @param tagName <str> - The tag name
+
+            @return <int>
+    '''
+    bit = _tagNameBits.get(tagName, None)
+    if bit is None:
+        numTagNames = len(_tagNameBits)
+        if numTagNames < SUBTREE_SUMMARY_TAG_NAME_BITS:
+            # setdefault, so that if another thread has given this tag name a bit, that bit is used
+            bit = _tagNameBits.setdefault(tagName, 1 << numTagNames)
+        else:
+            bit = 1 << (hash(tagName) % SUBTREE_SUMMARY_TAG_NAME_BITS)
+
+    return bit
+
+def getClassNameBit(className):
+    '''
+        getClassNameBit - Get the bit of a summary for a class name
+
+            @param className <str> - A single class name
+
+            @return <int>
+    '''
+    return 1 << (_CLASS_NAME_FIRST_BIT + hash(className) % SUBTREE_SUMMARY_NAME_BITS)
+
+def getAttributeNameBit(attrName):
+    '''
+        getAttributeNameBit - Get the bit of a summary for an attribute name
+
+            @param attrName <lowercase str> - The attribute name
+
+            @return <int>
+    '''
+    return 1 << (_ATTRIBUTE_NAME_FIRST_BIT + hash(attrName) % SUBTREE_SUMMARY_NAME_BITS)
+
+def getNamesSummary(tag):
+    '''
+        getNamesSummary - Get the bits for the names of a tag itself: its tag name, class names, and attribute names
+
+            @param tag <AdvancedTag> - The tag
+
+            @return <int>
+    '''
+    getRaw = object.__getattribute__
+
+    summary = getTagNameBit(getRaw(tag, 'tagName'))
+
+    classNames = getRaw(tag, '_classNames')
+    if classNames:
+        for className in classNames:
+            summary |= getClassNameBit(className)
+        summary |= getAttributeNameBit('class')
+
+    attributes = getRaw(tag, '_attributesDict')
+    if attributes:
+        # Read the keys directly, as the keys() of the attributes dict regenerates the "class" and "style" attributes
+        for attrName in dict.keys(attributes):
+            summary |= getAttributeNameBit(attrName)
+
+    return summary
+
+def getSubtreeSummary(tag):
+    '''
+        getSubtreeSummary - Get the summary of the names of the tags within #tag (not including #tag itself),
+            building it (and that of each tag within without one) if needed.
+
+            @param tag <AdvancedTag> - The tag
+
+            @return <int> - The summary. If (summary & bits) != bits, no tag within #tag has all of the names of #bits
+    '''
+    getRaw = object.__getattribute__
+
+    summary = getRaw(tag, '_subtreeSummary')
+    if summary is not None:
+        return summary
+
+    setRaw = object.__setattr__
+
+    # Usually (e.x. as a tag is closed while parsing) each tag directly within has a summary
+    summary = 0
+    for child in tag.children:
+        childSummary = getRaw(child, '_subtreeSummary')
+        if childSummary is None:
+            break
+        summary |= childSummary | getNamesSummary(child)
+    else:
+        setRaw(tag, '_subtreeSummary', summary)
+        return summary
+
+    # Built bottom-up, without recursion. A tag with a summary has summaries for all the tags within it, so is not entered.
+    summaries = [ 0 ]
+    stack = [ (tag, iter(tag.children)) ]
+    while stack:
+        (parentTag, childIter) = stack[-1]
+
+        child = next(childIter, None)
+        if child is None:
+            stack.pop()
+            summary = summaries.pop()
+            setRaw(parentTag, '_subtreeSummary', summary)
+
+            if summaries:
+                summaries[-1] |= summary | getNamesSummary(parentTag)
+            continue
+
+        childSummary = getRaw(child, '_subtreeSummary')
+        if childSummary is None:
+            stack.append( (child, iter(child.children)) )
+            summaries.append(0)
+        else:
+            summaries[-1] |= childSummary | getNamesSummary(child)
+
+    return summary
+
+def clearSubtreeSummary(tag):
+    '''
+        clearSubtreeSummary - Clear the summary of #tag, and of the tags containing it, after a tag was added within #tag
+
+            @param tag <None/AdvancedTag> - The tag
+    '''
+    getRaw = object.__getattribute__
+    setRaw = object.__setattr__
+
+    # If a tag has no summary, neither do the tags containing it
+    while tag is not None and getRaw(tag, '_subtreeSummary') is not None:
+        setRaw(tag, '_subtreeSummary', None)
+        tag = getRaw(tag, 'parentNode')
+
+def onTagNamesChanged(tag):
+    '''
+        onTagNamesChanged - Clear the summaries of the tags containing #tag, after #tag got a new tag name, class name, or attribute name
+
+            @param tag <AdvancedTag> - The tag
+    '''
+    clearSubtreeSummary( object.__getattribute__(tag, 'parentNode') )
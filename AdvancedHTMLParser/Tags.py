@@ -10,6 +10,10 @@
 from collections import OrderedDict
 
 import copy
+import functools
+import itertools
+import os
+import random
 import re
 import uuid
 
@@ -22,11 +26,12 @@ from .constants import ( PREFORMATTED_TAGS, IMPLICIT_SELF_CLOSING_TAGS, TAG_NAME
 )
 
 from .SpecialAttributes import SpecialAttributesDict, StyleAttribute, AttributeNodeMap, DOMTokenList
+from .SubtreeSummary import getAttributeNameBit, getSubtreeSummary, clearSubtreeSummary, onTagNamesChanged
 
 from .utils import escapeQuotes, tostr, stripWordsOnly
 
-__all__ = ('AdvancedTag', 'uniqueTags', 'TagCollection', 'FilterableTagCollection', 'toggleAttributesDOM', 'isTextNode', \
-    'isTagNode', 'isValidAttributeName', \
+__all__ = ('AdvancedTag', 'uniqueTags', 'TagCollection', 'FilterableTagCollection', 'toggleAttributesDOM', 'toggleUuidUids', 'isTextNode', \
+    'isTagNode', 'isValidAttributeName', 'UID_TYPES', \
 )
 
 
@@ -121,12 +126,95 @@ def toggleAttributesDOM(isEnabled):
     else:
         AdvancedTag.attributes = AdvancedTag.attributesDict
 
+# UID_TYPES - The types a tag uid may be. An int, or a uuid.UUID if toggleUuidUids is enabled (or loaded from an older pickle)
+UID_TYPES = (int, uuid.UUID)
+
+# _nextIntUid - Generates the uid for each new tag, an integer which increases for each tag created in this process
+_nextIntUid = functools.partial(next, itertools.count(1))
+
+_generateUid = _nextIntUid
+
+# _uidOrigin - (pid, token) identifying the uids generated by this process, @see _getUidOrigin
+_uidOrigin = None
+
+def _getUidOrigin():
+    '''
+        _getUidOrigin - Get the value identifying which process generated the integer uids of tags in this process.
+
+            This is stored with pickled tags, so that uids created by another process (which may clash with ours) are
+              replaced when loaded. A forked process gets its own value.
+
+            @return tuple<int, int> - (pid, random token)
+    '''
+    global _uidOrigin
+
+    pid = os.getpid()
+    if _uidOrigin is None or _uidOrigin[0] != pid:
+        _uidOrigin = (pid, random.getrandbits(64))
+
+    return _uidOrigin
+
+def toggleUuidUids(isEnabled):
+    '''
+        toggleUuidUids - Toggle if tags created from now on are given a uuid.UUID as their uid (as prior to 9.1.0),
+            versus an integer which increases for each tag created in this process.
+
+            Integer uids are much cheaper to create, compare, and hash, and are the default.
+
+          @param isEnabled <bool> - If True, new tags will be given a random uuid (uuid.uuid4()). Otherwise, an integer.
+    '''
+    global _generateUid
+
+    if isEnabled:
+        _generateUid = uuid.uuid4
+    else:
+        _generateUid = _nextIntUid
+
 # ADVANCED_TAG_RAW_ATTRIBUTES - These are tags which are just raw attributes on AdvancedTag
 #   Used to optimize access
-ADVANCED_TAG_RAW_ATTRIBUTES = set( ['tagName', '_attributes', 'text', 'blocks', '_classNames', 'isSelfClosing',
-                                    'children', 'parentNode', 'ownerDocument', 'uid', '_indent']
+ADVANCED_TAG_RAW_ATTRIBUTES = set( ['tagName', '_attributesDict', 'text', 'blocks', '_classNames', 'isSelfClosing',
+                                    'children', 'parentNode', 'ownerDocument', 'uid', '_indent', '_style', '_text',
+                                    '_treeEnter', '_treeExit']
 )
 
+# _NO_CLASS_NAMES - Shared by every tag without a class name, until one is added
+_NO_CLASS_NAMES = ()
+
+# _NO_ATTRIBUTES - Shared (read-only) empty attributes, used when reading from a tag which has not yet created its attributes dict
+_NO_ATTRIBUTES = {}
+
+
+def _onTagChangedDocument(tag, oldDocument, newDocument):
+    '''
+        _onTagChangedDocument - Called when #tag (and all of its children) is moved from #oldDocument to #newDocument,
+            so that a document which indexes its tags (e.x. IndexedAdvancedHTMLParser) may update those indexes.
+
+            @param tag <AdvancedTag> - The tag which was added or removed
+
+            @param oldDocument <None/AdvancedHTMLParser> - The document #tag was associated with
+
+            @param newDocument <None/AdvancedHTMLParser> - The document #tag is now associated with
+    '''
+    onTagDetached = getattr(oldDocument, '_onTagDetached', None)
+    if onTagDetached is not None:
+        onTagDetached(tag)
+
+    onTagAttached = getattr(newDocument, '_onTagAttached', None)
+    if onTagAttached is not None:
+        onTagAttached(tag)
+
+def _onTagTextChanged(tag):
+    '''
+        _onTagTextChanged - Called when the text directly within #tag has changed,
+            so that a document which indexes the text of its tags (e.x. IndexedAdvancedHTMLParser) may update that index.
+
+            @param tag <AdvancedTag> - The tag whose text changed
+    '''
+    onTextChange = getattr(object.__getattribute__(tag, 'ownerDocument'), '_onTextChange', None)
+    if onTextChange is not None:
+        onTextChange(tag)
+
+
 class AdvancedTag(object):
     '''
         AdvancedTag - Represents a Tag. Used with AdvancedHTMLParser to create a DOM-model
@@ -136,6 +224,22 @@ class AdvancedTag(object):
         Use the getters and setters instead of attributes directly, or you may lose accounting.
     '''
 
+    # The members every tag has are held in slots, rather than a per-tag dict, for a compact representation.
+    #   __dict__ is still available for any other attribute assigned to a tag, but is only created when first used.
+    #
+    #   The attributes dict (_attributesDict) and StyleAttribute (_style) are None until first used,
+    #     see the "_attributes" and "style" properties.
+    #
+    #   _text is the cached value of the "text" property, or None when it must be joined again from the text blocks.
+    #
+    #   _treeEnter and _treeExit are the numbers given to this tag by a document which numbers its tree (IndexedAdvancedHTMLParser),
+    #     such that every tag within this one has numbers between them. Otherwise None.
+    #
+    #   _subtreeSummary is the summary of the names of the tags within this one, or None until built, see the SubtreeSummary module.
+    __slots__ = ('tagName', '_attributesDict', '_text', 'blocks', '_classNames', 'isSelfClosing',
+                 'children', 'parentNode', 'ownerDocument', 'uid', '_indent', '_style', '_treeEnter', '_treeExit', '_subtreeSummary',
+                 '__dict__', '__weakref__',
+    )
 
     def __init__(self, tagName, attrList=None, isSelfClosing=False, ownerDocument=None):
         '''
@@ -146,40 +250,48 @@ class AdvancedTag(object):
                 @param isSelfClosing - True if self-closing tag ( <tagName attrs /> ) will be set to False if text or children are added.
                 @param ownerDocument <None/AdvancedHTMLParser> - The parser (document) associated with this tag, or None for no association
         '''
-        self.tagName = tagName.lower()
-
         # Using this rawSet instead of __setattr__ (which is almost always an external-only interface)
         #   greatly increases performance
         rawSet = self.__rawSet
 
+        # The parser passes lowercase (and shared) names, so only lowercase (which always creates a new string) if needed
+        if not tagName.islower():
+            tagName = tagName.lower()
+        rawSet('tagName', tagName)
+
         if isSelfClosing is False and tagName in IMPLICIT_SELF_CLOSING_TAGS:
             isSelfClosing = True
 
 
         # Directly assign these attributes without running through the
         #   public __setattr__ code
-        rawSet('_attributes', SpecialAttributesDict(self))
 
-        # TODO: Can probably just use a cached / invalidated model for 'text' instead of a distinct property.
-        #         This could improve performance and memory usage both
-        rawSet('text', '')
+        # The attributes dict is created when first needed, see the "_attributes" property
+        rawSet('_attributesDict', None)
+
+        # The "text" property is derived from the text blocks, this is its cached value
+        rawSet('_text', '')
 
         rawSet('blocks', [''])
 
         # TODO: Maybe can refactor "children" into just being the "tagBlocks" from above?
         rawSet('children', [])
 
-        rawSet('_classNames', [])
+        rawSet('_classNames', _NO_CLASS_NAMES)
         rawSet('isSelfClosing', isSelfClosing)
         rawSet('parentNode', None)
         rawSet('ownerDocument', ownerDocument)
-        rawSet('uid', uuid.uuid4())
+        rawSet('uid', _generateUid())
 
         rawSet('_indent', '')
 
-        # Set up "style" attribute with special interactions
-        styleAttr = StyleAttribute('', self)
-        rawSet('style', styleAttr)
+        # The "style" attribute with special interactions is created when first needed, see the "style" property
+        rawSet('_style', None)
+
+        rawSet('_treeEnter', None)
+        rawSet('_treeExit', None)
+
+        rawSet('_subtreeSummary', None)
 
         # If provided with a list of attributes as tuple(name, value)
         #   then apply those.
@@ -187,7 +299,8 @@ class AdvancedTag(object):
             myAttributes = self._attributes
 
             for key, value in attrList:
-                key = key.lower()
+                if not key.islower():
+                    key = key.lower()
 
                 if not isValidAttributeName(key):
                     # Silently drop this invalid key -- symbol out of place, etc.
@@ -218,12 +331,36 @@ class AdvancedTag(object):
         #  NOTE: Investigate if we should intercept "classNames" here to modify "class" and "classList"
         #         (Probably will remain as-is, as it is not a standard property but specific to AdvancedHTMLParser
         if name in ADVANCED_TAG_RAW_ATTRIBUTES:
+            if name == 'tagName':
+                onTagNamesChanged(self)
+            elif name == 'children':
+                clearSubtreeSummary(self)
+
             return object.__setattr__(self, name, value)
 
         # Check for special "className"
         if name == "className":
             value = stripWordsOnly( tostr(value) )
-            object.__setattr__(self, '_classNames', [x for x in value.split(' ') if x])
+
+            # If created by a parser which shares strings, the class names are a tuple shared between
+            #   tags with the same "class" attribute, which is replaced with a list if modified (see addClass / removeClass)
+            ownerDocument = self.ownerDocument
+            internTable = getattr(ownerDocument, 'internTable', None)
+            if internTable is not None:
+                classNames = internTable.internClassNames(value)
+            else:
+                classNames = [x for x in value.split(' ') if x]
+
+            onAttributeChange = getattr(ownerDocument, '_onAttributeChange', None)
+            if onAttributeChange is not None:
+                oldValue = ' '.join(self._classNames)
+
+            object.__setattr__(self, '_classNames', classNames or _NO_CLASS_NAMES)
+            onTagNamesChanged(self)
+
+            if onAttributeChange is not None:
+                onAttributeChange(self, 'class', oldValue, value)
+
             return value
 
         # Check if this is one of the special items which map directly to attributes
@@ -274,20 +411,20 @@ class AdvancedTag(object):
 
             # Check that we aren't trying to assign our own style to ourself to prevent
             #   a copy when we shouldn't and other bad stuff
-            if id(value) != id(self.style):
+            oldStyle = self.__rawGet('_style')
+            if id(value) != id(oldStyle):
                 # This will perform a copy if we have a StyleAttribute already, else
                 #   convert a style string to a StyleAttribute object
                 value = StyleAttribute(value, self)
 
                 # Disassociate the old StyleAttribute from this tag
-                oldStyle = self.__rawGet('style')
                 if issubclass(oldStyle.__class__, StyleAttribute):
                     oldStyle.setTag(None)
 
-            ret = object.__setattr__(self, 'style', value)
+            ret = object.__setattr__(self, '_style', value)
 
             # Adjust the presence of the style="..." in the html attributes
-            self.style._ensureHtmlAttribute()
+            value._ensureHtmlAttribute()
 
             return ret
 
@@ -386,6 +523,59 @@ class AdvancedTag(object):
         return object.__setattr__(self, name, value)
 
 
+    @property
+    def _attributes(self):
+        '''
+            _attributes - Property, the SpecialAttributesDict holding the attributes of this tag.
+
+                This is created the first time it is used, so that tags without attributes do not carry one.
+
+                  @see _getAttributesForRead to read the attributes without creating this dict
+
+                  @return <SpecialAttributesDict>
+        '''
+        myAttributes = object.__getattribute__(self, '_attributesDict')
+        if myAttributes is None:
+            myAttributes = SpecialAttributesDict(self)
+            object.__setattr__(self, '_attributesDict', myAttributes)
+
+        return myAttributes
+
+    def _getAttributesForRead(self):
+        '''
+            _getAttributesForRead - INTERNAL - Get the attributes of this tag for reading only.
+
+                If no attributes dict has been created and there are no class names, this returns a shared empty dict
+                  instead of creating one, which must NOT be modified.
+
+                  @return <SpecialAttributesDict/dict> - The attributes of this tag
+        '''
+        myAttributes = object.__getattribute__(self, '_attributesDict')
+        if myAttributes is None:
+            if not object.__getattribute__(self, '_classNames'):
+                return _NO_ATTRIBUTES
+
+            return self._attributes
+
+        return myAttributes
+
+    @property
+    def style(self):
+        '''
+            style - Property, the StyleAttribute for the "style" attribute of this tag.
+
+                This is created the first time it is used. Assign a string or StyleAttribute to change.
+
+                  @return <StyleAttribute>
+        '''
+        styleAttr = object.__getattribute__(self, '_style')
+        if styleAttr is None:
+            styleAttr = StyleAttribute('', self)
+            object.__setattr__(self, '_style', styleAttr)
+
+        return styleAttr
+
+
     def cloneNode(self):
         '''
             cloneNode - Clone this node (tag name and attributes). Does not clone children.
@@ -409,6 +599,7 @@ class AdvancedTag(object):
         state['attributesList'] = getSelfAttr('getAttributesList')()
         state['isSelfClosing'] = getSelfAttr('isSelfClosing')
         state['uid'] = getSelfAttr('uid')
+        state['uidOrigin'] = _getUidOrigin()
         state['ownerDocument'] = getSelfAttr('ownerDocument')
 
         # "blocks" attribute covers both text and children
@@ -427,8 +618,11 @@ class AdvancedTag(object):
         __init__ = object.__getattribute__(AdvancedTag, '__init__')
         __init__(self, tagName=state['tagName'], attrList=state['attributesList'], isSelfClosing=state['isSelfClosing'])
 
-        # Copy the uid onto this object
-        self.uid = state['uid']
+        # Copy the uid onto this object, if it was created in this process.
+        #   Otherwise (as it may clash with a tag created here) this keeps the new uid assigned by __init__
+        uid = state['uid']
+        if state.get('uidOrigin', None) == _getUidOrigin() or isinstance(uid, uuid.UUID):
+            self.uid = uid
 
         # Set the ownerDocument
         self.ownerDocument = state['ownerDocument']
@@ -453,16 +647,48 @@ class AdvancedTag(object):
         #        myAttributes._direct_set(key, value)
 
 
+    @property
+    def text(self):
+        '''
+            text - Property, the text directly within this tag (i.e. not within child tags), as one string.
+
+                This is joined from the text blocks when first accessed after a change, and cached.
+
+                  @return <str> - The text
+        '''
+        text = object.__getattribute__(self, '_text')
+        if text is None:
+            text = ''.join([thisBlock for thisBlock in self.blocks if not issubclass(thisBlock.__class__, AdvancedTag)])
+            object.__setattr__(self, '_text', text)
+
+        return text
+
+    @text.setter
+    def text(self, value):
+        object.__setattr__(self, '_text', value)
+
+        _onTagTextChanged(self)
+
+
     def appendText(self, text):
         '''
             appendText - append some inner text
         '''
-        # self.text is just raw string of the text
-        self.text += text
-        self.isSelfClosing = False # inner text means it can't self close anymo
         # self.blocks is either text or tags, in order of appearance
         self.blocks.append(text)
 
+        # Rather than concatenating onto self.text with every block (quadratic for many small blocks,
+        #   e.x. entities while parsing), the text is joined again when next accessed.
+        if object.__getattribute__(self, '_text') == '':
+            # No text before this, so this block is the text
+            self._text = text
+        else:
+            self._text = None
+
+        _onTagTextChanged(self)
+
+        self.isSelfClosing = False # inner text means it can't self close anymo
+
 
     def removeText(self, text):
         '''
@@ -497,8 +723,11 @@ class AdvancedTag(object):
                 blocks[i] = block.replace(text, '')
                 break # remove should only remove FIRST occurace, per other methods
 
-        # Regenerate the "text" property
-        self.text = ''.join([thisBlock for thisBlock in blocks if not issubclass(thisBlock.__class__, AdvancedTag)])
+        # The "text" property will be regenerated on next access
+        self._text = None
+
+        if removedBlock is not None:
+            _onTagTextChanged(self)
 
         # Return None if no match, otherwise the text previously within the block we removed #text from
         return removedBlock
@@ -537,8 +766,11 @@ class AdvancedTag(object):
                 blocks[i] = block.replace(text, '')
 
 
-        # Regenerate self.text
-        self.text = ''.join([thisBlock for thisBlock in blocks if not issubclass(thisBlock.__class__, AdvancedTag)])
+        # The "text" property will be regenerated on next access
+        self._text = None
+
+        if removedBlocks:
+            _onTagTextChanged(self)
 
         return removedBlocks
 
@@ -547,9 +779,6 @@ class AdvancedTag(object):
         '''
             remove - Will remove this node from its parent, if it has a parent (thus taking it out of the HTML tree)
 
-                NOTE: If you are using an IndexedAdvancedHTMLParser, calling this will NOT update the index. You MUST call
-                  reindex method manually.
-
             @return <bool> - While JS DOM defines no return for this function, this function will return True if a
                remove did happen, or False if no parent was set.
         '''
@@ -592,6 +821,30 @@ class AdvancedTag(object):
         if child is None:
             raise KeyError('appendChild passed non-element')
 
+        oldDocument = self._associateChild(child)
+
+        # Append to both "children" and "blocks"
+        self.children.append(child)
+        self.blocks.append(child)
+
+        if oldDocument is not self.ownerDocument:
+            _onTagChangedDocument(child, oldDocument, self.ownerDocument)
+
+        return child
+
+    # appendNode - alias of appendChild
+    appendNode = appendChild
+
+    def _associateChild(self, child):
+        '''
+            _associateChild - Associate a tag being added as a child to this tag, and #child and all of its children to our document
+
+                @param child <AdvancedTag> - The child being added
+
+                @return <None/AdvancedHTMLParser> - The document #child was associated with before
+        '''
+        oldDocument = child.ownerDocument
+
         # Associate parentNode of #child to this tag
         child.parentNode = self
 
@@ -605,13 +858,9 @@ class AdvancedTag(object):
         # Our tag cannot be self-closing if we have a child tag
         self.isSelfClosing = False
 
-        # Append to both "children" and "blocks"
-        self.children.append(child)
-        self.blocks.append(child)
-        return child
+        clearSubtreeSummary(self)
 
-    # appendNode - alias of appendChild
-    appendNode = appendChild
+        return oldDocument
 
 
     def appendBlock(self, block):
@@ -706,10 +955,18 @@ class AdvancedTag(object):
             # Clear parent node association on child
             child.parentNode = None
 
+            # The summary would still cover the names within, but is cleared so later searches may skip more
+            clearSubtreeSummary(self)
+
             # Clear document reference on removed child and all children thereof
+            oldDocument = child.ownerDocument
             child.ownerDocument = None
             for subChild in child.getAllChildNodes():
                 subChild.ownerDocument = None
+
+            if oldDocument is not None:
+                _onTagChangedDocument(child, oldDocument, None)
+
             return child
         except ValueError:
             # TODO: What circumstances cause this to be raised? Is it okay to have a partial remove?
@@ -790,12 +1047,23 @@ class AdvancedTag(object):
             # #beforeChild is not a child of this element. Raise error.
             raise ValueError('Provided "beforeChild" is not a child of element, cannot insert.')
 
+        if isChildTag:
+            oldDocument = self._associateChild(child)
+
         # Add to blocks in the right spot
         self.blocks = myBlocks[:blocksIdx] + [child] + myBlocks[blocksIdx:]
         # Add to child in the right spot
         if isChildTag:
             self.children = myChildren[:childrenIdx] + [child] + myChildren[childrenIdx:]
 
+            if oldDocument is not self.ownerDocument:
+                _onTagChangedDocument(child, oldDocument, self.ownerDocument)
+        else:
+            # Inserted a text block, "text" will be regenerated on next access
+            self._text = None
+
+            _onTagTextChanged(self)
+
         return child
 
     def insertAfter(self, child, afterChild):
@@ -827,11 +1095,22 @@ class AdvancedTag(object):
         except ValueError:
             raise ValueError('Provided "afterChild" is not a child of element, cannot insert.')
 
+        if isChildTag:
+            oldDocument = self._associateChild(child)
+
         # Append child to requested spot
         self.blocks = myBlocks[:blocksIdx+1] + [child] + myBlocks[blocksIdx+1:]
         if isChildTag:
             self.children = myChildren[:childrenIdx+1] + [child] + myChildren[childrenIdx+1:]
 
+            if oldDocument is not self.ownerDocument:
+                _onTagChangedDocument(child, oldDocument, self.ownerDocument)
+        else:
+            # Inserted a text block, "text" will be regenerated on next access
+            self._text = None
+
+            _onTagTextChanged(self)
+
         return child
 
 
@@ -1225,14 +1504,27 @@ class AdvancedTag(object):
 
             @return <bool> - True if #other appears anywhere beneath or is this tag, otherwise False
         '''
-        return self.containsUid(other.uid)
+        ownerDocument = self.ownerDocument
+        if ownerDocument is not None and other.ownerDocument is ownerDocument:
+            # The document may be able to check this without walking the tree (e.x. IndexedAdvancedHTMLParser)
+            hasTagInParentLine = getattr(ownerDocument, '_hasTagInParentLine', None)
+            if hasTagInParentLine is not None:
+                return hasTagInParentLine(other, self)
+
+        # Walk up from #other, rather than searching everything beneath this tag
+        while other is not None:
+            if other is self:
+                return True
+            other = other.parentNode
+
+        return False
 
 
     def containsUid(self, uid):
         '''
             containsUid - Check if the uid (unique internal ID) appears anywhere as a direct child to this node, or the node itself.
 
-                @param uid <uuid.UUID> - uuid to check
+                @param uid <int/uuid.UUID> - uid to check
 
             @return <bool> - True if #uid is this node's uid, or is the uid of any children at any level down
         '''
@@ -1292,7 +1584,7 @@ class AdvancedTag(object):
 
               For performing "contains node" kind of logic, this is more efficent than copying the entire nodeset
 
-            @return set<uuid.UUID> A set of uuid objects
+            @return set<int/uuid.UUID> A set of uids
         '''
         ret = set()
 
@@ -1309,7 +1601,7 @@ class AdvancedTag(object):
         '''
             getAllNodeUids - Returns all the unique internal IDs from getAllChildNodeUids, but also includes this tag's uid
 
-            @return set<uuid.UUID> A set of uuid objects
+            @return set<int/uuid.UUID> A set of uids
         '''
         # Start with a set including this tag's uuid
         ret = { self.uid }
@@ -1423,14 +1715,15 @@ class AdvancedTag(object):
         '''
             getUid - Get the AdvancedHTMLParser unique id for this tag.
 
-                Each tag is given a generated uuid at create time, and copies also get their own unique identifier.
+                Each tag is given a unique integer at create time (increasing for each tag created in this process),
+                  and copies also get their own unique identifier. A tag loaded from a pickle created by another process is given a new uid.
 
                 This can be used to determine if two tags are the same tag, beyond just having equal attribute name/value pairs and children.
 
                 This is used internally to prevent duplicates, for example a TagCollection does not allow multiple tags with the same uid
 
-                @return - uuid.UUID object, representing a uuid as specified by RFC 4122, version 4.
-                   This object is optimized for comparison. For a string representation, str() the result, or use .hex or .variant
+                @return <int/uuid.UUID> - The uid. This is an int, unless toggleUuidUids(True) was called before the tag was created,
+                   in which case it is a uuid.UUID object, representing a uuid as specified by RFC 4122, version 4.
         '''
         return self.uid
 
@@ -1450,7 +1743,7 @@ class AdvancedTag(object):
         '''
         attributeStrings = []
         # Get all attributes as a tuple (name<str>, value<str>)
-        for name, val in self._attributes.items():
+        for name, val in self._getAttributesForRead().items():
             # Get all attributes
             if val:
                 val = tostr(val)
@@ -1545,10 +1838,17 @@ class AdvancedTag(object):
             getAttribute - Gets an attribute on this tag. Be wary using this for classname, maybe use addClass/removeClass. Attribute names are all lowercase.
                 @return - The attribute value, or None if none exists.
         '''
+        myAttributes = object.__getattribute__(self, '_attributesDict')
+        if myAttributes is None:
+            if attrName.lower() in ('class', 'style'):
+                myAttributes = self._attributes
+            else:
+                # No attributes have been set on this tag (besides maybe class names)
+                myAttributes = _NO_ATTRIBUTES
 
         if attrName in TAG_ITEM_BINARY_ATTRIBUTES:
-            if attrName in self._attributes:
-                attrVal = self._attributes[attrName]
+            if attrName in myAttributes:
+                attrVal = myAttributes[attrName]
                 if not attrVal:
                     return True # Empty valued binary attribute
 
@@ -1556,7 +1856,7 @@ class AdvancedTag(object):
             else:
                 return False
         else:
-            return self._attributes.get(attrName, defaultValue)
+            return myAttributes.get(attrName, defaultValue)
 
 
     def getAttributesList(self):
@@ -1570,7 +1870,7 @@ class AdvancedTag(object):
 
                 This is suitable for passing back into AdvancedTag when creating a new tag.
         '''
-        return [ (tostr(name)[:], tostr(value)[:]) for name, value in self._attributes.items() ]
+        return [ (tostr(name)[:], tostr(value)[:]) for name, value in self._getAttributesForRead().items() ]
 
 
     def getAttributesDict(self):
@@ -1583,7 +1883,7 @@ class AdvancedTag(object):
               @return <dict ( str(name), str(value) )> - A dict of attrName to attrValue , all as strings and copies.
         '''
 
-        return { tostr(name)[:] : tostr(value)[:] for name, value in self._attributes.items() }
+        return { tostr(name)[:] : tostr(value)[:] for name, value in self._getAttributesForRead().items() }
 
 
     def setAttribute(self, attrName, attrValue):
@@ -1629,7 +1929,7 @@ class AdvancedTag(object):
         attrName = attrName.lower()
 
         # Check if requested attribute is present on this node
-        return bool(attrName in self._attributes)
+        return bool(attrName in self._getAttributesForRead())
 
     def removeAttribute(self, attrName):
         '''
@@ -1640,6 +1940,10 @@ class AdvancedTag(object):
         '''
         attrName = attrName.lower()
 
+        if object.__getattribute__(self, '_attributesDict') is None and attrName != 'class':
+            # No attributes have been set, so nothing to remove
+            return
+
         # Delete provided attribute name ( #attrName ) from attributes map
         try:
             del self._attributes[attrName]
@@ -1680,9 +1984,21 @@ class AdvancedTag(object):
         if className in myClassNames:
             return
 
+        oldValue = ' '.join(myClassNames)
+
+        if myClassNames.__class__ is not list:
+            # Shared class names (or the shared empty sentinel), so this tag needs its own list
+            myClassNames = list(myClassNames)
+            object.__setattr__(self, '_classNames', myClassNames)
+
         # Regenerate "classNames" and "class" attr.
         #   TODO: Maybe those should be properties?
         myClassNames.append(className)
+        onTagNamesChanged(self)
+
+        onAttributeChange = getattr(self.ownerDocument, '_onAttributeChange', None)
+        if onAttributeChange is not None:
+            onAttributeChange(self, 'class', oldValue, ' '.join(myClassNames))
 
         return None
 
@@ -1712,9 +2028,19 @@ class AdvancedTag(object):
         if className not in myClassNames:
             return None
 
+        oldValue = ' '.join(myClassNames)
+
+        if myClassNames.__class__ is not list:
+            # Shared class names, so this tag needs its own list
+            myClassNames = list(myClassNames)
+            object.__setattr__(self, '_classNames', myClassNames)
 
         myClassNames.remove(className)
 
+        onAttributeChange = getattr(self.ownerDocument, '_onAttributeChange', None)
+        if onAttributeChange is not None:
+            onAttributeChange(self, 'class', oldValue, ' '.join(myClassNames))
+
         return className
 
 
@@ -1910,7 +2236,7 @@ class AdvancedTag(object):
 
         # Check if we need to match against any other names
         if len(classNames) > 0:
-            elements = [ em for em in elements for matchClassName in classNames  if matchClassName in em.classList ]
+            elements = [ em for em in elements if all( [ matchClassName in em.classNames for matchClassName in classNames ] ) ]
 
         return TagCollection(elements)
 
@@ -1925,10 +2251,17 @@ class AdvancedTag(object):
         '''
         elements = []
 
+        # Unless a tag without the attribute may match, only the children with the attribute within them are searched
+        if None in attrValues or attrName in TAG_ITEM_BINARY_ATTRIBUTES:
+            summaryBit = 0
+        else:
+            summaryBit = getAttributeNameBit(attrName)
+
         for child in self.children:
             if child.getAttribute(attrName) in attrValues:
                 elements.append(child)
-            elements += child.getElementsWithAttrValues(attrName, attrValues)
+            if getSubtreeSummary(child) & summaryBit == summaryBit:
+                elements += child.getElementsWithAttrValues(attrName, attrValues)
         return TagCollection(elements)
 
 
@@ -2130,8 +2463,8 @@ class AdvancedTag(object):
             if self.tagName != other.tagName:
                 return False
 
-            myAttributes = self._attributes
-            otherAttributes = other._attributes
+            myAttributes = self._getAttributesForRead()
+            otherAttributes = other._getAttributesForRead()
 
             attributeKeysSelf = list(myAttributes.keys())
             attributeKeysOther = list(otherAttributes.keys())
@@ -2339,6 +2672,18 @@ class TagCollection(list):
         return self
 
 
+    def __setstate__(self, state):
+        '''
+            __setstate__ - Set state when loading pickle
+
+                The uids of tags loaded from another process are replaced (@see AdvancedTag.__setstate__),
+                  so the uids are collected again from the loaded tags.
+
+                @param state <dict>
+        '''
+        self.__dict__.update(state)
+        self.uids = set( [ tag.uid for tag in self ] )
+
     def _hasTag(self, tag):
         return tag.uid in self.uids
 
@@ -2580,7 +2925,7 @@ class TagCollection(list):
         '''
             getAllNodeUids - Gets all the internal uids of all nodes, their children, and all their children so on..
 
-              @return set<uuid.UUID>
+              @return set<int/uuid.UUID>
         '''
         ret = set()
 
@@ -2613,7 +2958,7 @@ class TagCollection(list):
               as themselves or as a child, any number of levels down.
 
 
-            @param uid <uuid.UUID> - uuid of interest
+            @param uid <int/uuid.UUID> - uid of interest
 
             @return <bool> - True if contained, otherwise False
         '''
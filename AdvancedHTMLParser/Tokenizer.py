@@ -0,0 +1,243 @@
+'''
+    Copyright (c) 2015, 2017, 2019 Tim Savannah  under terms of LGPLv3. All Rights Reserved.
+
+    See LICENSE (https://gnu.org/licenses/lgpl-3.0.txt) for more information.
+
+
+    Tokenizer - Backends which scan html and call the handle_* methods on a parser
+
+      The tokenizer is selected per parser, e.x.
+
+        parser = AdvancedHTMLParser.AdvancedHTMLParser(tokenizer=AdvancedHTMLParser.RegexTokenizer)
+'''
+# vim: set ts=4 sw=4 st=4 expandtab :
+
+import re
+
+# Python 2/3 compatibility:
+try:
+    from HTMLParser import HTMLParser
+    unescape = HTMLParser().unescape
+except ImportError:
+    from html.parser import HTMLParser
+    from html import unescape
+
+__all__ = ('HTMLParserTokenizer', 'RegexTokenizer', 'FAST_TOKEN_RE', 'FAST_ATTRIBUTE_RE')
+
+
+class HTMLParserTokenizer(object):
+    '''
+        HTMLParserTokenizer - The default tokenizer, which uses the standard library html.parser machinery
+    '''
+
+    def __init__(self, parser):
+        '''
+            __init__ - Create a tokenizer for the given parser
+
+                @param parser <AdvancedHTMLParser> - The parser whose handle_* methods will be called
+        '''
+        self.parser = parser
+
+    def feed(self, data):
+        '''
+            feed - Tokenize #data. Any incomplete construct at the end is held until the next feed or #close
+
+                @param data <str> - The html to feed
+        '''
+        HTMLParser.feed(self.parser, data)
+
+    def close(self):
+        '''
+            close - Handle any data held from previous calls to #feed
+        '''
+        HTMLParser.close(self.parser)
+
+
+# FAST_TOKEN_RE - Matches the common constructs: runs of text, simple start tags, end tags, and terminated entity/char references.
+#
+#   Everything this matches is tokenized exactly as html.parser would, but with a single match.
+#     Start tags are restricted to well-formed attributes (each preceded by whitespace, with quoted or plain values),
+#     anything else is passed to the html.parser methods.
+FAST_TOKEN_RE = re.compile(r'''
+    (?P<text>[^<&]+)
+  | (?P<starttag>
+        <(?P<tagName>[a-zA-Z][-a-zA-Z0-9]*)
+        (?P<attributes>(?:\s+[a-zA-Z_:][-a-zA-Z0-9_:.]*(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'=<>`]+))?)*)
+        \s*(?P<selfClosing>/?)>
+    )
+  | (?P<endtag></\s*(?P<endTagName>[a-zA-Z][-.a-zA-Z0-9:_]*)\s*>)
+  | (?P<entityref>&(?P<entityName>[a-zA-Z][-.a-zA-Z0-9]*)(?:;|(?=[^a-zA-Z0-9])))
+  | (?P<charref>&\#(?P<charRefName>[0-9]+|[xX][0-9a-fA-F]+)(?:;|(?=[^0-9a-fA-F])))
+''', re.VERBOSE)
+
+# FAST_ATTRIBUTE_RE - Splits the "attributes" group of a FAST_TOKEN_RE start tag into (name, "=" if a value is present, value)
+FAST_ATTRIBUTE_RE = re.compile(r'''\s+([a-zA-Z_:][-a-zA-Z0-9_:.]*)(?:\s*(=)\s*("[^"]*"|'[^']*'|[^\s"'=<>`]+))?''')
+
+# Same as html.parser, for the constructs which fall back to it
+STARTTAGOPEN_RE = re.compile('<[a-zA-Z]')
+INCOMPLETE_RE = re.compile('&[a-zA-Z#]')
+
+
+class RegexTokenizer(HTMLParserTokenizer):
+    '''
+        RegexTokenizer - A faster tokenizer which handles the common constructs with a single precompiled regular expression
+            (@see FAST_TOKEN_RE), and passes anything else (comments, declarations, unusual start tags, script/style contents)
+            to the html.parser methods, so the resulting events are the same as with HTMLParserTokenizer.
+
+            Line and column positions (parser.getpos()) are not tracked.
+    '''
+
+    def feed(self, data):
+        parser = self.parser
+        parser.rawdata = parser.rawdata + data
+        self._goahead(False)
+
+    def close(self):
+        self._goahead(True)
+
+    def _goahead(self, end):
+        '''
+            _goahead - Tokenize as much of parser.rawdata as possible, leaving any incomplete construct in parser.rawdata.
+                This follows HTMLParser.goahead (with convert_charrefs=False), with a fast path for FAST_TOKEN_RE.
+
+                @param end <bool> - If True, this is the end of the document and everything remaining is handled.
+        '''
+        parser = self.parser
+
+        rawdata = parser.rawdata
+        i = 0
+        n = len(rawdata)
+
+        matchFastToken = FAST_TOKEN_RE.match
+        findAllAttributes = FAST_ATTRIBUTE_RE.findall
+
+        handle_starttag = parser.handle_starttag
+        handle_startendtag = parser.handle_startendtag
+        handle_endtag = parser.handle_endtag
+        handle_data = parser.handle_data
+        handle_entityref = parser.handle_entityref
+        handle_charref = parser.handle_charref
+
+        cdataContentElements = parser.CDATA_CONTENT_ELEMENTS
+
+        while i < n:
+            if parser.cdata_elem is None:
+                match = matchFastToken(rawdata, i)
+                if match is not None:
+                    tokenType = match.lastgroup
+
+                    if tokenType == 'text':
+                        handle_data(match.group('text'))
+
+                    elif tokenType == 'starttag':
+                        tagName = match.group('tagName').lower()
+
+                        attributes = match.group('attributes')
+                        if attributes:
+                            attributeList = []
+                            for (attrName, hasValue, attrValue) in findAllAttributes(attributes):
+                                if not hasValue:
+                                    attrValue = None
+                                else:
+                                    if attrValue[0] in ('"', "'"):
+                                        attrValue = attrValue[1:-1]
+                                    if '&' in attrValue:
+                                        attrValue = unescape(attrValue)
+
+                                attributeList.append( (attrName.lower(), attrValue) )
+                        else:
+                            attributeList = []
+
+                        if match.group('selfClosing'):
+                            handle_startendtag(tagName, attributeList)
+                        else:
+                            handle_starttag(tagName, attributeList)
+                            if tagName in cdataContentElements:
+                                parser.set_cdata_mode(tagName)
+
+                    elif tokenType == 'endtag':
+                        handle_endtag(match.group('endTagName').lower())
+
+                    elif tokenType == 'entityref':
+                        handle_entityref(match.group('entityName'))
+
+                    else:
+                        handle_charref(match.group('charRefName'))
+
+                    i = match.end()
+                    continue
+
+                # Not a fast token, so must be at a "<" or "&"
+
+            else:
+                # Within script/style, contents are data up until the matching end tag
+                match = parser.interesting.search(rawdata, i)
+                if match is None:
+                    break
+
+                j = match.start()
+                if i < j:
+                    handle_data(rawdata[i:j])
+                i = j
+
+            startswith = rawdata.startswith
+
+            if startswith('<', i):
+                if STARTTAGOPEN_RE.match(rawdata, i):
+                    k = parser.parse_starttag(i)
+                elif startswith('</', i):
+                    k = parser.parse_endtag(i)
+                elif startswith('<!--', i):
+                    k = parser.parse_comment(i)
+                elif startswith('<?', i):
+                    k = parser.parse_pi(i)
+                elif startswith('<!', i):
+                    k = parser.parse_html_declaration(i)
+                elif (i + 1) < n:
+                    handle_data('<')
+                    k = i + 1
+                else:
+                    break
+
+                if k < 0:
+                    if not end:
+                        break
+                    k = rawdata.find('>', i + 1)
+                    if k < 0:
+                        k = rawdata.find('<', i + 1)
+                        if k < 0:
+                            k = i + 1
+                    else:
+                        k += 1
+                    handle_data(rawdata[i:k])
+                i = k
+
+            elif startswith('&#', i):
+                # A terminated char reference would have been a fast token
+                if ';' in rawdata[i:]:
+                    # bail by consuming &#
+                    handle_data(rawdata[i:i+2])
+                    i = i + 2
+                break
+
+            else:
+                # startswith('&', i), and a terminated entity reference would have been a fast token
+                if INCOMPLETE_RE.match(rawdata, i):
+                    if end and len(rawdata) - i == 2:
+                        i = i + 1
+                    # incomplete
+                    break
+                elif (i + 1) < n:
+                    # not the end of the buffer, and can't be confused with some other construct
+                    handle_data('&')
+                    i = i + 1
+                else:
+                    break
+
+        if end and i < n and parser.cdata_elem is None:
+            handle_data(rawdata[i:n])
+            i = n
+
+        parser.rawdata = rawdata[i:]
+
+# vim: set ts=4 sw=4 st=4 expandtab :
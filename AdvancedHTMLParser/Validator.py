@@ -52,6 +52,10 @@ class ValidatingAdvancedHTMLParser(AdvancedHTMLParser):
         '''
             Internal for parsing
         '''
+        if self.keepFilter is not None and self._handleSkippedEndTag(tagName):
+            # Elements which are not kept are not validated
+            return
+
         inTag = self._inTag
         if len(inTag) == 0:
             # Attempted to close, but no open tags
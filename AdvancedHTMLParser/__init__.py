@@ -12,11 +12,18 @@
 # In general below, all "tag names" (body, div, etc) should be lowercase. The parser will lowercase internally. All attribute names (like `id` in id="123") provided to search functions should be lowercase. Values are not lowercase. This is because doing tons of searches, lowercasing every search can quickly build up. Lowercase it once in your code, not every time you call a function.
 
 from .Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
-from .Tags import AdvancedTag, TagCollection, toggleAttributesDOM, isTextNode, isTagNode
+from .Tags import AdvancedTag, TagCollection, toggleAttributesDOM, toggleUuidUids, isTextNode, isTagNode
 from .Formatter import AdvancedHTMLFormatter, AdvancedHTMLMiniFormatter, AdvancedHTMLSlimTagFormatter, AdvancedHTMLSlimTagMiniFormatter
 from .Validator import ValidatingAdvancedHTMLParser
 from .exceptions import InvalidCloseException, MissedCloseException, HTMLValidationException, MultipleRootNodeException
 from .SpecialAttributes import StyleAttribute
+from .Batch import ParseResult
+from .Tokenizer import HTMLParserTokenizer, RegexTokenizer
+from .Lazy import LazyAdvancedHTMLParser, LazyAdvancedTag
+from .KeepFilter import KeepFilter
+from .Frozen import FrozenDocument, FrozenTag
+from .Intern import InternTable
+from .Adaptive import AdaptiveAdvancedHTMLParser
 
 __version__ = '9.0.2'
 __version_tuple__ = ('9', '0', '2')
@@ -24,7 +31,9 @@ __int_version_tuple__ = (9, 0, 2)
 
 __all__ = ( 'AdvancedHTMLParser', 'IndexedAdvancedHTMLParser', 'AdvancedHTMLFormatter', 'AdvancedTag', 'TagCollection',
     'ValidatingAdvancedHTMLParser', 'MissedCloseException', 'InvalidCloseException', 'HTMLValidationException', 'MultipleRootNodeException',
-    'StyleAttribute', 'toggleAttributesDOM', 'isTextNode', 'isTagNode',
-    'AdvancedHTMLMiniFormatter', 'AdvancedHTMLSlimTagFormatter', 'AdvancedHTMLSlimTagMiniFormatter' )
+    'StyleAttribute', 'toggleAttributesDOM', 'toggleUuidUids', 'isTextNode', 'isTagNode',
+    'AdvancedHTMLMiniFormatter', 'AdvancedHTMLSlimTagFormatter', 'AdvancedHTMLSlimTagMiniFormatter', 'ParseResult',
+    'HTMLParserTokenizer', 'RegexTokenizer', 'LazyAdvancedHTMLParser', 'LazyAdvancedTag', 'KeepFilter',
+    'FrozenDocument', 'FrozenTag', 'InternTable', 'AdaptiveAdvancedHTMLParser' )
 
 #vim: set ts=4 sw=4 expandtab
@@ -7,12 +7,13 @@
     Some misc utils and regular expressions
 '''
 
+import codecs
 import sys
 import re
 
 __all__ = ('IE_CONDITIONAL_PATTERN', 'END_HTML', 'START_HTML', 'DOCTYPE_MATCH',
     'stripIEConditionals', 'addStartTag', 'escapeQuotes', 'unescapeQuotes', 'tostr', 'isstr',
-    'stripWordsOnly',
+    'stripWordsOnly', 'ENCODING_SNIFF_SIZE', 'sniffEncoding', 'TEXT_WORD_RE', 'getTextWords', 'containsWords',
 )
 
 IE_CONDITIONAL_PATTERN = re.compile('[<][!][-][-][ \t\r\n]*[\[][ \t\r\n]*if.*-->', re.MULTILINE)
@@ -27,6 +28,39 @@ WORDS_ONLY_RE = re.compile('[ ][ ]+')
 def stripWordsOnly(contents):
     return WORDS_ONLY_RE.sub(' ', contents.strip())
 
+# TEXT_WORD_RE - Matches a word within text, as used for text searches (e.x. AdvancedHTMLParser.getElementsByText)
+TEXT_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+def getTextWords(text):
+    '''
+        getTextWords - Split text into lowercase words, for text searches
+
+        @param text <str> - Some text
+
+        @return list<str> - The lowercased words in #text, in order
+    '''
+    return TEXT_WORD_RE.findall(text.lower())
+
+def containsWords(textWords, words):
+    '''
+        containsWords - Check if a sequence of words (i.e. a phrase) occurs within some text
+
+        @param textWords list<str> - The words of the text, @see getTextWords
+        @param words list<str> - The words to look for, in order
+
+        @return <bool> - True if #words occur consecutively within #textWords
+    '''
+    numWords = len(words)
+    if numWords == 1:
+        return words[0] in textWords
+
+    firstWord = words[0]
+    for i in range(len(textWords) - numWords + 1):
+        if textWords[i] == firstWord and textWords[i:i+numWords] == words:
+            return True
+
+    return False
+
 def stripIEConditionals(contents, addHtmlIfMissing=True):
     '''
         stripIEConditionals - Strips Internet Explorer conditional statements.
@@ -41,7 +75,7 @@ def stripIEConditionals(contents, addHtmlIfMissing=True):
     for match in allMatches:
         contents = contents.replace(match, '')
 
-    if END_HTML.match(contents) and not START_HTML.match(contents):
+    if addHtmlIfMissing and END_HTML.match(contents) and not START_HTML.match(contents):
         contents = addStartTag(contents, '<html>')
 
     return contents
@@ -85,6 +119,50 @@ def unescapeQuotes(value):
     return value.replace('&quot;', '"')
 
 
+# ENCODING_SNIFF_SIZE - Number of bytes at the start of a document to search for a charset declaration
+ENCODING_SNIFF_SIZE = 4096
+
+# ENCODING_BOMS - Byte order marks, and the encoding each indicates
+ENCODING_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# META_CHARSET_RE - Matches the charset in <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET_RE = re.compile(br'''<meta[\s/][^>]*?charset\s*=\s*["']?\s*([-a-zA-Z0-9_.:]+)''', re.IGNORECASE)
+
+def sniffEncoding(data):
+    '''
+        sniffEncoding - Detect the encoding of an html document from the start of its bytes,
+            using a byte order mark or a <meta> charset declaration within the first ENCODING_SNIFF_SIZE bytes.
+
+        @param data <bytes> - The start of the document (at least ENCODING_SNIFF_SIZE bytes, unless the document is shorter)
+
+        @return tuple( encoding <str/None>, bomLength <int> ) - The encoding name (None if not found or not a known encoding),
+            and the number of bytes of byte order mark to skip
+    '''
+    for (bom, encoding) in ENCODING_BOMS:
+        if data.startswith(bom):
+            return (encoding, len(bom))
+
+    matchObj = META_CHARSET_RE.search(data[:ENCODING_SNIFF_SIZE])
+    if matchObj is None:
+        return (None, 0)
+
+    encoding = matchObj.group(1).decode('ascii').lower()
+    try:
+        codecInfo = codecs.lookup(encoding)
+    except LookupError:
+        return (None, 0)
+
+    if codecInfo.name.startswith('utf-16') or codecInfo.name.startswith('utf-32'):
+        # The declaration was readable as ascii, so the document cannot actually be utf-16
+        encoding = 'utf-8'
+
+    return (encoding, 0)
+
+
 # TODO: Use the types in compat.py
 
 # TODO: Evaluate all uses and determine if should be done like this,
@@ -0,0 +1,79 @@
+'''
+    Utilities shared by the tests of the IndexedAdvancedHTMLParser indexes
+'''
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser
+
+
+def getIds(tags):
+    '''
+        getIds - Get a short description of each tag: its id, else its name, else its tag name
+
+            @param tags list<AdvancedTag> - The tags
+
+            @return list<str> - A description of each tag, in order
+    '''
+    return [ tag.id or tag.getAttribute('name') or tag.tagName for tag in tags ]
+
+
+def makeSearches(methodName, argsList, **kwargs):
+    '''
+        makeSearches - Make a list of searches for #assertMatchesFullSearch
+
+            @param methodName <str> - The name of the parser method to call, e.g. "getElementsByTagName"
+
+            @param argsList list - The arguments of each search. Each is a tuple of arguments, or a single argument.
+
+            @param kwargs - Keyword arguments passed with every search
+
+            @return list< tuple<str, tuple, dict> > - A (methodName, args, kwargs) tuple for each search
+    '''
+    return [ (methodName, args if isinstance(args, tuple) else (args, ), kwargs) for args in argsList ]
+
+
+def assertMatchesFullSearch(parser, searches, root=None, inOrder=False):
+    '''
+        assertMatchesFullSearch - Assert each search with the indexes of #parser gives the same tags as a full search (useIndex=False)
+
+            @param parser <IndexedAdvancedHTMLParser> - The parser to search
+
+            @param searches list< tuple<str, tuple, dict> > - (methodName, args, kwargs) of each search, see #makeSearches.
+
+                "find" is compared against AdvancedHTMLParser.find, which does not use the indexes.
+
+            @param root <None/AdvancedTag> - If given, the indexed search is within #root (including #root itself),
+                and is compared against the full search of the document filtered to the tags within #root
+
+            @param inOrder <bool> - If True, the tags must also be in the same order
+    '''
+    if root is None:
+        isWithin = lambda tag : True
+    else:
+        isWithin = lambda tag : tag is root or root.contains(tag)
+
+    for (methodName, args, kwargs) in searches:
+        description = '%s(%s)' %(methodName, ', '.join( [ repr(arg) for arg in args ] + [ '%s=%s' %(key, repr(value)) for (key, value) in sorted(kwargs.items()) ] ))
+
+        if root is None:
+            gotResult = getattr(parser, methodName)(*args, **kwargs)
+        else:
+            gotResult = getattr(parser, methodName)(*args, root=root, **kwargs)
+
+        if methodName == 'find':
+            expectedResult = AdvancedHTMLParser.find(parser, *args, **kwargs)
+        else:
+            expectedResult = getattr(parser, methodName)(*args, useIndex=False, **kwargs)
+
+        if methodName == 'getElementById':
+            if expectedResult is not None and not isWithin(expectedResult):
+                expectedResult = None
+            assert gotResult is expectedResult , 'Expected %s to match full search. Got %s, expected %s' %(description, repr(gotResult and getIds([gotResult])), repr(expectedResult and getIds([expectedResult])))
+            continue
+
+        gotTags = list(gotResult)
+        expectedTags = [ tag for tag in expectedResult if isWithin(tag) ]
+
+        if inOrder:
+            assert gotTags == expectedTags , 'Expected %s to match full search, in order. Got %s, expected %s' %(description, repr(getIds(gotTags)), repr(getIds(expectedTags)))
+        else:
+            assert set(gotTags) == set(expectedTags) , 'Expected %s to match full search. Got %s, expected %s' %(description, repr(getIds(gotTags)), repr(getIds(expectedTags)))
@@ -0,0 +1,135 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test AdaptiveAdvancedHTMLParser, which adds indexes for the searches it is given often
+'''
+
+import pickle
+import subprocess
+import sys
+
+from AdvancedHTMLParser import AdaptiveAdvancedHTMLParser, AdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+
+
+TEST_HTML = '''<html><body>
+    <div id="one" class="section">
+      <span name="first" class="item" data-sku="a1">First</span>
+      <span name="second" class="item" data-sku="a2">Second</span>
+    </div>
+    <div id="two" class="section">
+      <span name="third" class="item active" data-sku="b1">Third</span>
+    </div>
+</body></html>
+'''
+
+def getNames(tags):
+    return [ tag.getAttribute('name') for tag in tags ]
+
+class TestAdaptive(object):
+
+    def test_addIndexes(self):
+        parser = AdaptiveAdvancedHTMLParser(autoIndexThreshold=3)
+        parser.parseStr(TEST_HTML)
+
+        assert parser.getAutoIndexes() == [] and parser.indexFunctions == [] , 'Expected no indexes at first'
+
+        for i in range(2):
+            assert getNames(parser.getElementsByAttr('data-sku', 'a2')) == ['second'] , 'Expected to find tag with full search'
+        assert parser.getAutoIndexes() == [] and parser._searchCounts == { 'attribute:data-sku' : 2 } , 'Expected searches to be counted'
+
+        assert getNames(parser.getElementsByAttr('data-sku', 'a2')) == ['second'] , 'Expected to find tag with new index'
+        assert parser.getAutoIndexes() == ['attribute:data-sku'] , 'Expected index to be added at the threshold'
+        assert list(parser._otherAttributeIndexes['data-sku']['b1'].values()) == parser.getElementsByAttr('data-sku', 'b1', useIndex=False) , 'Expected index to be built'
+
+        # A full search of each child is still one search
+        parser.getElementsByTagName('span')
+        assert parser._searchCounts.get('tagname', 0) == 1 , 'Expected one search to be counted once'
+
+        for i in range(3):
+            assert getNames(parser.getElementsByClassName('item', root=parser.getElementById('one'))) == ['first', 'second'] , 'Expected to find tags within root'
+        assert parser.getAutoIndexes() == ['classname', 'id', 'attribute:data-sku'] , 'Expected indexes, most recently used first'
+
+        # find counts each of the criteria given one value
+        for i in range(3):
+            assert getNames(parser.find(tagname='span', name__contains='ir', classname='item')) == ['first', 'third'] , 'Expected find to match'
+        assert 'tagname' in parser.getAutoIndexes() , 'Expected find to add index for its criteria'
+
+    def test_modified(self):
+        parser = AdaptiveAdvancedHTMLParser(autoIndexThreshold=1)
+        parser.parseStr(TEST_HTML)
+
+        assert getNames(parser.getElementsByClassName('active')) == ['third'] , 'Expected to find tag with new index'
+
+        parser.getElementsByName('first')[0].addClass('active')
+        newEm = AdvancedTag('span', [('name', 'fourth'), ('class', 'active')])
+        parser.getElementById('two').appendChild(newEm)
+        parser.getElementsByName('third')[0].remove()
+
+        assert getNames(parser.getElementsByClassName('active')) == ['first', 'fourth'] , 'Expected index to be kept up to date'
+
+        # Parsing another document builds the added indexes for it, when used
+        parser.parseStr('<div><p class="active">Other</p></div>')
+        assert parser.getAutoIndexes()[0] == 'classname' and len(parser._classNameMap) == 0 , 'Expected index to be built when used'
+        assert [ tag.tagName for tag in parser.getElementsByClassName('active') ] == ['p'] , 'Expected index of new document'
+
+    def test_maxIndexEntries(self):
+        parser = AdaptiveAdvancedHTMLParser(autoIndexThreshold=1, maxIndexEntries=8)
+        parser.parseStr(TEST_HTML)
+
+        parser.getElementsByAttr('data-sku', 'a1')
+        parser.getElementsByName('first')
+        assert parser.getAutoIndexes() == ['name', 'attribute:data-sku'] , 'Expected indexes within maximum entries'
+
+        # The tag name index holds 7 entries, so the least recently used are removed
+        assert len(parser.getElementsByTagName('span')) == 3 , 'Expected to find tags with new index'
+        assert parser.getAutoIndexes() == ['tagname'] , 'Expected least recently used indexes to be removed'
+        assert parser.indexNames is False and len(parser._nameMap) == 0 and 'data-sku' not in parser._otherAttributeIndexes , 'Expected removed indexes to be cleared'
+
+        assert getNames(parser.getElementsByName('second')) == ['second'] , 'Expected removed index to be added again'
+        assert parser.getAutoIndexes() == ['name'] , 'Expected index to be added again, removing the tag name index'
+
+        # An index larger than the maximum (6 entries here) is removed after its search
+        parser.maxIndexEntries = 5
+        assert len(parser.getElementsByClassName('item')) == 3 , 'Expected to find tags with new index'
+        assert parser.getAutoIndexes() == [] , 'Expected indexes over the maximum to be removed'
+
+    def test_matchesFullSearch(self):
+        parser = AdaptiveAdvancedHTMLParser(autoIndexThreshold=2)
+        parser.parseStr(TEST_HTML)
+
+        fullParser = AdvancedHTMLParser()
+        fullParser.parseStr(TEST_HTML)
+
+        for i in range(3):
+            assert getNames(parser.getElementsWithAttrValues('data-sku', ['a1', 'b1'])) == getNames(fullParser.getElementsWithAttrValues('data-sku', ['a1', 'b1'])) , 'Expected same tags with attribute values'
+            assert getNames(parser.getElementsWithAttrPrefix('data-')) == getNames(fullParser.getElementsWithAttrPrefix('data-')) , 'Expected same tags with attribute prefix'
+            assert getNames(parser.getElementsByText('third')) == getNames(fullParser.getElementsByText('third')) , 'Expected same tags with text'
+            assert parser.getElementById('two').className == fullParser.getElementById('two').className , 'Expected same tag with id'
+
+        assert sorted(parser.getAutoIndexes()) == ['attribute:data-sku', 'attributenames', 'id', 'text'] , 'Expected indexes to be added'
+
+    def test_findText(self):
+        parser = AdaptiveAdvancedHTMLParser(autoIndexThreshold=2)
+        parser.parseStr('<div><span>hello</span><p>hello</p><p>bye</p></div>')
+
+        # "text" is the text within a tag, not an attribute, so is not indexed
+        for i in range(4):
+            assert [ tag.tagName for tag in parser.find(text='hello') ] == ['span', 'p'] , 'Expected same tags with text on search %d' %(i + 1, )
+        assert parser.getAutoIndexes() == [] , 'Expected no index for text given to find'
+
+        for i in range(3):
+            assert [ tag.tagName for tag in parser.find(tagname='p', text='hello') ] == ['p'] , 'Expected same tags with tag name and text on search %d' %(i + 1, )
+        assert parser.getAutoIndexes() == ['tagname'] , 'Expected only index for tag name given to find'
+
+    def test_pickled(self):
+        parser = AdaptiveAdvancedHTMLParser(autoIndexThreshold=1)
+        parser.parseStr(TEST_HTML)
+        parser.getElementsByName('first')
+
+        parser = pickle.loads(pickle.dumps(parser))
+        assert parser.getAutoIndexes() == ['name'] , 'Expected added indexes to be kept'
+        assert getNames(parser.getElementsByName('first')) == ['first'] , 'Expected to find tag with index'
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
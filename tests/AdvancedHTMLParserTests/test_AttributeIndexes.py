@@ -0,0 +1,117 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test searching for tags which have an attribute (getElementsWithAttr, getElementsWithAttrPrefix),
+      with and without the attribute name index of IndexedAdvancedHTMLParser
+'''
+
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+
+from IndexTestUtils import assertMatchesFullSearch, makeSearches
+
+
+TEST_HTML = '''<html><body>
+    <div id="one" class="section" data-kind="a">
+      <span name="first" data-x="1" title="First">First</span>
+      <input type="checkbox" checked />
+    </div>
+    <div id="two" data-kind="b" data-other="">
+      <span name="second" class="item" style="color: red">Second</span>
+    </div>
+</body></html>
+'''
+
+ATTR_NAMES = ('id', 'name', 'class', 'style', 'checked', 'data-kind', 'data-x', 'data-other', 'title', 'href')
+ATTR_PREFIXES = ('data-', 'data-k', 'i', 'c', 'x', '')
+
+ATTR_SEARCHES = makeSearches('getElementsWithAttr', ATTR_NAMES)
+# Searches by prefix must also give the tags in document order
+PREFIX_SEARCHES = makeSearches('getElementsWithAttrPrefix', ATTR_PREFIXES)
+
+class TestAttributeIndexes(object):
+
+    def test_fullSearch(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert [ em.id for em in parser.getElementsWithAttr('data-kind') ] == ['one', 'two'] , 'Expected to find tags with attribute'
+        assert [ em.tagName for em in parser.getElementsWithAttr('CHECKED') ] == ['input'] , 'Expected attribute name to be case-insensitive'
+        assert [ em.tagName for em in parser.getElementsWithAttr('class') ] == ['div', 'span'] , 'Expected to find tags with class'
+        assert len(parser.getElementsWithAttr('href')) == 0 , 'Expected no tags with missing attribute'
+
+        assert [ em.id or em.name for em in parser.getElementsWithAttrPrefix('data-') ] == ['one', 'first', 'two'] , 'Expected to find tags with attribute prefix, in document order'
+
+        twoEm = parser.getElementById('two')
+        assert [ em.name for em in parser.getElementsWithAttrPrefix('data-', root=twoEm) ] == [] , 'Expected root to not be included'
+
+    def test_indexed(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert [ em.id for em in parser.getElementsWithAttr('data-kind') ] == ['one', 'two'] , 'Expected to find tags with attribute'
+        assert [ em.id or em.name for em in parser.getElementsWithAttrPrefix('data-') ] == ['one', 'first', 'two'] , 'Expected to find tags with attribute prefix, in document order'
+
+        assertMatchesFullSearch(parser, ATTR_SEARCHES)
+        assertMatchesFullSearch(parser, PREFIX_SEARCHES, inOrder=True)
+
+        oneEm = parser.getElementById('one')
+        assert [ em.name for em in parser.getElementsWithAttr('data-x', root=oneEm) ] == ['first'] , 'Expected to find tags within root'
+        assert set(parser.getElementsWithAttrPrefix('data-', root=oneEm)) == set([oneEm, parser.getElementsByName('first')[0]]) , 'Expected root to be included'
+
+    def test_modified(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        oneEm = parser.getElementById('one')
+        (firstEm, secondEm) = parser.getElementsByTagName('span')
+
+        oneEm.setAttribute('href', '#')
+        firstEm.removeAttribute('data-x')
+        secondEm.setAttribute('data-x', '2')
+        secondEm.removeAttribute('style')
+        assertMatchesFullSearch(parser, ATTR_SEARCHES)
+        assertMatchesFullSearch(parser, PREFIX_SEARCHES, inOrder=True)
+
+        firstEm.addClass('item')
+        secondEm.removeClass('item')
+        oneEm.className = ''
+        assertMatchesFullSearch(parser, ATTR_SEARCHES)
+        assertMatchesFullSearch(parser, PREFIX_SEARCHES, inOrder=True)
+
+        firstEm.style = 'display: none'
+        oneEm.title = 'One'
+        assertMatchesFullSearch(parser, ATTR_SEARCHES)
+        assertMatchesFullSearch(parser, PREFIX_SEARCHES, inOrder=True)
+
+        newEm = AdvancedTag('p', [('data-new', 'y'), ('class', 'new')])
+        parser.getElementById('two').appendChild(newEm)
+        assert parser.getElementsWithAttr('data-new')[0] is newEm , 'Expected appended tag to be indexed'
+        assertMatchesFullSearch(parser, ATTR_SEARCHES)
+        assertMatchesFullSearch(parser, PREFIX_SEARCHES, inOrder=True)
+
+        oneEm.remove()
+        assert len(parser.getElementsWithAttr('checked')) == 0 , 'Expected children of removed tag to be removed from index'
+        assertMatchesFullSearch(parser, ATTR_SEARCHES)
+        assertMatchesFullSearch(parser, PREFIX_SEARCHES, inOrder=True)
+        assertMatchesFullSearch(parser, ATTR_SEARCHES, root=newEm.parentNode)
+        assertMatchesFullSearch(parser, PREFIX_SEARCHES, root=newEm.parentNode, inOrder=True)
+
+    def test_notIndexed(self):
+        parser = IndexedAdvancedHTMLParser(indexAttributeNames=False)
+        parser.parseStr(TEST_HTML)
+
+        assert len(parser._attributeNameMap) == 0 , 'Expected attribute names to not be indexed'
+        assert [ em.id for em in parser.getElementsWithAttr('data-kind') ] == ['one', 'two'] , 'Expected to fall back to full search'
+        assert [ em.id or em.name for em in parser.getElementsWithAttrPrefix('data-') ] == ['one', 'first', 'two'] , 'Expected to fall back to full search'
+
+        parser.reindex(newIndexAttributeNames=True)
+        assert len(parser._attributeNameMap) != 0 , 'Expected reindex to index attribute names'
+        assertMatchesFullSearch(parser, ATTR_SEARCHES)
+        assertMatchesFullSearch(parser, PREFIX_SEARCHES, inOrder=True)
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
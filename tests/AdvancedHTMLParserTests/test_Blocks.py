@@ -228,5 +228,33 @@ class TestBlocks(object):
 
         assert textContentStripped == expectedStr , 'Expected .textContent to collate ALL text, and have a stripped value of "%s" but got: %s' %(expectedStr, textContentStripped)
 
+    def test_textCache(self):
+        document = AdvancedHTMLParser.AdvancedHTMLParser()
+        document.parseStr('<pre id="main">a &amp; b &#169; <b>bold</b>c<!-- comment -->d</pre>')
+
+        mainEm = document.getElementById('main')
+
+        assert mainEm.text == 'a &amp; b &#169; c<!--  comment  -->d' , 'Expected text to be joined from text blocks, but got: ' + repr(mainEm.text)
+
+        mainEm.appendText('e')
+        assert mainEm.text == 'a &amp; b &#169; c<!--  comment  -->de' , 'Expected appended text to be in text, but got: ' + repr(mainEm.text)
+
+        mainEm.removeText('c')
+        assert mainEm.text == 'a &amp; b &#169; <!--  comment  -->de' , 'Expected removed text to not be in text, but got: ' + repr(mainEm.text)
+
+        boldEm = mainEm.children[0]
+        mainEm.insertBefore('X', boldEm)
+        mainEm.insertAfter('Y', boldEm)
+        assert mainEm.text.startswith('a &amp; b &#169; XY') , 'Expected inserted text blocks to be in text, but got: ' + repr(mainEm.text)
+
+        mainEm.text = 'override'
+        assert mainEm.text == 'override' , 'Expected assigned text to be returned'
+
+        tag = AdvancedHTMLParser.AdvancedTag('td')
+        tag.appendText('one')
+        assert tag.text == 'one' , 'Expected single text block to be the text'
+        tag.appendText('two')
+        assert tag.text == 'onetwo' , 'Expected text blocks to be joined'
+
 if __name__ == '__main__':
     sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
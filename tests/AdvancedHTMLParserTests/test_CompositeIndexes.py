@@ -0,0 +1,147 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test searching by several criteria (multiple class names, find) with IndexedAdvancedHTMLParser,
+      which intersects index entries and uses composite indexes
+'''
+
+import pickle
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+
+from IndexTestUtils import assertMatchesFullSearch, getIds, makeSearches
+
+
+TEST_HTML = '''<html><body>
+    <ul id="list" class="items">
+      <li id="i1" class="item active">One</li>
+      <li id="i2" class="item">Two</li>
+      <li id="i3" class="item sold active" name="three">Three</li>
+      <li id="i4" class="other">Four</li>
+    </ul>
+    <div id="d1" class="item active">Not a list item</div>
+    <form id="f1" class="active">
+      <input id="c1" type="checkbox" name="opt" class="item" />
+      <input id="c2" type="checkbox" name="opt" />
+      <input id="t1" type="text" name="opt" class="item active" />
+    </form>
+</body></html>
+'''
+
+CLASS_NAMES = ('item', 'item active', 'active item', ' active  sold ', 'item missing', 'items', 'missing')
+
+FIND_CRITERIA = (
+    { 'tagname' : 'li', 'classname' : 'item' },
+    { 'tagname' : 'li', 'classname' : 'item active' },
+    { 'tagname' : 'div', 'classname' : 'active' },
+    { 'tagname' : 'input', 'type' : 'checkbox' },
+    { 'tagname' : 'input', 'type' : 'checkbox', 'classname' : 'item' },
+    { 'tagname' : 'input', 'name' : 'opt', 'type' : 'text' },
+    { 'tagname' : 'li', 'class' : 'item active' },
+    { 'name' : 'opt', 'type' : ['text', 'checkbox'] },
+    { 'classname' : ['sold', 'other'] },
+    { 'tagname' : 'li', 'id__contains' : 'i' },
+    { 'type' : '' },
+)
+
+SEARCHES = makeSearches('getElementsByClassName', CLASS_NAMES) + [ ('find', (), criteria) for criteria in FIND_CRITERIA ]
+
+class TestCompositeIndexes(object):
+
+    def setup_method(self, method):
+        '''
+            Tests modify the document, so reparse for every method
+        '''
+        self.parser = IndexedAdvancedHTMLParser()
+        self.parser.addCompositeIndex('tagname', 'classname')
+        self.parser.addCompositeIndex('TagName', 'type')
+        self.parser.addIndexOnAttribute('type')
+        self.parser.parseStr(TEST_HTML)
+
+    def test_multipleClassNames(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert getIds(parser.getElementsByClassName('item active')) == ['i1', 'i3', 'd1', 't1'] , 'Expected tags with all class names'
+        assert getIds(parser.getElementsByClassName('item active sold')) == ['i3'] , 'Expected tags with all class names'
+        assert getIds(parser.getElementById('list').getElementsByClassName('active  item')) == ['i1', 'i3'] , 'Expected tags within tag with all class names'
+
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert getIds(parser.getElementsByClassName('item active')) == ['i1', 'i3', 'd1', 't1'] , 'Expected index to find tags with all class names'
+        assert getIds(parser.getElementsByClassName('item active', root=parser.getElementById('list'))) == ['i1', 'i3'] , 'Expected index to find tags with all class names within root'
+        assert getIds(parser.getElementsByClassName('item missing')) == [] , 'Expected no tags when a class name is not used'
+
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_find(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert getIds(parser.find(tagname='li', classname='active item')) == ['i1', 'i3'] , 'Expected find by tag name and class names'
+        assert getIds(parser.find(classname=['sold', 'other'])) == ['i3', 'i4'] , 'Expected find by any of several class names'
+
+        parser = self.parser
+
+        assert getIds(parser.find(tagname='li', classname='active item')) == ['i1', 'i3'] , 'Expected find by tag name and class names'
+        assert getIds(parser.find(tagname='input', type='checkbox')) == ['c1', 'c2'] , 'Expected find by tag name and attribute'
+        assert ('li', 'item') in parser._compositeIndexes[('tagname', 'classname')] , 'Expected composite index'
+
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        # Without composite indexes, the index for each field is used
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_modified(self):
+        parser = self.parser
+
+        parser.getElementById('c2').setAttribute('type', 'text')
+        parser.getElementById('i2').addClass('active')
+        parser.getElementById('i1').removeClass('item')
+        parser.getElementById('d1').className = 'item'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        newEm = AdvancedTag('li', [('class', 'item active'), ('id', 'i5')])
+        parser.getElementById('list').appendChild(newEm)
+        parser.getElementById('f1').remove()
+        assert getIds(parser.find(tagname='li', classname='active item')) == ['i3', 'i2', 'i5'] , 'Expected added tag to be indexed'
+        assert getIds(parser.find(tagname='input', type='checkbox')) == [] , 'Expected removed tags to be removed from the index'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        parser.removeCompositeIndex('tagname', 'classname')
+        assert list(parser._compositeIndexes.keys()) == [('tagname', 'type')] , 'Expected composite index to be removed'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_addAfterParse(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        parser.addCompositeIndex('tagname', 'classname')
+        assert set(parser._compositeIndexes[('tagname', 'classname')][('li', 'item')].values()) == set(parser.find(tagname='li', classname='item')) , 'Expected parsed tags to be indexed'
+
+        parser.reindex()
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        gotError = False
+        try:
+            parser.addCompositeIndex('tagname')
+        except ValueError:
+            gotError = True
+
+        assert gotError , 'Expected ValueError for a composite index with one field'
+
+    def test_pickled(self):
+        parser = pickle.loads(pickle.dumps(self.parser))
+
+        parser.getElementById('i3').remove()
+        parser.getElementById('c1').setAttribute('type', 'text')
+        assertMatchesFullSearch(parser, SEARCHES)
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
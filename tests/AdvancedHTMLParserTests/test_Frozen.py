@@ -0,0 +1,135 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test FrozenDocument, the read-only columnar copy of a document created by AdvancedHTMLParser.freeze
+'''
+
+import pickle
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser
+from AdvancedHTMLParser.Frozen import FrozenDocument, FrozenTag
+
+
+TEST_HTML = '''<!DOCTYPE html>
+<html>
+  <head>
+    <title>Frozen &amp; test</title>
+  </head>
+  <body class="main">
+    <div id="one" class="section">
+      <span name="first" class="item">Hello <b>bold</b> &#169;</span>
+    </div>
+    <div id="two" class="section other" style="display: none">
+      <span name="second" class="item" data-x="1">World</span>
+      <input type="checkbox" checked>
+    </div>
+  </body>
+</html>
+'''
+
+class TestFrozen(object):
+
+    def _freeze(self, html=TEST_HTML):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(html)
+
+        return (parser, parser.freeze())
+
+    def test_columns(self):
+        (parser, frozen) = self._freeze()
+
+        assert isinstance(frozen, FrozenDocument) , 'Expected freeze to return a FrozenDocument'
+
+        allNodes = parser.getAllNodes()
+        assert len(frozen) == len(allNodes) , 'Expected a node for each tag'
+
+        for index in range(len(frozen)):
+            tag = allNodes[index]
+
+            assert frozen.getTagName(index) == tag.tagName , 'Expected nodes in document order'
+            assert dict(frozen.getAttributesList(index)) == dict( (name, value or '') for (name, value) in tag.attributes.items() ) , 'Expected same attributes on %s' %(tag.tagName, )
+            assert frozen.getText(index) == tag.text , 'Expected same text on %s' %(tag.tagName, )
+            assert frozen.getChildIndexes(index) == [ allNodes.index(child) for child in tag.children ] , 'Expected same children'
+
+            parentIndex = frozen.getParentIndex(index)
+            if tag.parentNode is None:
+                assert parentIndex == -1 , 'Expected root to have no parent'
+            else:
+                assert frozen.getTagName(parentIndex) == tag.parentNode.tagName , 'Expected same parent'
+                assert frozen.getDepth(index) == frozen.getDepth(parentIndex) + 1 , 'Expected depth to be one more than parent'
+                assert frozen.isDescendant(index, parentIndex) is True , 'Expected node to be a descendant of its parent'
+
+            assert frozen.getLastDescendantIndex(index) - index == len(tag.getAllChildNodes()) , 'Expected descendants to follow each node'
+
+        oneIndex = frozen.getElementIndexesByAttr('id', 'one')[0]
+        twoIndex = frozen.getElementIndexesByAttr('id', 'two')[0]
+        assert frozen.isDescendant(twoIndex, oneIndex) is False , 'Expected sibling to not be a descendant'
+
+        assert frozen.getAttribute(twoIndex, 'style') == 'display: none' , 'Expected style attribute as a string'
+        assert frozen.getAttribute(twoIndex, 'nope', 'default') == 'default' , 'Expected default for missing attribute'
+
+    def test_getElements(self):
+        (parser, frozen) = self._freeze()
+
+        for (methodName, args) in ( ('getElementsByTagName', ('span', )), ('getElementsByName', ('second', )), ('getElementsByClassName', ('section', )),
+                                    ('getElementsByClassName', ('other section', )), ('getElementsByAttr', ('data-x', '1')), ('getElementsByTagName', ('nope', )) ):
+            gotTags = getattr(frozen, methodName)(*args)
+            expectedTags = getattr(parser, methodName)(*args)
+
+            assert [ tag.getStartTag() for tag in gotTags ] == [ tag.getStartTag() for tag in expectedTags ] , 'Expected %s%s to match parser' %(methodName, repr(args))
+
+        assert frozen.getElementById('two').getAttribute('class') == 'section other' , 'Expected to find element by id'
+        assert frozen.getElementById('nope') is None , 'Expected None for missing id'
+
+        oneIndex = frozen.getElementIndexesByAttr('id', 'one')[0]
+        assert [ tag.name for tag in frozen.getElementsByTagName('span', root=oneIndex) ] == ['first'] , 'Expected search within root'
+
+    def test_views(self):
+        (parser, frozen) = self._freeze()
+
+        spanEm = frozen.getElementsByName('first')[0]
+        assert isinstance(spanEm, FrozenTag) , 'Expected a FrozenTag view'
+        assert frozen.getTag(spanEm.getFrozenIndex()) is spanEm , 'Expected the same view while in use'
+
+        assert object.__getattribute__(frozen, '_views').get(0, None) is None , 'Expected no view of the root to be created'
+
+        assert spanEm.innerHTML == parser.getElementsByName('first')[0].innerHTML , 'Expected same innerHTML'
+        assert spanEm.text == 'Hello  &#169;' , 'Expected text from frozen document'
+        assert spanEm.children[0].parentNode is spanEm , 'Expected child views to link to parent'
+
+        divEm = spanEm.parentNode
+        assert divEm.id == 'one' and spanEm in divEm.children , 'Expected parent view to contain child view'
+
+        assert frozen.getHTML() == parser.getHTML() , 'Expected same HTML as parsed document'
+
+        # Views are copies
+        spanEm.setAttribute('name', 'changed')
+        assert frozen.getElementsByName('changed') == [] , 'Expected changes to a view to not modify frozen document'
+
+        rootNodes = self._freeze('<div>a</div> text <p>b</p>')[1].getRootNodes()
+        assert [ tag.tagName for tag in rootNodes ] == ['div', 'p'] , 'Expected root nodes of multiple root document'
+
+    def test_pickle(self):
+        (parser, frozen) = self._freeze()
+
+        frozen.getElementById('one')
+
+        loaded = pickle.loads(pickle.dumps(frozen))
+        assert loaded.getHTML() == frozen.getHTML() , 'Expected pickled frozen document to have same HTML'
+
+        spanEm = pickle.loads(pickle.dumps(frozen.getElementsByName('second')[0]))
+        assert spanEm.getFrozenIndex() is None and spanEm.innerHTML == 'World' , 'Expected pickled view to be a plain tag'
+
+    def test_freezeEmpty(self):
+        gotException = False
+        try:
+            AdvancedHTMLParser().freeze()
+        except ValueError:
+            gotException = True
+
+        assert gotException is True , 'Expected ValueError freezing a document with nothing parsed'
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
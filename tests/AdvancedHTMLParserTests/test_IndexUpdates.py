@@ -0,0 +1,142 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test that IndexedAdvancedHTMLParser keeps its indexes up to date as the document is modified
+'''
+
+import pickle
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+
+from IndexTestUtils import assertMatchesFullSearch, makeSearches
+
+
+TEST_HTML = '''<html><body>
+    <div id="one" class="section" data-kind="a">
+      <span name="first" class="item">First</span>
+    </div>
+    <div id="two" class="section">
+      <span name="second" class="item">Second</span>
+    </div>
+</body></html>
+'''
+
+SEARCHES = makeSearches('getElementsByTagName', ('div', 'span', 'p', 'b')) + \
+    makeSearches('getElementsByName', ('first', 'second', 'third', 'renamed')) + \
+    makeSearches('getElementsByClassName', ('section', 'item', 'new', 'other')) + \
+    makeSearches('getElementById', ('one', 'two', 'three', 'changed')) + \
+    makeSearches('getElementsByAttr', ( ('data-kind', 'a'), ('data-kind', 'b') ))
+
+class TestIndexUpdates(object):
+
+    def setup_method(self, method):
+        '''
+            Tests modify the document, so reparse for every method
+        '''
+        self.parser = IndexedAdvancedHTMLParser()
+        self.parser.addIndexOnAttribute('data-kind')
+        self.parser.parseStr(TEST_HTML)
+
+    def test_appendAndRemove(self):
+        parser = self.parser
+
+        newEm = AdvancedHTMLParser.createElementFromHTML('<p id="three" class="new" data-kind="b"><b name="third">Third</b></p>')
+        parser.getElementById('two').appendChild(newEm)
+
+        assert parser.getElementById('three') is newEm , 'Expected appended tag to be indexed by id'
+        assert [ em.innerHTML for em in parser.getElementsByName('third') ] == ['Third'] , 'Expected children of appended tag to be indexed'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        oneEm = parser.getElementById('one')
+        oneEm.remove()
+
+        assert parser.getElementById('one') is None , 'Expected removed tag to be removed from index'
+        assert [ em.innerHTML for em in parser.getElementsByName('first') ] == [] , 'Expected children of removed tag to be removed from index'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        # Moving a tag within the document
+        parser.getElementById('two').removeChild(newEm)
+        parser.getElementsByTagName('body')[0].appendChild(newEm)
+        assert len(parser.getElementsByClassName('new')) == 1 , 'Expected tag moved within the document to be indexed once'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_insert(self):
+        parser = self.parser
+
+        twoEm = parser.getElementById('two')
+        bodyEm = twoEm.parentNode
+
+        beforeEm = AdvancedTag('p', [('id', 'three'), ('class', 'new')])
+        afterEm = AdvancedTag('p', [('name', 'third'), ('class', 'other')])
+
+        bodyEm.insertBefore(beforeEm, twoEm)
+        bodyEm.insertAfter(afterEm, twoEm)
+
+        assert beforeEm.parentNode is bodyEm and afterEm.ownerDocument is parser , 'Expected inserted tags to be associated with parent and document'
+        assert parser.getElementById('three') is beforeEm , 'Expected tag inserted before to be indexed'
+        assert parser.getElementsByName('third')[0] is afterEm , 'Expected tag inserted after to be indexed'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_attributes(self):
+        parser = self.parser
+
+        oneEm = parser.getElementById('one')
+        firstEm = parser.getElementsByName('first')[0]
+
+        oneEm.id = 'changed'
+        assert parser.getElementById('one') is None and parser.getElementById('changed') is oneEm , 'Expected id change to update index'
+
+        firstEm.setAttribute('name', 'renamed')
+        oneEm.setAttribute('data-kind', 'b')
+        parser.getElementById('two').setAttribute('data-kind', 'a')
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        firstEm.name = 'first'
+        oneEm.removeAttribute('data-kind')
+        parser.getElementById('two').removeAttribute('id')
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_classNames(self):
+        parser = self.parser
+
+        (firstEm, secondEm) = parser.getElementsByClassName('item')
+
+        firstEm.addClass('new')
+        secondEm.removeClass('item')
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        secondEm.className = 'other  new'
+        assert set(parser.getElementsByClassName('new')) == set([firstEm, secondEm]) , 'Expected className change to update index'
+
+        firstEm.setAttribute('class', 'item')
+        secondEm.removeAttribute('class')
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_detached(self):
+        parser = self.parser
+
+        oneEm = parser.getElementById('one')
+        oneEm.remove()
+
+        # Changes to a removed tag, or a tag not yet added, do not change the index
+        oneEm.id = 'three'
+        newEm = AdvancedTag('div')
+        newEm.appendChild(oneEm)
+        assert parser.getElementById('three') is None , 'Expected changes to a detached tag to not be indexed'
+
+        parser.getRoot().appendChild(newEm)
+        assert parser.getElementById('three') is oneEm , 'Expected tags to be indexed when attached'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_pickled(self):
+        parser = pickle.loads(pickle.dumps(self.parser))
+
+        parser.getElementById('one').remove()
+        parser.getElementsByName('second')[0].addClass('new')
+        assertMatchesFullSearch(parser, SEARCHES)
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
@@ -0,0 +1,108 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test sharing of names and values between tags, with InternTable
+'''
+
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Intern import InternTable
+
+
+TEST_HTML = '''<html><body>
+    <A HREF="/one" target="_blank" class="btn btn-primary">One</A>
+    <a href="/two" TARGET="_blank" class="btn  btn-primary">Two</a>
+    <a href="/three" target="_self" class="btn">Three</a>
+</body></html>
+'''
+
+class TestIntern(object):
+
+    def test_sharedNames(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        (oneEm, twoEm, threeEm) = parser.getElementsByTagName('a')
+
+        assert oneEm.tagName is twoEm.tagName , 'Expected tag names to be shared'
+
+        oneNames = list(oneEm.attributes.keys())
+        twoNames = list(twoEm.attributes.keys())
+        assert oneNames == ['href', 'target', 'class'] , 'Expected lowercase attribute names, but got: %s' %(repr(oneNames), )
+        assert oneNames[1] is twoNames[1] , 'Expected attribute names to be shared'
+
+        assert oneEm.getAttribute('target') is twoEm.getAttribute('target') , 'Expected short attribute values to be shared'
+        assert oneEm.target == '_blank' and threeEm.target == '_self' , 'Expected attribute values to be unchanged'
+
+    def test_sharedClassNames(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        (oneEm, twoEm, threeEm) = parser.getElementsByTagName('a')
+
+        assert oneEm.classList == ['btn', 'btn-primary'] and oneEm.className == 'btn btn-primary' , 'Expected class names'
+        assert object.__getattribute__(oneEm, '_classNames') is object.__getattribute__(twoEm, '_classNames') , 'Expected the same class attribute to share class names'
+        assert oneEm.classList[0] is threeEm.classList[0] , 'Expected class names to be shared'
+
+        oneEm.addClass('active')
+        assert oneEm.className == 'btn btn-primary active' and twoEm.className == 'btn btn-primary' , 'Expected adding a class to only change that tag'
+
+        twoEm.removeClass('btn')
+        assert twoEm.className == 'btn-primary' and threeEm.className == 'btn' , 'Expected removing a class to only change that tag'
+
+        assert len(parser.getElementsByClassName('btn')) == 2 , 'Expected search by class name to work'
+
+        indexedParser = IndexedAdvancedHTMLParser()
+        indexedParser.parseStr(TEST_HTML)
+        assert [ em.innerHTML for em in indexedParser.getElementsByClassName('btn-primary') ] == ['One', 'Two'] , 'Expected indexed search by class name to work'
+
+        (oneEm, twoEm, threeEm) = indexedParser.getElementsByTagName('a')
+        assert object.__getattribute__(oneEm, '_classNames') is object.__getattribute__(twoEm, '_classNames') , 'Expected the same class attribute to share class names with IndexedAdvancedHTMLParser'
+        assert oneEm.classList[0] is threeEm.classList[0] , 'Expected class names to be shared with IndexedAdvancedHTMLParser'
+
+        lazyIndexParser = IndexedAdvancedHTMLParser(lazyIndexes=True)
+        lazyIndexParser.parseStr(TEST_HTML)
+        (oneEm, twoEm, threeEm) = lazyIndexParser.getElementsByTagName('a')
+        assert object.__getattribute__(oneEm, '_classNames') is object.__getattribute__(twoEm, '_classNames') , 'Expected the same class attribute to share class names with lazy indexes'
+
+    def test_stats(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        stats = parser.getInternStats()
+        assert stats['lookups'] > stats['hits'] > 0 , 'Expected some lookups to be hits, but got: %s' %(repr(stats), )
+        assert stats['hitRate'] == float(stats['hits']) / stats['lookups'] , 'Expected hit rate to be hits / lookups'
+        assert stats['bytesSaved'] > 0 , 'Expected bytes saved'
+        assert stats['size'] == len(parser.internTable) , 'Expected size to be the number of entries'
+
+        # Parsing another document with the same parser shares with the first
+        parser.parseStr(TEST_HTML)
+        assert parser.getInternStats()['hitRate'] > stats['hitRate'] , 'Expected a higher hit rate for a repeated document'
+
+        disabledParser = AdvancedHTMLParser(internTable=False)
+        disabledParser.parseStr(TEST_HTML)
+        assert disabledParser.getInternStats() is None , 'Expected no stats with interning disabled'
+        assert disabledParser.getHTML() == parser.getHTML() , 'Expected same document without interning'
+
+    def test_sharedTable(self):
+        internTable = InternTable(maxSize=4, maxValueLength=0)
+
+        parser1 = AdvancedHTMLParser(internTable=internTable)
+        parser1.parseStr(TEST_HTML)
+        parser2 = AdvancedHTMLParser(internTable=internTable)
+        parser2.parseStr(TEST_HTML)
+
+        # The size is checked once per tag, so may go over by the attributes of one tag
+        assert len(internTable) <= 4 + 3 , 'Expected table to be bounded'
+        assert parser1.getRoot().tagName is parser2.getRoot().tagName , 'Expected table to be shared between parsers'
+        assert parser1.getElementsByTagName('a')[0].target is not parser1.getElementsByTagName('a')[1].target , 'Expected values to not be interned with maxValueLength=0'
+
+        assert internTable.internName('DIV') == 'div' , 'Expected internName to lowercase'
+
+        internTable.clear()
+        assert len(internTable) == 0 and internTable.getStats()['lookups'] == 0 , 'Expected clear to remove entries and reset stats'
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
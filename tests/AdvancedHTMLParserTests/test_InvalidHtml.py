@@ -6,7 +6,8 @@
 import sys
 import subprocess
 
-from AdvancedHTMLParser.Parser import AdvancedHTMLParser
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Formatter import AdvancedHTMLFormatter
 
 
 MULTIPLE_ROOT = """
@@ -54,6 +55,52 @@ class TestInvalidHtml(object):
         assert oneEm , 'Failed to find first element'
         assert len(parser.getRootNodes()) == 2
 
+    def test_MultipleRootSinglePass(self):
+        '''
+            test_MultipleRootSinglePass - Test that multiple roots switch to the invisible root in-place,
+                retaining the whitespace and text at the root level
+        '''
+        switchCountBefore = AdvancedHTMLParser.multipleRootSwitchCount
+
+        parser = AdvancedHTMLParser()
+        parser.parseStr('<div id="one">a</div>\n<div id="two">b</div> tail')
+
+        assert AdvancedHTMLParser.multipleRootSwitchCount == switchCountBefore + 1 , 'Expected switch counter to be incremented once'
+
+        rootNodes = parser.getRootNodes()
+        assert [node.id for node in rootNodes] == ['one', 'two'] , 'Expected both root nodes in order, but got: %s' %(repr(rootNodes), )
+        assert rootNodes[0].ownerDocument is parser , 'Expected first root node to remain associated with document'
+
+        assert parser.getHTML() == '\n<div id="one" >a</div>\n<div id="two" >b</div> tail' , 'Got unexpected html: %s' %(repr(parser.getHTML()), )
+
+        parser = AdvancedHTMLParser()
+        parser.parseStr(' <html><body>x</body></html>\n')
+
+        assert AdvancedHTMLParser.multipleRootSwitchCount == switchCountBefore + 1 , 'Expected a single root document not to increment switch counter'
+        assert parser.getRoot().tagName == 'html' , 'Expected html to be root'
+
+    def test_MultipleRootIndexed(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(MULTIPLE_ROOT)
+
+        assert len(parser.getRootNodes()) == 2 , 'Expected two root nodes'
+        assert parser.getElementById('two_s') , 'Failed to find element under second root node'
+
+        # Parse again on the same parser, to ensure reset clears the old tree
+        parser.parseStr('<span id="other">Hi</span>')
+        assert parser.getRoot().id == 'other' , 'Expected reset to clear previous tree'
+        assert parser.getElementById('one') is None , 'Expected reset to clear previous indexes'
+
+    def test_MultipleRootFormatter(self):
+        switchCountBefore = AdvancedHTMLFormatter.multipleRootSwitchCount
+
+        formatter = AdvancedHTMLFormatter()
+        formatter.feed(MULTIPLE_ROOT)
+
+        assert AdvancedHTMLFormatter.multipleRootSwitchCount == switchCountBefore + 1 , 'Expected switch counter to be incremented once'
+        assert len(formatter.getRootNodes()) == 2 , 'Expected two root nodes'
+        assert formatter.getHTML().count('<span') == 2 , 'Expected both spans in formatted html'
+
     def test_HandleInvalidClose(self):
         parser = AdvancedHTMLParser()
         try:
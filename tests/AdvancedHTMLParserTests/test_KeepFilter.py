@@ -0,0 +1,104 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test parsing with a keep filter, which only builds matching elements
+'''
+
+import subprocess
+import sys
+
+from io import BytesIO
+
+import AdvancedHTMLParser
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser as Parser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.KeepFilter import KeepFilter
+
+
+TEST_HTML = '''<html>
+  <body>
+    <h1>Products</h1>
+    <div class="product" id="p1"><span class="price">1.00</span> One &amp; only</div>
+    <section>
+      <div class="product special" id="p2"><b>Two</b>
+    </section>
+    trailing text
+    <div class="other">
+      <div class="product" id="p3" data-sku="abc">Three <!-- comment --></div>
+    </div>
+    <img class="product" src="x.png">
+  </body>
+</html>
+'''
+
+class TestKeepFilter(object):
+
+    def test_keepSelector(self):
+        for parserClass in (Parser, IndexedAdvancedHTMLParser, AdvancedHTMLParser.LazyAdvancedHTMLParser):
+            parser = parserClass(keepFilter='div.product')
+            parser.parseStr(TEST_HTML)
+
+            rootNodes = parser.getRootNodes()
+
+            assert [ node.id for node in rootNodes ] == ['p1', 'p2', 'p3'] , 'Expected only matching elements as root nodes, but got: %s' %(repr(rootNodes), )
+
+            assert parser.getElementsByTagName('h1') == [] , 'Expected non-matching elements to not be built'
+            assert parser.getElementsByClassName('price')[0].innerHTML == '1.00' , 'Expected descendants of kept elements to be built'
+            assert rootNodes[0].innerHTML == '<span class="price" >1.00</span> One &amp; only' , 'Got unexpected innerHTML: %s' %(repr(rootNodes[0].innerHTML), )
+            assert rootNodes[2].innerHTML == 'Three <!--  comment  -->' , 'Got unexpected innerHTML: %s' %(repr(rootNodes[2].innerHTML), )
+            assert 'trailing' not in parser.getHTML() , 'Expected text outside of kept elements to be dropped'
+
+            # The end tag of an element which was not kept also closes the kept elements opened within it, as in a full parse
+            assert rootNodes[1].innerHTML == '<b >Two</b>\n    ' , 'Got unexpected innerHTML: %s' %(repr(rootNodes[1].innerHTML), )
+
+            assert parser.getElementById('p3').getAttribute('data-sku') == 'abc' , 'Expected to find kept element by id'
+
+    def test_keepFilterTypes(self):
+        parser = Parser(keepFilter=['#p1', 'img'])
+        parser.parseStr(TEST_HTML)
+        assert [ node.tagName for node in parser.getRootNodes() ] == ['div', 'img'] , 'Expected any of the listed selectors to match'
+
+        parser = Parser(keepFilter='*[data-sku=abc], .special')
+        parser.parseStr(TEST_HTML)
+        assert [ node.id for node in parser.getRootNodes() ] == ['p2', 'p3'] , 'Expected comma-separated selectors to match'
+
+        parser = Parser(keepFilter=lambda tagName, attributes : attributes.get('id') == 'p3')
+        parser.parseStr(TEST_HTML)
+        assert parser.getRoot().id == 'p3' , 'Expected single match to be the root'
+
+        parser = Parser(keepFilter='table')
+        parser.parseStr(TEST_HTML)
+        assert parser.getRoot() is None , 'Expected no root when nothing matches'
+
+        for badSelector in ('div span', 'div > span', '', 'div[x'):
+            gotException = False
+            try:
+                KeepFilter(badSelector)
+            except ValueError:
+                gotException = True
+
+            assert gotException is True , 'Expected ValueError for unsupported selector %s' %(repr(badSelector), )
+
+    def test_keepFilterSelectorParts(self):
+        keepFilter = KeepFilter('input.a.b#x[type="check box"][disabled]')
+
+        assert keepFilter.matches('input', [('id', 'x'), ('class', 'b a'), ('type', 'check box'), ('disabled', None)]) is True , 'Expected all parts to match'
+        assert keepFilter.matches('input', [('id', 'x'), ('class', 'b a'), ('type', 'check box')]) is False , 'Expected attribute presence to be required'
+        assert keepFilter.matches('input', [('id', 'x'), ('class', 'a'), ('type', 'check box'), ('disabled', None)]) is False , 'Expected all class names to be required'
+        assert keepFilter.matches('span', [('id', 'x'), ('class', 'b a'), ('type', 'check box'), ('disabled', None)]) is False , 'Expected tag name to be required'
+
+    def test_keepFilterChunksAndIterParse(self):
+        parser = Parser(keepFilter='div.product')
+        htmlBytes = TEST_HTML.encode('utf-8')
+        for i in range(0, len(htmlBytes), 5):
+            parser.feedChunk(htmlBytes[i:i+5])
+        parser.close()
+
+        assert [ node.id for node in parser.getRootNodes() ] == ['p1', 'p2', 'p3'] , 'Expected same result when fed in chunks'
+
+        parser = Parser(keepFilter='div.product')
+        ends = [ tag.id for (event, tag) in parser.iterparse(BytesIO(htmlBytes), events=('end', ), tags='div', chunkSize=7) ]
+        assert ends == ['p1', 'p2', 'p3'] , 'Expected an end event for each kept element, but got: %s' %(repr(ends), )
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
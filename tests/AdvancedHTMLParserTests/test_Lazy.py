@@ -0,0 +1,136 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test LazyAdvancedHTMLParser, which only creates tags as they are used
+'''
+
+import pickle
+import subprocess
+import sys
+
+import AdvancedHTMLParser
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser as Parser
+from AdvancedHTMLParser.Lazy import LazyAdvancedHTMLParser, LazyAdvancedTag
+
+
+TEST_HTML = '''<!DOCTYPE html>
+<html>
+  <head>
+    <title>Lazy &amp; test</title>
+  </head>
+  <body class="main">
+    <div id="one" class="section">
+      <span name="first" class="item">Hello <b>bold</b> &#169;</span>
+    </div>
+    <div id="two" class="section other">
+      <span name="second" class="item" data-x="1">World</span>
+      <input type="checkbox" checked>
+    </div>
+    <div id="three"><p>Paragraph</p></div>
+  </body>
+</html>
+'''
+
+class TestLazy(object):
+
+    def _parse(self, html=TEST_HTML):
+        parser = LazyAdvancedHTMLParser()
+        parser.parseStr(html)
+
+        return parser
+
+    def test_sameAsEager(self):
+        lazyParser = self._parse()
+
+        eagerParser = Parser()
+        eagerParser.parseStr(TEST_HTML)
+
+        assert lazyParser.getHTML() == eagerParser.getHTML() , 'Expected same HTML as AdvancedHTMLParser.\nGot:      %s\nExpected: %s' %(repr(lazyParser.getHTML()), repr(eagerParser.getHTML()))
+        assert lazyParser.getFormattedHTML() == eagerParser.getFormattedHTML() , 'Expected same formatted HTML as AdvancedHTMLParser'
+        assert lazyParser.doctype == eagerParser.doctype , 'Expected doctype to be set'
+
+    def test_onlyCreatesUsedTags(self):
+        parser = self._parse()
+
+        root = parser.getRoot()
+        assert issubclass(root.__class__, LazyAdvancedTag) , 'Expected root to be a LazyAdvancedTag'
+        assert root._isMaterialized() is False , 'Expected children of root to not be created until used'
+
+        twoEm = parser.getElementById('two')
+        assert twoEm is not None , 'Expected to find element by id'
+        assert twoEm.getAttribute('class') == 'section other' , 'Got unexpected attribute value'
+
+        bodyEm = twoEm.parentNode
+        assert bodyEm.tagName == 'body' , 'Expected parentNode to be set'
+
+        assert bodyEm._isMaterialized() is True , 'Expected the path to the match to be created'
+        assert [ child._isMaterialized() for child in bodyEm.children ] == [False, False, False] , 'Expected nothing below or beside the match to be created'
+        assert parser.getElementsByTagName('head')[0]._isMaterialized() is False , 'Expected no need to look within head for an id not within it'
+
+        assert twoEm.children[0].innerHTML == 'World' , 'Expected children to be created on access'
+        assert bodyEm.children[0].children[0].innerHTML == 'Hello <b >bold</b> &#169;' , 'Got unexpected innerHTML: %s' %(repr(bodyEm.children[0].children[0].innerHTML), )
+
+    def test_getElements(self):
+        parser = self._parse()
+
+        assert [ em.getAttribute('name') for em in parser.getElementsByClassName('item') ] == ['first', 'second'] , 'Got unexpected class matches'
+        assert [ em.id for em in parser.getElementsByClassName('other section') ] == ['two'] , 'Expected all class names to be matched'
+        assert parser.getElementsByName('second')[0].innerHTML == 'World' , 'Expected to find element by name'
+        assert [ em.tagName for em in parser.getElementsByAttr('data-x', '1') ] == ['span'] , 'Expected to find element by attribute'
+        assert [ em.tagName for em in parser.getElementsByAttr('type', 'checkbox') ] == ['input'] , 'Expected to find element by attribute'
+        assert [ em.id for em in parser.getElementsByTagName('div') ] == ['one', 'two', 'three'] , 'Got unexpected tag name matches'
+        assert parser.getElementById('missing') is None , 'Expected None for missing id'
+        assert parser.getElementsByTagName('b', parser.getElementById('one'))[0].innerHTML == 'bold' , 'Expected search from a tag'
+
+        parser = self._parse()
+        assert [ em.innerHTML for em in parser.getElementsByXPathExpression('//div[@id="three"]/p') ] == ['Paragraph'] , 'Expected xpath to work'
+
+    def test_multipleRoots(self):
+        html = '<div id="a">1</div> tail <p id="b">2</p>'
+
+        parser = self._parse(html)
+
+        eagerParser = Parser()
+        eagerParser.parseStr(html)
+
+        assert parser.getElementById('b').innerHTML == '2' , 'Expected to find element under invisible root'
+        assert [ em.id for em in parser.getRootNodes() ] == ['a', 'b'] , 'Expected root nodes'
+        assert parser.getHTML() == eagerParser.getHTML() , 'Expected same html as AdvancedHTMLParser'
+
+    def test_feedChunk(self):
+        parser = LazyAdvancedHTMLParser()
+
+        htmlBytes = TEST_HTML.encode('utf-8')
+        for i in range(0, len(htmlBytes), 7):
+            parser.feedChunk(htmlBytes[i:i+7])
+        parser.close()
+
+        assert parser.getElementById('three').children[0].innerHTML == 'Paragraph' , 'Expected document from feedChunk'
+
+        gotException = False
+        try:
+            parser.iterparse(__file__)
+        except TypeError as e:
+            gotException = 'not available on LazyAdvancedHTMLParser' in str(e)
+
+        assert gotException is True , 'Expected iterparse to not be available, with an explanation'
+
+    def test_modifyAndPickle(self):
+        parser = self._parse()
+
+        oneEm = parser.getElementById('one')
+        newEm = AdvancedHTMLParser.AdvancedTag('em')
+        newEm.appendText('new')
+        oneEm.appendChild(newEm)
+
+        parser.getElementById('three').remove()
+
+        assert '<em >new</em>' in parser.getHTML() , 'Expected appended tag in html'
+        assert 'three' not in parser.getHTML() , 'Expected removed tag to not be in html'
+
+        parser2 = pickle.loads(pickle.dumps(self._parse()))
+        assert parser2.getElementById('two').children[0].innerHTML == 'World' , 'Expected lazy document to be picklable'
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
@@ -0,0 +1,127 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test IndexedAdvancedHTMLParser with lazyIndexes=True, which builds each index the first time it is used
+'''
+
+import pickle
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+
+from IndexTestUtils import assertMatchesFullSearch, getIds, makeSearches
+
+
+TEST_HTML = '''<html><body>
+    <div id="one" class="section main" data-kind="a">
+      <span name="first" class="item">First fox</span>
+      <input id="c1" type="checkbox" name="opt" checked />
+    </div>
+    <div id="two" data-kind="b">
+      <span name="second" class="item active">Second fox</span>
+      <input id="t1" type="text" name="opt" />
+    </div>
+</body></html>
+'''
+
+SEARCHES = makeSearches('getElementById', ('one', 'two', 'c1', 't1', 'new')) + \
+    makeSearches('getElementsByName', ('first', 'second', 'opt')) + \
+    makeSearches('getElementsByTagName', ('div', 'span', 'input', 'p')) + \
+    makeSearches('getElementsByClassName', ('item', 'section', 'item active')) + \
+    makeSearches('getElementsByAttr', ( ('type', 'checkbox'), ('type', 'text'), ('type', 'radio') )) + \
+    makeSearches('getElementsWithAttr', ('data-kind', )) + \
+    makeSearches('getElementsByText', ('fox', )) + \
+    [ ('find', (), { 'tagname' : 'span', 'classname' : 'item' }) ]
+
+class TestLazyIndexes(object):
+
+    def setup_method(self, method):
+        '''
+            Tests check which indexes have been built, so reparse for every method
+        '''
+        self.parser = IndexedAdvancedHTMLParser(lazyIndexes=True, indexText=True)
+        self.parser.addIndexOnAttribute('type')
+        self.parser.addCompositeIndex('tagname', 'classname')
+        self.parser.parseStr(TEST_HTML)
+
+    def test_buildOnFirstUse(self):
+        parser = self.parser
+
+        assert sorted(parser._unbuiltIndexes.keys()) == ['attributenames', 'classname', 'id', 'name', 'tagname', 'text'] , 'Expected no index to be built while parsing'
+        assert len(parser._idMap) == 0 and len(parser._tagNameMap) == 0 and parser.indexFunctions == [] , 'Expected indexes to be empty'
+        assert parser._otherAttributeIndexes['type'] is None and parser._compositeIndexes[('tagname', 'classname')] is None , 'Expected attribute and composite indexes to not be built'
+
+        assert parser.getElementById('c1').getAttribute('type') == 'checkbox' , 'Expected to find tag by id'
+        assert 'id' not in parser._unbuiltIndexes and len(parser._idMap) == 4 , 'Expected the id index to be built'
+        assert 'name' in parser._unbuiltIndexes and len(parser._nameMap) == 0 , 'Expected other indexes to not be built'
+
+        assert getIds(parser.getElementsByAttr('type', 'text')) == ['t1'] , 'Expected to find tag by attribute'
+        assert parser._otherAttributeIndexes['type'] is not None , 'Expected attribute index to be built'
+
+        assert getIds(parser.find(tagname='span', classname='item')) == ['first', 'second'] , 'Expected to find tags with find'
+        assert parser._compositeIndexes[('tagname', 'classname')] is not None , 'Expected composite index to be built'
+
+        assertMatchesFullSearch(parser, SEARCHES)
+        assert parser._unbuiltIndexes == {} , 'Expected all indexes to be built'
+
+    def test_modified(self):
+        parser = self.parser
+
+        # Changes before an index is built
+        parser.getElementById('one').id = 'new'
+        parser.getElementsByName('second')[0].removeClass('item')
+        parser.getElementById('two').appendChild(AdvancedTag('input', [('type', 'radio'), ('class', 'item')]))
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        # And after
+        parser.getElementById('t1').remove()
+        parser.getElementById('new').setAttribute('type', 'radio')
+        newEm = AdvancedTag('span', [('name', 'third'), ('class', 'item')])
+        newEm.appendText('New fox')
+        parser.getElementById('new').appendChild(newEm)
+        assertMatchesFullSearch(parser, SEARCHES)
+        assert getIds(parser.find(tagname='span', classname='item')) == ['first', 'third'] , 'Expected index to be updated'
+
+    def test_reindex(self):
+        parser = self.parser
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        parser.getElementById('two').children[0].children.append(AdvancedTag('p'))
+        parser.reindex()
+        assert 'tagname' in parser._unbuiltIndexes and len(parser._tagNameMap) == 0 , 'Expected reindex to discard the indexes'
+        assert len(parser.getElementsByTagName('p')) == 1 , 'Expected tags added directly to "children" to be found after reindex'
+
+        parser.addIndexOnAttribute('data-kind')
+        assert getIds(parser.getElementsByAttr('data-kind', 'b')) == ['two'] , 'Expected index added after parsing to be built when used'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_notLazy(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert parser._unbuiltIndexes == {} and len(parser._idMap) == 4 , 'Expected indexes to be built while parsing by default'
+
+        parser.addIndexOnAttribute('type')
+        assert parser._otherAttributeIndexes['type'] == {} , 'Expected index added after parsing to be blank until reindex'
+        parser.addCompositeIndex('tagname', 'type')
+        assert len(parser._compositeIndexes[('tagname', 'type')]) == 2 , 'Expected composite index to be built when added'
+
+    def test_pickledAndSnapshot(self):
+        parser = self.parser
+        parser.getElementById('one')
+
+        pickledParser = pickle.loads(pickle.dumps(parser))
+        assert 'name' in pickledParser._unbuiltIndexes , 'Expected unbuilt indexes to be kept when pickled'
+        assertMatchesFullSearch(pickledParser, SEARCHES)
+
+        loadedParser = IndexedAdvancedHTMLParser(lazyIndexes=True)
+        loadedParser.loadSnapshotBytes(parser.getSnapshot())
+
+        assert loadedParser._unbuiltIndexes == {} and len(loadedParser._nameMap) == 3 , 'Expected all indexes in the snapshot to be loaded'
+        loadedParser.getElementById('c1').remove()
+        assertMatchesFullSearch(loadedParser, SEARCHES)
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
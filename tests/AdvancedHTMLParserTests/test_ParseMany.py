@@ -0,0 +1,172 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test parsing many documents with parseMany
+'''
+
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import AdvancedHTMLParser
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser as Parser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Validator import ValidatingAdvancedHTMLParser
+
+
+TEST_DOCUMENTS = [
+    '<html><body><div id="doc%d"><span class="item">%d</span><span class="item">x</span></div></body></html>' %(i, i) for i in range(20)
+]
+
+
+def extractItems(parser):
+    return [ tag.innerHTML for tag in parser.getElementsByClassName('item') ]
+
+def extractFailOnFifth(parser):
+    if parser.getElementById('doc5') is not None:
+        raise ValueError('Bad document')
+    return parser.getRoot().tagName
+
+class UnloadableValue(object):
+    '''
+        UnloadableValue - A value which can be sent from a worker, but raises when loaded in this process
+    '''
+    def __init__(self):
+        self.value = 'x'
+
+    def __setstate__(self, state):
+        raise RuntimeError('Cannot load value')
+
+def extractUnloadableFirst(parser):
+    if parser.getElementById('doc0') is not None:
+        return UnloadableValue()
+
+    # The other documents are slow, so waiting for them all after an error would be noticed
+    time.sleep(.5)
+    return parser.getRoot().tagName
+
+def extractNested(parser):
+    # Parses other documents with parseMany while the outer parseMany is still running
+    innerResults = Parser.parseMany(TEST_DOCUMENTS[:2], workers=1, extract=extractItems)
+    return ( extractItems(parser)[0], [ result.value[0] for result in innerResults ] )
+
+
+class TestParseMany(object):
+
+    def test_parseManyExtract(self):
+        for workers in (1, 2):
+            results = Parser.parseMany(TEST_DOCUMENTS, workers=workers, extract=extractItems)
+
+            assert len(results) == len(TEST_DOCUMENTS) , 'Expected a result for every document'
+            assert [ result.index for result in results ] == list(range(len(TEST_DOCUMENTS))) , 'Expected results in the same order as sources'
+
+            for i, result in enumerate(results):
+                assert issubclass(result.__class__, AdvancedHTMLParser.ParseResult) , 'Expected a ParseResult'
+                assert result.isError is False , 'Did not expect error, but got: %s' %(repr(result.error), )
+                assert result.value == [str(i), 'x'] , 'Got unexpected value for document %d: %s' %(i, repr(result.value))
+
+    def test_parseManyXPath(self):
+        results = Parser.parseMany(TEST_DOCUMENTS[:4], workers=2, xpaths=['//div', '//span[@class="item"][1]'], chunkSize=1)
+
+        assert [ result.value[1] for result in results ] == [ ['<span class="item" >%d</span>' %(i, )] for i in range(4) ] , 'Got unexpected xpath matches: %s' %(repr(results), )
+
+        gotException = False
+        try:
+            Parser.parseMany(TEST_DOCUMENTS, extract=extractItems, xpaths=['//div'])
+        except ValueError:
+            gotException = True
+
+        assert gotException is True , 'Expected ValueError when both extract and xpaths are given'
+
+    def test_parseManyParsers(self):
+        results = IndexedAdvancedHTMLParser.parseMany(TEST_DOCUMENTS[:3], workers=2)
+
+        for i, result in enumerate(results):
+            assert issubclass(result.value.__class__, IndexedAdvancedHTMLParser) , 'Expected parser of same class parseMany was called on'
+
+            divEm = result.value.getElementById('doc%d' %(i, ))
+            assert divEm is not None , 'Expected to find div in parsed document'
+            assert divEm.ownerDocument is result.value , 'Expected tags to be associated with returned parser'
+
+    def test_parseManyErrors(self):
+        for workers in (1, 2):
+            results = Parser.parseMany(TEST_DOCUMENTS, workers=workers, extract=extractFailOnFifth)
+
+            assert [ result.isError for result in results ].count(True) == 1 , 'Expected exactly one error'
+
+            assert results[5].value is None , 'Expected no value on error'
+            assert issubclass(results[5].error.__class__, ValueError) , 'Expected the raised exception to be captured, but got: %s' %(repr(results[5].error), )
+            assert 'Bad document' in results[5].errorTraceback , 'Expected traceback to be captured'
+
+            assert results[6].value == 'html' , 'Expected documents after error to be parsed'
+
+        # Validation exceptions cannot be restored from pickle as-is, ensure it is still reported
+        results = ValidatingAdvancedHTMLParser.parseMany(['<div></span></div>', '<div></div>'], workers=2, chunkSize=1)
+
+        assert results[0].isError is True , 'Expected validation error to be captured'
+        assert 'InvalidCloseException' in str(results[0].error) , 'Expected exception type in message, but got: %s' %(str(results[0].error), )
+        assert results[1].isError is False , 'Expected valid document to parse'
+
+    def test_parseManyFrozen(self):
+        results = Parser.parseMany(TEST_DOCUMENTS[:3], workers=2, extract=Parser.freeze)
+
+        for i, result in enumerate(results):
+            assert issubclass(result.value.__class__, AdvancedHTMLParser.FrozenDocument) , 'Expected a FrozenDocument, but got: %s' %(repr(result.value), )
+            assert result.value.getHTML() == Parser.parseMany(TEST_DOCUMENTS[i:i+1], workers=1)[0].value.getHTML() , 'Expected same document as the parser'
+
+    def test_parseManyStopsOnError(self):
+        gotException = False
+        startTime = time.time()
+        try:
+            Parser.parseMany(TEST_DOCUMENTS, workers=2, extract=extractUnloadableFirst, chunkSize=1)
+        except RuntimeError:
+            gotException = True
+
+        assert gotException is True , 'Expected an error loading a result to be raised'
+        assert time.time() - startTime < 2.5 , 'Expected error to be raised without waiting for the remaining documents'
+        assert not multiprocessing.active_children() , 'Expected workers to be stopped after an error'
+
+    def test_parseManyNested(self):
+        for workers in (1, 2):
+            results = Parser.parseMany(TEST_DOCUMENTS[:4], workers=workers, extract=extractNested)
+
+            assert [ result.isError for result in results ] == [False] * 4 , 'Did not expect errors, but got: %s' %(repr(results), )
+            assert [ result.value for result in results ] == [ (str(i), ['0', '1']) for i in range(4) ] , 'Got unexpected values: %s' %(repr(results), )
+
+    def test_parseManyThreads(self):
+        allResults = {}
+
+        def parseInThread(threadNum):
+            allResults[threadNum] = Parser.parseMany(TEST_DOCUMENTS, workers=1, extract=extractItems)
+
+        threads = [ threading.Thread(target=parseInThread, args=(threadNum, )) for threadNum in range(4) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(allResults.keys()) == [0, 1, 2, 3] , 'Expected every call to return'
+        for results in allResults.values():
+            assert [ result.value for result in results ] == [ [str(i), 'x'] for i in range(len(TEST_DOCUMENTS)) ] , 'Got unexpected values: %s' %(repr(results), )
+
+    def test_parseManyFilenames(self):
+        tempFiles = []
+        try:
+            for html in TEST_DOCUMENTS[:3]:
+                tempFile = tempfile.NamedTemporaryFile()
+                tempFile.write(html.encode('utf-8'))
+                tempFile.flush()
+                tempFiles.append(tempFile)
+
+            results = Parser.parseMany([tempFile.name for tempFile in tempFiles], workers=2, extract=extractItems, sourcesAreFilenames=True)
+
+            assert [ result.value[0] for result in results ] == ['0', '1', '2'] , 'Got unexpected values: %s' %(repr(results), )
+        finally:
+            for tempFile in tempFiles:
+                tempFile.close()
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
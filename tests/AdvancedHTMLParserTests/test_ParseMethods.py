@@ -7,7 +7,9 @@ import sys
 import subprocess
 import tempfile
 
-from AdvancedHTMLParser.Parser import AdvancedHTMLParser
+from io import BytesIO, StringIO
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
 
 TEST_HTML = b"""<html>
   <head>
@@ -61,6 +63,163 @@ class TestParseMethods(object):
         assert testEm.children[0].innerHTML.strip() == 'Moo' , 'Invalid data from file parsing'
 
 
+    def test_ParseMappedFile(self):
+        expectedParser = AdvancedHTMLParser()
+        expectedParser.parseFile(self.tempFile.name)
+
+        for windowSize in (1, 3, 1048576):
+            parser = AdvancedHTMLParser()
+            parser.parseMappedFile(self.tempFile.name, windowSize=windowSize)
+
+            assert parser.getHTML() == expectedParser.getHTML() , 'Expected parseMappedFile with window size %d to match parseFile' %(windowSize, )
+
+        with open(self.tempFile.name, 'rb') as f:
+            parser = IndexedAdvancedHTMLParser()
+            parser.parseMappedFile(f, windowSize=4)
+
+            assert not f.closed , 'Expected passed file object to not be closed'
+
+        testEm = parser.getElementById('farm')
+        assert testEm , 'Failed to extract data from mapped file parsing'
+        assert testEm.children[1].innerHTML.strip() == 'Cock-a-doodle-doo' , 'Invalid data from mapped file parsing'
+
+    def test_FeedChunkMinified(self):
+        html = '<div id="outer"><!-- one --><span>a</span><!--[if IE]><b>ie</b><![endif]--><span>b</span>x &amp; y</div>'
+
+        expectedParser = AdvancedHTMLParser()
+        expectedParser.parseStr(html)
+
+        parser = AdvancedHTMLParser()
+        for i in range(0, len(html), 3):
+            parser.feedChunk(html[i : i + 3])
+
+            if i == 18:
+                # Data before the first comment should not be held back, even without a newline
+                assert parser.getElementById('outer') , 'Expected outer element to be parsed prior to end of line'
+
+        parser.close()
+
+        assert parser.getHTML() == expectedParser.getHTML() , 'Expected chunked parse to match parseStr, but got: %s' %(repr(parser.getHTML()), )
+
+    def test_FeedChunk(self):
+        expectedHTML = AdvancedHTMLParser()
+        expectedHTML.parseStr(TEST_HTML)
+        expectedHTML = expectedHTML.getHTML()
+
+        # Use small chunks to split the multi-byte character
+        for chunkSize in (1, 2, 5, len(TEST_HTML)):
+            parser = IndexedAdvancedHTMLParser()
+
+            for i in range(0, len(TEST_HTML), chunkSize):
+                parser.feedChunk(TEST_HTML[i : i + chunkSize])
+
+            parser.close()
+
+            assert parser.getHTML() == expectedHTML , 'Expected chunked parse with chunk size %d to match parseStr, but got: %s' %(chunkSize, repr(parser.getHTML()))
+
+            testEm = parser.getElementById('farm')
+            assert testEm , 'Failed to find indexed element after chunked parse'
+            assert len(testEm.children) == 2 , 'Invalid data from chunked parsing'
+
+    def test_FeedChunkBuildsAsDataArrives(self):
+        parser = IndexedAdvancedHTMLParser()
+
+        parser.feedChunk('<html><body>\n<div id="first">One</div>\n<div id="sec')
+
+        assert parser.getElementById('first') , 'Expected element to be available before document is complete'
+        assert parser.getElementById('second') is None , 'Did not expect partial tag to be parsed yet'
+
+        parser.feedChunk('ond">Two</div></body></html>')
+        parser.close()
+
+        assert parser.getElementById('second').innerHTML == 'Two' , 'Expected second element after close'
+
+        # Feeding again after close should start a new document
+        parser.feedChunk(u'<span id="another">x</span>')
+        parser.close()
+
+        assert parser.getRoot().id == 'another' , 'Expected new document after close'
+        assert parser.getElementById('first') is None , 'Expected old document to be cleared'
+
+
+    def test_IterParse(self):
+        html = '<html><body><table><tr><td>1</td><td>a<br>b</td></tr><tr><td>2</table><p>x</body></html>'
+
+        parser = AdvancedHTMLParser()
+        gotEvents = [ (event, tag.tagName) for event, tag in parser.iterparse(BytesIO(html.encode('utf-8')), chunkSize=7) ]
+
+        expectedEvents = [ ('start', 'html'), ('start', 'body'), ('start', 'table'),
+            ('start', 'tr'), ('start', 'td'), ('end', 'td'), ('start', 'td'), ('start', 'br'), ('end', 'br'), ('end', 'td'), ('end', 'tr'),
+            ('start', 'tr'), ('start', 'td'), ('end', 'td'), ('end', 'tr'), ('end', 'table'),
+            ('start', 'p'), ('end', 'p'), ('end', 'body'), ('end', 'html'),
+        ]
+        assert gotEvents == expectedEvents , 'Got unexpected events: %s' %(repr(gotEvents), )
+
+        assert parser.getRoot().tagName == 'html' , 'Expected full document to be retained after iterparse'
+        assert len(parser.getElementsByTagName('tr')) == 2 , 'Expected rows to be retained without release'
+
+    def test_IterParseRelease(self):
+        html = '<html><body><table>' + ''.join(['<tr><td>%d</td></tr>\n' %(i, ) for i in range(50)]) + '</table></body></html>'
+
+        parser = AdvancedHTMLParser()
+        rowValues = []
+        for event, tag in parser.iterparse(StringIO(html), events=('end', ), tags='TR', release=True, chunkSize=64):
+            assert event == 'end' , 'Expected only end events'
+            assert tag.tagName == 'tr' , 'Expected only tr tags'
+            rowValues.append(int(tag.textContent))
+
+        assert rowValues == list(range(50)) , 'Got unexpected rows: %s' %(repr(rowValues), )
+
+        table = parser.getElementsByTagName('table')[0]
+        assert len(table.children) == 0 , 'Expected released rows to be removed from table'
+        assert not parser.getElementsByTagName('tr') , 'Expected released rows to be removed from document'
+
+        # Released tags are also removed from the indexes
+        parser = IndexedAdvancedHTMLParser()
+        for event, tag in parser.iterparse(StringIO('<div><p id="x">x</p><p id="y">y</p></div>'), events=('end', ), tags='p', release=True):
+            assert parser.getElementById(tag.id) is tag , 'Expected tag to be indexed at its end event'
+
+        assert parser.getElementById('x') is None and parser.getElementById('y') is None , 'Expected released tags to be removed from the indexes'
+        assert not parser.getElementsByTagName('p') , 'Expected released tags to be removed from the tag name index'
+
+    def test_IterParseReleaseChunkSize(self):
+        html = '<div id="d"><p>one</p><p>two</p></div>'
+
+        for tags in (None, ['div', 'p']):
+            expectedEvents = None
+            for chunkSize in (1, 4, 7, 16, 65536):
+                parser = AdvancedHTMLParser()
+
+                # What each tag holds at its "end" event is the same however the input is read
+                gotEvents = [ (event, tag.tagName, len(tag.children), tag.parentNode is not None) for event, tag in parser.iterparse(StringIO(html), events=('end', ), tags=tags, release=True, chunkSize=chunkSize) ]
+                if expectedEvents is None:
+                    expectedEvents = gotEvents
+                    assert gotEvents == [ ('end', 'p', 0, True), ('end', 'p', 0, True), ('end', 'div', 0, False) ] , 'Got unexpected events: %s' %(repr(gotEvents), )
+
+                assert gotEvents == expectedEvents , 'Expected same events with chunkSize=%d. Got: %s  Expected: %s' %(chunkSize, repr(gotEvents), repr(expectedEvents))
+
+        # Tags without events of their own are kept within the released tag
+        for chunkSize in (1, 4, 65536):
+            parser = AdvancedHTMLParser()
+            gotEvents = [ (tag.tagName, len(tag.children)) for event, tag in parser.iterparse(StringIO(html), events=('end', ), tags='div', release=True, chunkSize=chunkSize) ]
+            assert gotEvents == [ ('div', 2) ] , 'Expected children without events to be kept with chunkSize=%d. Got: %s' %(chunkSize, repr(gotEvents))
+
+    def test_IterParseFile(self):
+        parser = AdvancedHTMLParser()
+        gotTags = [ tag.tagName for event, tag in parser.iterparse(self.tempFile.name, events=('start', ), tags=['div', 'span']) ]
+
+        assert gotTags == ['span', 'div', 'span', 'span'] , 'Got unexpected tags: %s' %(repr(gotTags), )
+        assert parser.getElementById('farm').children[1].innerHTML == 'Cock-a-doodle-doo' , 'Expected document to be parsed from file'
+
+        gotException = False
+        try:
+            list(parser.iterparse(self.tempFile.name, events=('begin', )))
+        except ValueError:
+            gotException = True
+
+        assert gotException is True , 'Expected ValueError for unknown event'
+
+
     def test_encodingWorkingStr(self):
         parser = AdvancedHTMLParser(encoding='ascii')
 
@@ -83,7 +242,63 @@ class TestParseMethods(object):
 
         assert gotException is True, 'Should have failed to parse unicode characters in ascii codec, probably not using passed encoding'
 
+    def test_encodingWorkingMappedFile(self):
+        parser = AdvancedHTMLParser(encoding='ascii')
+
+        gotException = False
+        try:
+            parser.parseMappedFile(self.tempFile.name)
+        except UnicodeDecodeError as e:
+            gotException = True
+
+        assert gotException is True, 'Should have failed to parse unicode characters in ascii codec, probably not using passed encoding'
+
+    def test_parseBytesDetectEncoding(self):
+        html = u'<html><head><meta http-equiv="Content-Type" content="text/html; charset=windows-1251"></head><body><p id="x">\u041f\u0440\u0438\u0432\u0435\u0442</p></body></html>'
+        htmlBytes = html.encode('windows-1251')
+
+        expectedText = u'\u041f\u0440\u0438\u0432\u0435\u0442'
+
+        for source in (htmlBytes, BytesIO(htmlBytes)):
+            parser = AdvancedHTMLParser()
+            parser.parseBytes(source, chunkSize=5)
+
+            assert parser.documentEncoding == 'windows-1251' , 'Expected detected encoding to be recorded, but got: %s' %(repr(parser.documentEncoding), )
+            assert parser.getElementById('x').innerHTML == expectedText , 'Expected document to be decoded with detected encoding'
+
+        with tempfile.NamedTemporaryFile() as tempFile:
+            tempFile.write(htmlBytes)
+            tempFile.flush()
+
+            for parseMethod in ('parseFile', 'parseMappedFile'):
+                parser = IndexedAdvancedHTMLParser()
+                getattr(parser, parseMethod)(tempFile.name, detectEncoding=True)
+
+                assert parser.documentEncoding == 'windows-1251' , 'Expected %s to detect encoding' %(parseMethod, )
+                assert parser.getElementById('x').innerHTML == expectedText , 'Expected %s to decode with detected encoding' %(parseMethod, )
+
+        parser = AdvancedHTMLParser()
+        parser.parseStr(b'<html><head><meta charset="iso-8859-1"></head><body>\xe9</body></html>', detectEncoding=True)
+        assert parser.documentEncoding == 'iso-8859-1' , 'Expected <meta charset> to be detected'
+        assert parser.getElementsByTagName('body')[0].innerHTML == u'\xe9' , 'Expected document to be decoded with detected encoding'
+
+        # Without detection, the given encoding is used
+        parser = AdvancedHTMLParser(encoding='utf-8')
+        parser.parseStr(TEST_HTML)
+        assert parser.documentEncoding == 'utf-8' , 'Expected documentEncoding to be the parser encoding when not detected'
+
+    def test_parseBytesBOM(self):
+        html = u'<p id="x">\xfc</p>'
+
+        for (bom, encoding) in ( (b'\xef\xbb\xbf', 'utf-8'), (b'\xff\xfe', 'utf-16-le'), (b'\xfe\xff', 'utf-16-be') ):
+            htmlBytes = bom + html.encode(encoding)
+
+            for source in (htmlBytes, BytesIO(htmlBytes)):
+                parser = AdvancedHTMLParser(encoding='ascii')
+                parser.parseBytes(source, chunkSize=3)
 
+                assert parser.documentEncoding == encoding , 'Expected encoding from byte order mark to be %s, but got %s' %(encoding, repr(parser.documentEncoding))
+                assert parser.getHTML() == u'<p id="x" >\xfc</p>' , 'Expected byte order mark to be skipped, but got: %s' %(repr(parser.getHTML()), )
 
 
 if __name__ == '__main__':
@@ -3,6 +3,8 @@
     Test pickling
 '''
 
+import ast
+import os
 import pickle
 import subprocess
 import sys
@@ -248,6 +250,80 @@ class TestPickle(object):
 
         assert 'display: block' in str(subspan1.style) and 'display: inline' not in str(subspan1.style) , 'Expected to be able to change style, display -> inline, on unpickled tag without affecting original. Got: ' + repr(str(subspan1.style))
 
+    def test_pickleUidRemap(self):
+        '''
+            pickleUidRemap - Test that uids from another process are replaced when loaded
+        '''
+        import AdvancedHTMLParser.Tags as Tags
+
+        parser = AdvancedHTMLParser.AdvancedHTMLParser()
+        parser.parseStr('<div id="outer"><span id="inner">x</span></div>')
+
+        outerEm = parser.getElementById('outer')
+
+        # Pretend the pickle was created by another process, whose uids may clash with those here
+        oldUidOrigin = Tags._getUidOrigin()
+        Tags._uidOrigin = (oldUidOrigin[0], oldUidOrigin[1] + 1)
+        try:
+            pickleStr = pickle.dumps(parser)
+        finally:
+            Tags._uidOrigin = oldUidOrigin
+
+        loadedParser = pickle.loads(pickleStr)
+        loadedOuterEm = loadedParser.getElementById('outer')
+
+        assert isinstance(loadedOuterEm.uid, int) , 'Expected integer uid'
+        assert loadedOuterEm.uid != outerEm.uid , 'Expected uid from another process to be replaced'
+        assert loadedOuterEm.children[0].uid != parser.getElementById('inner').uid , 'Expected uid of children from another process to be replaced'
+        assert loadedOuterEm.children[0].parentNode is loadedOuterEm , 'Expected structure to be retained'
+
+        collection = AdvancedHTMLParser.TagCollection([outerEm, loadedOuterEm])
+        assert len(collection) == 2 , 'Expected tags loaded from another process to be distinct from tags here'
+
+        # Loaded from this process, the uids are retained
+        loadedParser = pickle.loads(pickle.dumps(parser))
+        assert loadedParser.getElementById('outer').uid == outerEm.uid , 'Expected uid to be retained when loaded in the same process'
+
+    def test_pickleCollectionOtherProcess(self):
+        '''
+            pickleCollectionOtherProcess - Test that a TagCollection loaded in another process holds the new uids of its tags
+        '''
+        collection = AdvancedHTMLParser.TagCollection([AdvancedTag('p'), AdvancedTag('span')])
+
+        # The other process creates tags first, so the uids given to the loaded tags differ from those here
+        script = '''
+import pickle
+import sys
+
+import AdvancedHTMLParser
+
+otherTags = [ AdvancedHTMLParser.AdvancedTag('b') for i in range(3) ]
+
+collection = pickle.loads(sys.stdin.buffer.read() if hasattr(sys.stdin, 'buffer') else sys.stdin.read())
+
+results = [ collection.uids == set( [ tag.uid for tag in collection ] ) ]
+
+collection += otherTags[:1]
+results.append( [ tag.tagName for tag in collection ] )
+
+collection.remove(collection[0])
+results.append( [ tag.tagName for tag in collection ] )
+
+sys.stdout.write(repr(results))
+'''
+        packageDir = os.path.dirname(os.path.dirname(os.path.abspath(AdvancedHTMLParser.__file__)))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join( [ packageDir ] + [ path for path in [ env.get('PYTHONPATH', '') ] if path ] )
+
+        pipe = subprocess.Popen([sys.executable, '-c', script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        (output, errorOutput) = pipe.communicate(pickle.dumps(collection))
+
+        assert pipe.returncode == 0 , 'Expected other process to load collection. Got: %s' %(errorOutput.decode('utf-8'), )
+
+        results = ast.literal_eval(output.decode('utf-8'))
+        assert results[0] is True , 'Expected uids of collection to be those of the loaded tags'
+        assert results[1] == ['p', 'span', 'b'] , 'Expected tag of other process to be added to loaded collection. Got: %s' %(repr(results[1]), )
+        assert results[2] == ['span', 'b'] , 'Expected tag to be removed from loaded collection. Got: %s' %(repr(results[2]), )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,101 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test IndexedAdvancedHTMLParser planning searches given a root, choosing between the index and a scan of the root
+'''
+
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser, PLAN_SCAN_COST
+from AdvancedHTMLParser.Tags import AdvancedTag
+
+
+# Many items, so a search within one section is cheaper as a scan
+TEST_HTML = '''<html><body>
+    <div id="small" class="section">
+      <span name="first" title="First" class="item active" data-sku="a1">First</span>
+      <span name="second" class="item" data-sku="a2">Second</span>
+    </div>
+    <div id="large" class="section">
+%s
+    </div>
+</body></html>
+''' %( '\n'.join( [ '      <span name="item" class="item active" data-sku="a%d">Item</span>' %(i % 3, ) for i in range(PLAN_SCAN_COST * 30) ] ), )
+
+class TestQueryPlanner(object):
+
+    def setup_method(self, method):
+        '''
+            Tests modify the document and check the last plan, so reparse for every method
+        '''
+        self.parser = IndexedAdvancedHTMLParser()
+        self.parser.addIndexOnAttribute('data-sku')
+        self.parser.parseStr(TEST_HTML)
+
+    def _assertSearches(self, parser, root, expectedPlan):
+        '''
+            _assertSearches - Assert each planned search within #root finds the same tags as a full search, with #expectedPlan
+        '''
+        searches = [
+            ('getElementsByTagName', ('span', )),
+            ('getElementsByName', ('item', )),
+            ('getElementsByClassName', ('item', )),
+            ('getElementsByClassName', ('active item', )),
+            ('getElementsByAttr', ('data-sku', 'a1')),
+            ('getElementsWithAttrValues', ('data-sku', ['a1', 'a2'])),
+            ('getElementsWithAttr', ('data-sku', )),
+            ('getElementsWithAttrPrefix', ('data-', )),
+        ]
+        for (searchName, args) in searches:
+            elements = getattr(parser, searchName)(*(args + (root, )))
+
+            plan = parser.getLastSearchPlan()
+            assert plan['search'] == searchName and plan['plan'] == expectedPlan , 'Expected plan "%s" for %s within %s. Got: %s' %(expectedPlan, searchName, root.id, repr(plan))
+
+            # The full search of AdvancedHTMLParser calls the search of each child, so is checked after the plan
+            expectedElements = getattr(AdvancedHTMLParser, searchName)(parser, *(args + (root, )))
+
+            assert set(elements) == set(expectedElements) , 'Expected same tags from %s%s within %s' %(searchName, repr(args), root.id)
+
+    def test_plans(self):
+        parser = self.parser
+
+        assert parser.getLastSearchPlan() is None , 'Expected no plan before a search'
+
+        smallEm = parser.getElementById('small')
+        self._assertSearches(parser, smallEm, 'scan')
+        assert parser.getLastSearchPlan()['subtreeSize'] == 3 , 'Expected size of root to be recorded'
+
+        # Searches of the root tag itself
+        assert parser.getElementsByClassName('section', smallEm) == [smallEm] , 'Expected root to be found by a scan'
+
+        # A rare value is cheaper to check from the index, even within a small root
+        assert parser.getElementsByName('first', smallEm)[0].title == 'First' , 'Expected to find tag with rare name'
+        assert parser.getLastSearchPlan() == { 'search' : 'getElementsByName', 'plan' : 'index', 'numIndexed' : 1, 'subtreeSize' : 3 } , 'Expected search for a rare name to use the index'
+
+        largeEm = parser.getElementById('large')
+        self._assertSearches(parser, largeEm, 'index')
+
+        parser.getElementsByTagName('span')
+        assert parser.getLastSearchPlan() == { 'search' : 'getElementsByTagName', 'plan' : 'index', 'numIndexed' : PLAN_SCAN_COST * 30 + 2, 'subtreeSize' : None } , 'Expected search from the document root to use the index'
+
+    def test_modified(self):
+        parser = self.parser
+
+        smallEm = parser.getElementById('small')
+        for i in range(3):
+            smallEm.appendChild(AdvancedTag('span', [('name', 'added'), ('class', 'item'), ('data-sku', 'a1')]))
+        smallEm.children[0].remove()
+        parser.getElementById('large').children[0].remove()
+
+        self._assertSearches(parser, smallEm, 'scan')
+        assert parser.getLastSearchPlan()['subtreeSize'] >= 3 , 'Expected estimate of size of modified root'
+
+        # Tags added directly to "children" are not numbered until reindex, which the plans still handle
+        smallEm.children.append(AdvancedTag('span', [('class', 'item')]))
+        parser.reindex()
+        self._assertSearches(parser, smallEm, 'scan')
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
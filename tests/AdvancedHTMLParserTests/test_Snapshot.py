@@ -0,0 +1,191 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test saving and loading snapshots of an IndexedAdvancedHTMLParser document together with its indexes
+'''
+
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+from AdvancedHTMLParser.Snapshot import SNAPSHOT_VERSION
+
+from IndexTestUtils import assertMatchesFullSearch, makeSearches
+
+
+TEST_HTML = '''<!DOCTYPE html>
+<html><head><title>Snapshot</title></head><body>
+    <div id="one" class="section main" data-kind="a">
+      <span name="first" title="First">First <b>bold</b> text</span>
+      <input id="c1" type="checkbox" name="opt" checked />
+      <input id="t1" type="text" name="opt" value="" />
+    </div>
+    <div id="two" data-kind="b">
+      <span name="second" class="item">Second &amp; last</span>
+      <br />
+    </div>
+</body></html>
+'''
+
+def getIndexedIds(index):
+    '''
+        getIndexedIds - Get value -> sorted list of a description of each tag, for comparing indexes of different parsers
+    '''
+    return dict( [ (value, sorted( [ tag.getStartTag() for tag in tags.values() ] )) for (value, tags) in index.items() if tags ] )
+
+SEARCHES = makeSearches('getElementsByTagName', ('div', 'span', 'input', 'b')) + \
+    makeSearches('getElementsByClassName', ('section', 'item', 'main section')) + \
+    makeSearches('getElementsByText', ('first', 'bold', 'last', 'new')) + \
+    makeSearches('getElementsWithAttr', ('name', )) + \
+    makeSearches('getElementsByAttr', ( ('data-kind', 'a'), )) + \
+    [ ('find', (), { 'tagname' : 'input', 'type' : 'checkbox' }) ]
+
+def createParser():
+    '''
+        createParser - Create an IndexedAdvancedHTMLParser with the text, attribute and composite indexes a snapshot must keep
+    '''
+    parser = IndexedAdvancedHTMLParser(indexText=True)
+    parser.addIndexOnAttribute('data-kind')
+    parser.addCompositeIndex('tagname', 'type')
+
+    return parser
+
+class TestSnapshot(object):
+
+    def setup_method(self, method):
+        '''
+            Tests modify the document, so reparse for every method
+        '''
+        self.parser = createParser()
+        self.parser.parseStr(TEST_HTML)
+
+    def _assertSameIndexes(self, parser, expectedParser):
+        '''
+            _assertSameIndexes - Assert #parser has the same document and indexes as #expectedParser
+        '''
+        assert parser.getHTML() == expectedParser.getHTML() , 'Expected same HTML.\nGot:\n%s\nExpected:\n%s\n' %(parser.getHTML(), expectedParser.getHTML())
+
+        assert sorted(parser._idMap.keys()) == sorted(expectedParser._idMap.keys()) , 'Expected same ids to be indexed'
+        for (_id, tag) in parser._idMap.items():
+            assert tag.getStartTag() == expectedParser._idMap[_id].getStartTag() , 'Expected same tag indexed under id "%s"' %(_id, )
+
+        for name in ('_nameMap', '_classNameMap', '_tagNameMap', '_attributeNameMap'):
+            assert getIndexedIds(getattr(parser, name)) == getIndexedIds(getattr(expectedParser, name)) , 'Expected same %s index' %(name, )
+
+        assert sorted(parser._otherAttributeIndexes.keys()) == sorted(expectedParser._otherAttributeIndexes.keys()) , 'Expected same attribute indexes'
+        for (attributeName, index) in parser._otherAttributeIndexes.items():
+            assert getIndexedIds(index) == getIndexedIds(expectedParser._otherAttributeIndexes[attributeName]) , 'Expected same index on attribute "%s"' %(attributeName, )
+
+        assert sorted(parser._compositeIndexes.keys()) == sorted(expectedParser._compositeIndexes.keys()) , 'Expected same composite indexes'
+        for (fields, index) in parser._compositeIndexes.items():
+            assert getIndexedIds(index) == getIndexedIds(expectedParser._compositeIndexes[fields]) , 'Expected same composite index on %s' %(repr(fields), )
+
+    def test_loadSnapshot(self):
+        parser = self.parser
+        snapshot = parser.getSnapshot()
+
+        loadedParser = IndexedAdvancedHTMLParser()
+        loadedParser.loadSnapshotBytes(snapshot)
+
+        self._assertSameIndexes(loadedParser, parser)
+        assert loadedParser.indexText is True , 'Expected index settings of the snapshot'
+        assert loadedParser.doctype == parser.doctype , 'Expected doctype to be loaded'
+
+        assert loadedParser.getElementById('c1').getAttribute('checked') == parser.getElementById('c1').getAttribute('checked') , 'Expected binary attribute to be loaded'
+        assert [ tag.ownerDocument for tag in loadedParser.getAllNodes() ] == [ loadedParser ] * len(loadedParser.getAllNodes()) , 'Expected loaded tags to belong to the loaded document'
+        assert object.__getattribute__(loadedParser.getElementsByName('second')[0], '_classNames') is loadedParser.internTable.internClassNames('item') , 'Expected class names of loaded tags to be interned'
+
+        assertMatchesFullSearch(loadedParser, SEARCHES)
+        assert loadedParser.getElementById('one').getElementsByName('first')[0].title == 'First' , 'Expected to find tag within loaded tag'
+
+    def test_multipleRoots(self):
+        parser = createParser()
+        parser.parseStr('<div id="one">One</div> text <span class="item">Two</span>')
+
+        loadedParser = IndexedAdvancedHTMLParser()
+        loadedParser.loadSnapshotBytes(parser.getSnapshot())
+
+        self._assertSameIndexes(loadedParser, parser)
+        assert len(loadedParser.getRootNodes()) == 2 , 'Expected multiple root nodes'
+
+    def test_modified(self):
+        parser = self.parser
+
+        # A snapshot of a modified document is the same as parsing the modified HTML
+        parser.getElementById('two').remove()
+        parser.getElementById('c1').setAttribute('type', 'radio')
+        parser.getElementById('one').appendChild(AdvancedTag('p', [('id', 'new'), ('class', 'item')]))
+        parser.getElementById('new').appendText('New')
+
+        loadedParser = IndexedAdvancedHTMLParser()
+        loadedParser.loadSnapshotBytes(parser.getSnapshot())
+
+        expectedParser = createParser()
+        expectedParser.parseStr(parser.getHTML())
+        self._assertSameIndexes(loadedParser, expectedParser)
+
+        # And the indexes of a loaded document are updated as it is modified
+        loadedParser.getElementById('one').appendChild(AdvancedTag('span', [('name', 'third'), ('class', 'section')]))
+        loadedParser.getElementById('t1').remove()
+        loadedParser.getElementById('new').appendText(' last')
+        assertMatchesFullSearch(loadedParser, SEARCHES)
+        assert loadedParser.getElementsByName('third')[0].className == 'section' , 'Expected added tag to be indexed'
+        assert loadedParser.getElementById('t1') is None , 'Expected removed tag to be removed from the index'
+
+    def test_file(self):
+        parser = self.parser
+
+        (fd, filename) = tempfile.mkstemp(suffix='.snapshot')
+        os.close(fd)
+        try:
+            parser.saveSnapshot(filename)
+
+            loadedParser = IndexedAdvancedHTMLParser()
+            loadedParser.loadSnapshot(filename)
+
+            with open(filename, 'rb') as f:
+                fileParser = IndexedAdvancedHTMLParser()
+                fileParser.loadSnapshot(f)
+        finally:
+            os.unlink(filename)
+
+        self._assertSameIndexes(loadedParser, parser)
+        self._assertSameIndexes(fileParser, parser)
+
+    def test_replacesSettings(self):
+        parser = IndexedAdvancedHTMLParser(indexClassNames=False)
+        parser.parseStr(TEST_HTML)
+
+        loadedParser = IndexedAdvancedHTMLParser()
+        loadedParser.addIndexOnAttribute('type')
+        loadedParser.parseStr('<div class="other">Other</div>')
+        loadedParser.loadSnapshotBytes(parser.getSnapshot())
+
+        assert loadedParser.indexClassNames is False and len(loadedParser._classNameMap) == 0 , 'Expected index settings of the snapshot'
+        assert list(loadedParser._otherAttributeIndexes.keys()) == [] , 'Expected attribute indexes of the snapshot'
+        assert len(loadedParser.getElementsByClassName('section')) == 1 and len(loadedParser.getElementsByClassName('other')) == 0 , 'Expected document of the snapshot'
+
+    def test_errors(self):
+        parser = IndexedAdvancedHTMLParser()
+
+        gotError = False
+        try:
+            parser.getSnapshot()
+        except ValueError:
+            gotError = True
+        assert gotError , 'Expected ValueError for a snapshot of nothing parsed'
+
+        for state in ( [1, 2], { 'version' : SNAPSHOT_VERSION + 1 } ):
+            gotError = False
+            try:
+                parser.loadSnapshotBytes(pickle.dumps(state))
+            except ValueError:
+                gotError = True
+            assert gotError , 'Expected ValueError for a snapshot of an unsupported version'
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
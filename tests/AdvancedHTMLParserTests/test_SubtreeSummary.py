@@ -0,0 +1,118 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test the summaries of the names within each tag, which searches use to skip tags which can not contain a match
+'''
+
+import pickle
+import subprocess
+import sys
+
+from AdvancedHTMLParser import AdvancedHTMLParser, IndexedAdvancedHTMLParser, LazyAdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+from AdvancedHTMLParser.SubtreeSummary import getSubtreeSummary, getTagNameBit, getClassNameBit, getAttributeNameBit
+
+
+TEST_HTML = '''<html><body>
+    <div id="one" class="section">
+      <span name="first" class="item">First</span>
+      <span name="second" class="item" data-sku="a2">Second</span>
+    </div>
+    <div id="two" class="section">
+      <p>Nothing <b>here</b></p>
+      <input id="c1" type="checkbox" name="opt" checked />
+    </div>
+</body></html>
+'''
+
+class TestSubtreeSummary(object):
+
+    def _assertMatchesScan(self, parser):
+        '''
+            _assertMatchesScan - Assert each search finds the same tags as checking every tag in the document
+        '''
+        allNodes = parser.getAllNodes()
+        def scan(matchFunction):
+            return [ tag for tag in allNodes if matchFunction(tag) ]
+
+        for tagName in ('span', 'em', 'b', 'input', 'i'):
+            assert parser.getElementsByTagName(tagName) == scan(lambda tag : tag.tagName == tagName) , 'Expected same tags with tag name "%s"' %(tagName, )
+            assert parser.find(tagname=tagName) == scan(lambda tag : tag.tagName == tagName) , 'Expected same tags from find with tag name "%s"' %(tagName, )
+        for className in ('item', 'section', 'new', 'other'):
+            assert parser.getElementsByClassName(className) == scan(lambda tag : className in tag.classNames) , 'Expected same tags with class name "%s"' %(className, )
+        for name in ('first', 'second', 'opt', 'third'):
+            assert parser.getElementsByName(name) == scan(lambda tag : tag.getAttribute('name') == name) , 'Expected same tags with name "%s"' %(name, )
+        for _id in ('one', 'two', 'c1', 'new'):
+            found = scan(lambda tag : tag.getAttribute('id') == _id)
+            assert parser.getElementById(_id) is (found and found[0] or None) , 'Expected same tag with id "%s"' %(_id, )
+        for attrName in ('data-sku', 'title', 'style', 'checked'):
+            assert parser.getElementsWithAttr(attrName) == scan(lambda tag : tag.hasAttribute(attrName)) , 'Expected same tags with attribute "%s"' %(attrName, )
+
+        assert parser.getElementsByAttr('data-sku', 'b1') == scan(lambda tag : tag.getAttribute('data-sku') == 'b1') , 'Expected same tags with attribute value'
+        assert set(parser.getElementsWithAttrValues('data-sku', ['a2', 'b1'])) == set(scan(lambda tag : tag.getAttribute('data-sku') in ('a2', 'b1'))) , 'Expected same tags with attribute values'
+        assert parser.getElementsByAttr('checked', False) == scan(lambda tag : tag.getAttribute('checked') is False) , 'Expected tags without binary attribute'
+        assert parser.find(tagname='span', classname='item', title='Third') == scan(lambda tag : tag.tagName == 'span' and 'item' in tag.classNames and tag.getAttribute('title') == 'Third') , 'Expected same tags from find'
+
+    def test_summaries(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        oneEm = parser.getElementById('one')
+        assert oneEm._subtreeSummary is not None , 'Expected summary to be built while parsing'
+
+        summary = getSubtreeSummary(oneEm)
+        assert summary & getTagNameBit('span') and summary & getClassNameBit('item') and summary & getAttributeNameBit('data-sku') , 'Expected names within tag to be in summary'
+        assert not summary & getTagNameBit('p') and not summary & getTagNameBit('div') , 'Expected tag names not within tag, or of the tag itself, to not be in summary'
+
+        self._assertMatchesScan(parser)
+
+    def test_modified(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+        self._assertMatchesScan(parser)
+
+        # Names added within tags with summaries
+        newEm = AdvancedTag('em', [('class', 'new'), ('data-sku', 'b1')])
+        newEm.appendChild(AdvancedTag('i'))
+        parser.getElementsByTagName('b')[0].appendChild(newEm)
+        parser.getElementsByName('first')[0].setAttribute('title', 'Third')
+        parser.getElementsByName('first')[0].addClass('other')
+        parser.getElementById('c1').className = 'new'
+        parser.getElementsByTagName('p')[0].style.color = 'red'
+        self._assertMatchesScan(parser)
+
+        parser.getElementById('one').insertBefore(AdvancedTag('span', [('name', 'third')]), parser.getElementsByName('first')[0])
+        parser.getElementsByName('third')[0].tagName = 'em'
+        parser.getElementById('two').id = 'new'
+        self._assertMatchesScan(parser)
+
+        # A tag changed while not in the document, then added again
+        twoEm = parser.getElementById('new')
+        bEm = parser.getElementsByTagName('b')[0]
+        twoEm.remove()
+        bEm.appendChild(AdvancedTag('span', [('class', 'item')]))
+        parser.getElementById('one').appendChild(twoEm)
+        self._assertMatchesScan(parser)
+
+        # A tag added directly to "children"
+        parser.getElementsByTagName('b')[0].children.append(AdvancedTag('i'))
+        parser.clearSubtreeSummaries()
+        self._assertMatchesScan(parser)
+
+    def test_builtWhenUsed(self):
+        for parserClass in (IndexedAdvancedHTMLParser, LazyAdvancedHTMLParser):
+            parser = parserClass()
+            parser.parseStr(TEST_HTML)
+
+            assert parser.getRoot()._subtreeSummary is None , 'Expected %s to not build summaries while parsing' %(parserClass.__name__, )
+            assert [ tag.id for tag in AdvancedHTMLParser.getElementsWithAttr(parser, 'checked') ] == ['c1'] , 'Expected to find tag with summaries built when used'
+            assert parser.getElementById('two')._subtreeSummary is not None , 'Expected summaries to be built when used'
+
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+        parser = pickle.loads(pickle.dumps(parser))
+        assert parser.getRoot()._subtreeSummary is None , 'Expected summaries to not be pickled'
+        self._assertMatchesScan(parser)
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
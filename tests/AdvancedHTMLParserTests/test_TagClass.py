@@ -347,6 +347,79 @@ class TestTagClass(object):
 
         assert strClassName == x.className , 'Expected str of classList to be the same as .className'
 
+    def test_compactTag(self):
+        tag = AdvancedTag('div', [('id', 'one'), ('style', 'display: none')])
+
+        assert not object.__getattribute__(tag, '__dict__') , 'Expected the members of a tag to be held in slots, not a dict'
+        assert tag.id == 'one' and tag.style.display == 'none' , 'Expected dot-access to work'
+
+        tag.someCustomValue = 5
+        assert tag.someCustomValue == 5 , 'Expected to still be able to assign other attributes to a tag'
+        assert tag.getAttribute('somecustomvalue') is None , 'Expected other attributes to not become html attributes'
+
+        assert tag.notSet is None , 'Expected access of an unset attribute to return None'
+
+    def test_lazyTagMembers(self):
+        tag = AdvancedTag('div')
+
+        getRaw = lambda name : object.__getattribute__(tag, name)
+
+        assert getRaw('_attributesDict') is None and getRaw('_style') is None , 'Expected attributes dict and style to not be created for a new tag'
+
+        assert tag.getAttribute('id') is None and tag.hasAttribute('id') is False and tag.getAttributesList() == [] , 'Expected no attributes'
+        assert tag.hasClass('x') is False and tag.removeClass('x') is None and tag.className == '' , 'Expected no class names'
+        assert tag.getStartTag() == '<div >' , 'Expected start tag without attributes'
+        assert getRaw('_attributesDict') is None and getRaw('_style') is None , 'Expected reads to not create attributes dict or style'
+
+        otherTag = AdvancedTag('div')
+        tag.addClass('one')
+        assert otherTag.className == '' , 'Expected adding a class to not affect other tags'
+        assert tag.className == 'one' and tag.getAttribute('class') == 'one' , 'Expected class to be added'
+        tag.removeClass('one')
+        assert tag.className == '' and 'class' not in tag.attributes , 'Expected class to be removed'
+
+        assert tag.style.isEmpty() is True and tag.getAttribute('style') == '' , 'Expected an empty style on first access'
+        tag.style.display = 'block'
+        assert tag.getAttribute('style') == 'display: block' , 'Expected style attribute after setting a style'
+        assert otherTag.getStyle('display') == '' , 'Expected setting a style to not affect other tags'
+
+        otherTag.style = tag.style
+        assert otherTag.style.display == 'block' and otherTag.getStartTag() == '<div style="display: block" >' , 'Expected style to be copied to other tag'
+
+    def test_uids(self):
+        import uuid
+
+        import AdvancedHTMLParser
+        from AdvancedHTMLParser.Tags import TagCollection
+
+        parser = AdvancedHTMLParser.AdvancedHTMLParser()
+        parser.parseStr('<div id="one"><span id="two">x</span></div>')
+
+        oneEm = parser.getElementById('one')
+        twoEm = parser.getElementById('two')
+
+        assert isinstance(oneEm.getUid(), int) , 'Expected integer uid by default'
+        assert twoEm.uid > oneEm.uid , 'Expected uids to increase for each tag created'
+        assert oneEm.cloneNode().uid != oneEm.uid , 'Expected a copy to get its own uid'
+
+        assert oneEm.containsUid(twoEm.uid) is True , 'Expected containsUid to find child uid'
+        assert twoEm.uid in parser , 'Expected "in" operator on parser to accept a uid'
+
+        collection = TagCollection([oneEm, twoEm, oneEm])
+        assert collection.uids == set([oneEm.uid, twoEm.uid]) , 'Expected TagCollection.uids to hold the uid of each tag once'
+
+        AdvancedHTMLParser.toggleUuidUids(True)
+        try:
+            uuidTag = AdvancedTag('div')
+        finally:
+            AdvancedHTMLParser.toggleUuidUids(False)
+
+        assert isinstance(uuidTag.uid, uuid.UUID) , 'Expected uuid uid when toggleUuidUids is enabled'
+        assert isinstance(AdvancedTag('div').uid, int) , 'Expected integer uid after toggleUuidUids is disabled'
+
+        oneEm.appendChild(uuidTag)
+        assert uuidTag.uid in parser and oneEm.containsUid(uuidTag.uid) , 'Expected uuid uids to work alongside integer uids'
+
 
 if __name__ == '__main__':
     sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
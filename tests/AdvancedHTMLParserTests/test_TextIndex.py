@@ -0,0 +1,138 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test searching the text of tags (getElementsByText), with and without the text index of IndexedAdvancedHTMLParser
+'''
+
+import pickle
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+from AdvancedHTMLParser.utils import getTextWords, containsWords
+
+from IndexTestUtils import assertMatchesFullSearch, getIds, makeSearches
+
+
+TEST_HTML = '''<html><body>
+    <div id="one">
+      <p id="p1">The quick brown fox jumps over the lazy dog.</p>
+      <p id="p2">A Quick, <b id="b1">BROWN</b> fox!</p>
+    </div>
+    <div id="two">
+      <span id="s1">fox &amp; hound</span>
+      <span id="s2">dog brown quick</span>
+    </div>
+</body></html>
+'''
+
+TEXTS = ('fox', 'QUICK', 'brown fox', 'quick brown', 'lazy dog', 'dog brown', 'hound', 'the', 'missing', 'fox missing', '!!')
+
+# Search both the text of each tag itself and the text of each tag with its children
+SEARCHES = makeSearches('getElementsByText', TEXTS) + makeSearches('getElementsByText', TEXTS, textContent=True)
+
+class TestTextIndex(object):
+
+    def test_words(self):
+        assert getTextWords(' A Quick, BROWN\tfox!') == ['a', 'quick', 'brown', 'fox'] , 'Expected lowercase words'
+
+        textWords = getTextWords('the quick brown fox')
+        assert containsWords(textWords, ['quick', 'brown']) is True , 'Expected to find phrase'
+        assert containsWords(textWords, ['brown', 'quick']) is False , 'Expected to not find words out of order'
+        assert containsWords(textWords, ['fox']) is True and containsWords(textWords, ['fo']) is False , 'Expected to match whole words'
+
+    def test_fullSearch(self):
+        parser = AdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert getIds(parser.getElementsByText('fox')) == ['p1', 'p2', 's1'] , 'Expected to find a word'
+        assert getIds(parser.getElementsByText('Quick Brown')) == ['p1'] , 'Expected to find a phrase within the text of a tag'
+        assert getIds(parser.getElementsByText('brown')) == ['p1', 'b1', 's2'] , 'Expected to find a word, case-insensitive'
+        assert getIds(parser.getElementsByText('')) == [] , 'Expected no matches without words'
+
+        assert getIds(parser.getElementsByText('brown', textContent=True)) == ['html', 'body', 'one', 'p1', 'p2', 'b1', 'two', 's2'] , 'Expected tags containing matches'
+
+        oneEm = parser.getElementById('one')
+        assert getIds(parser.getElementsByText('brown', root=oneEm, textContent=True)) == ['p1', 'p2', 'b1'] , 'Expected matches within root'
+
+    def test_indexed(self):
+        parser = IndexedAdvancedHTMLParser(indexText=True)
+        parser.parseStr(TEST_HTML)
+
+        assert getIds(parser.getElementsByText('fox')) == ['p1', 'p2', 's1'] , 'Expected to find a word'
+        assert getIds(parser.getElementsByText('Quick Brown')) == ['p1'] , 'Expected to find a phrase within the text of a tag'
+        assert getIds(parser.getElementsByText('hound fox')) == [] , 'Expected to not find words out of order'
+        assert getIds(parser.getElementsByText('brown', textContent=True)) == ['html', 'body', 'one', 'p1', 'p2', 'b1', 'two', 's2'] , 'Expected tags containing matches, in document order'
+
+        assertMatchesFullSearch(parser, SEARCHES)
+        assertMatchesFullSearch(parser, SEARCHES, root=parser.getElementById('one'))
+
+    def test_modified(self):
+        parser = IndexedAdvancedHTMLParser(indexText=True)
+        parser.parseStr(TEST_HTML)
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        p1Em = parser.getElementById('p1')
+        s1Em = parser.getElementById('s1')
+        s2Em = parser.getElementById('s2')
+
+        p1Em.removeText('lazy ')
+        s1Em.appendText(' and missing')
+        assertMatchesFullSearch(parser, SEARCHES)
+        assert getIds(parser.getElementsByText('fox missing')) == [] and getIds(parser.getElementsByText('missing')) == ['s1'] , 'Expected changed text to be indexed'
+
+        s2Em.removeTextAll('brown')
+        s2Em.insertBefore('the ', s2Em.blocks[0])
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        p1Em.text = 'lazy dog'
+        assert getIds(parser.getElementsByText('lazy dog')) == ['p1'] , 'Expected text set directly to be indexed'
+
+        newEm = AdvancedTag('div')
+        newEm.appendText('Brown fox ')
+        newEm.appendChild(AdvancedTag('span'))
+        newEm.children[0].appendText('hound')
+        parser.getElementById('two').appendChild(newEm)
+        assert list(parser.getElementsByText('brown fox')) == [newEm] , 'Expected added tag to be indexed'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        newEm.children[0].appendText(' hound missing')
+        parser.getElementById('one').remove()
+        assert getIds(parser.getElementsByText('lazy')) == [] , 'Expected removed tags to be removed from the index'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+        # Changes to a removed tag are not indexed
+        p1Em.appendText(' missing')
+        assert p1Em not in parser.getElementsByText('missing') , 'Expected removed tag to not be indexed'
+
+    def test_rootText(self):
+        parser = IndexedAdvancedHTMLParser(indexText=True)
+        parser.parseStr('<div>One fox</div>Two fox<div>Three</div>')
+
+        assert len(parser.getElementsByText('fox')) == 2 , 'Expected text at the root level to be indexed'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_notIndexed(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert len(parser._textMap) == 0 and len(parser._textChangedTags) == 0 , 'Expected text to not be indexed by default'
+        assert getIds(parser.getElementsByText('fox')) == ['p1', 'p2', 's1'] , 'Expected to fall back to full search'
+
+        parser.reindex(newIndexText=True)
+        assert getIds(parser.getElementsByText('fox')) == ['p1', 'p2', 's1'] , 'Expected reindex to index text'
+        assertMatchesFullSearch(parser, SEARCHES)
+
+    def test_pickled(self):
+        parser = IndexedAdvancedHTMLParser(indexText=True)
+        parser.parseStr(TEST_HTML)
+        parser.getElementsByText('fox')
+
+        parser = pickle.loads(pickle.dumps(parser))
+        parser.getElementById('s1').appendText(' missing')
+        parser.getElementById('p2').remove()
+        assertMatchesFullSearch(parser, SEARCHES)
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
@@ -0,0 +1,161 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test that the tokenizer backends produce the same results
+'''
+
+import random
+import subprocess
+import sys
+
+import AdvancedHTMLParser
+
+from AdvancedHTMLParser.Parser import AdvancedHTMLParser as Parser, IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Tokenizer import HTMLParserTokenizer, RegexTokenizer
+
+
+class RecordingParser(Parser):
+    '''
+        RecordingParser - Records every event passed from the tokenizer
+    '''
+
+    def __init__(self, *args, **kwargs):
+        self.events = []
+        Parser.__init__(self, *args, **kwargs)
+
+    def handle_starttag(self, tagName, attributeList, isSelfClosing=False):
+        self.events.append( ('starttag', tagName, tuple(attributeList), isSelfClosing) )
+        return Parser.handle_starttag(self, tagName, attributeList, isSelfClosing)
+
+    def handle_endtag(self, tagName):
+        self.events.append( ('endtag', tagName) )
+        return Parser.handle_endtag(self, tagName)
+
+    def handle_data(self, data):
+        self.events.append( ('data', data) )
+        return Parser.handle_data(self, data)
+
+    def handle_entityref(self, entity):
+        self.events.append( ('entityref', entity) )
+        return Parser.handle_entityref(self, entity)
+
+    def handle_charref(self, charRef):
+        self.events.append( ('charref', charRef) )
+        return Parser.handle_charref(self, charRef)
+
+    def handle_comment(self, comment):
+        self.events.append( ('comment', comment) )
+        return Parser.handle_comment(self, comment)
+
+    def handle_decl(self, decl):
+        self.events.append( ('decl', decl) )
+        return Parser.handle_decl(self, decl)
+
+    def handle_pi(self, pi):
+        self.events.append( ('pi', pi) )
+
+    def unknown_decl(self, decl):
+        self.events.append( ('unknown_decl', decl) )
+        return Parser.unknown_decl(self, decl)
+
+
+TEST_DOCUMENTS = [
+    '''<!DOCTYPE html>
+<html>
+  <head>
+    <title>Test &amp; more</title>
+    <script type="text/javascript">if ( a < b && c > d ) { x = "</div>"; }</script>
+    <style>div > span { color: red; }</style>
+  </head>
+  <body class="main page" data-x='1'>
+    <!-- A comment -->
+    <div id="one" hidden>Hello &lt;world&gt; &#169; &#x41; &nbsp;&amp x</div>
+    <a href=/some/path?x=1&amp;y=2 target = "_blank">Link</a>
+    <img src="a.png" alt="" /><br/><br >
+    <input type=checkbox checked disabled/>
+    <p>Unclosed <b>bold <i>italic</b> text
+    <SPAN ID="upper" Class="Mixed">Upper</SPAN>
+    <x:custom ns:attr="1" weird_attr=2>Custom</x:custom>
+    <a b="x"c="y">No space between attributes</a>
+    <p>Less than < and & alone, and 3 < 4</p>
+    </ p >
+    <?php echo "hi"; ?>
+  </body>
+</html>
+''',
+    '<div id="one">a</div>\n<div id="two">b</div> tail',
+    '<table><tr><td>1<td>2</tr><tr><td>3</table>',
+    '<p title="&quot;quoted&quot; &amp; &#39;single&#39;">x</p>',
+]
+
+FUZZ_PIECES = [
+    '<div>', '</div>', '<p class="a b">', '<a href=x/y>', "<a href='q'>", '<br/>', '<br />', '<img src="a&amp;b" alt>',
+    'text', ' ', '\n', '&amp;', '&amp', '&#123;', '&#x41;', '&#12a;', '&', '&#', '<', '>', '</', '<!-- c -->', '<!--x', '-->',
+    '<!DOCTYPE html>', '<?php x ?>', '<![CDATA[x]]>', '<script>if (a<b) {}</script>', '<style>p>a{}</style>', '</SCRIPT>',
+    '<SPAN Id=1>', '<x:y a:b=1>', '<a b="x"c="y">', '<a  b = "x" >', '<a b=c d>', '</ p >', '</>', '< p>', '<a/b>',
+    '"', "'", '=', '&lt;x', '<td', '<TR>', '</tr  >', '<input checked=checked disabled/>', '&foo-bar;', '&a.b x', '<p ="x">',
+]
+
+
+def parseWithTokenizer(html, tokenizer, numChunks=0, seed=0):
+    '''
+        parseWithTokenizer - Parse #html using #tokenizer, either with parseStr or (if numChunks > 0)
+            fed in that many random-sized chunks.
+    '''
+    parser = RecordingParser(tokenizer=tokenizer)
+
+    if not numChunks:
+        parser.parseStr(html)
+        return parser
+
+    htmlBytes = html.encode('utf-8')
+    splitPoints = sorted(random.Random(seed).sample(range(len(htmlBytes) + 1), min(numChunks, len(htmlBytes) + 1)))
+
+    prevSplit = 0
+    for splitPoint in splitPoints + [len(htmlBytes)]:
+        parser.feedChunk(htmlBytes[prevSplit:splitPoint])
+        prevSplit = splitPoint
+    parser.close()
+
+    return parser
+
+
+class TestTokenizer(object):
+
+    def test_RegexTokenizerConformance(self):
+        for html in TEST_DOCUMENTS:
+            for numChunks in (0, 3, 20):
+                defaultParser = parseWithTokenizer(html, HTMLParserTokenizer, numChunks)
+                regexParser = parseWithTokenizer(html, RegexTokenizer, numChunks)
+
+                assert regexParser.events == defaultParser.events , 'Expected same events from both tokenizers for %s' %(repr(html), )
+                assert regexParser.getHTML() == defaultParser.getHTML() , 'Expected same html from both tokenizers for %s' %(repr(html), )
+
+    def test_RegexTokenizerFuzz(self):
+        rand = random.Random(1)
+
+        for i in range(300):
+            html = ''.join( [ rand.choice(FUZZ_PIECES) for j in range(rand.randint(1, 25)) ] )
+
+            for numChunks in (0, 4):
+                defaultParser = parseWithTokenizer(html, HTMLParserTokenizer, numChunks, seed=i)
+                regexParser = parseWithTokenizer(html, RegexTokenizer, numChunks, seed=i)
+
+                assert regexParser.events == defaultParser.events , 'Expected same events from both tokenizers for %s.\nGot:      %s\nExpected: %s' %(repr(html), repr(regexParser.events), repr(defaultParser.events))
+
+    def test_TokenizerSelection(self):
+        parser = Parser()
+        assert issubclass(parser._tokenizer.__class__, HTMLParserTokenizer) , 'Expected default tokenizer to be HTMLParserTokenizer'
+
+        parser = IndexedAdvancedHTMLParser(tokenizer=AdvancedHTMLParser.RegexTokenizer)
+        assert issubclass(parser._tokenizer.__class__, RegexTokenizer) , 'Expected tokenizer to be selected per parser'
+
+        parser.parseStr(TEST_DOCUMENTS[0])
+
+        assert parser.getElementById('one').innerHTML == 'Hello &lt;world&gt; &#169; &#x41; &nbsp;&amp; x' , 'Got unexpected innerHTML: %s' %(repr(parser.getElementById('one').innerHTML), )
+        assert parser.getElementsByClassName('Mixed')[0].id == 'upper' , 'Expected attribute names to be lowercased'
+        assert parser.getElementsByTagName('a')[0].href == '/some/path?x=1&y=2' , 'Expected unquoted attribute value to be unescaped'
+        assert len(parser.getElementsByTagName('script')[0].children) == 0 , 'Expected script contents to be data'
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
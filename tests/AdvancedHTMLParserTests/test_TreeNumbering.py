@@ -0,0 +1,116 @@
+#!/usr/bin/env GoodTests.py
+'''
+    Test the numbering of the tree by IndexedAdvancedHTMLParser, used to check if a tag is within another
+'''
+
+import pickle
+import subprocess
+import sys
+
+from AdvancedHTMLParser.Parser import IndexedAdvancedHTMLParser
+from AdvancedHTMLParser.Tags import AdvancedTag
+
+
+TEST_HTML = '''<html><body>
+    <div id="one" class="section">
+      <span name="item" class="item">One <b class="item">bold</b></span>
+      <div class="inner"><span name="item" class="item">Inner</span></div>
+    </div>
+    <div id="two" class="section">
+      <span name="item" class="item">Two</span>
+    </div>
+</body></html>
+'''
+
+def walkContains(tag, other):
+    '''
+        walkContains - Check if #other is #tag or within it by walking up the tree
+    '''
+    while other is not None:
+        if other is tag:
+            return True
+        other = other.parentNode
+
+    return False
+
+class TestTreeNumbering(object):
+
+    def _assertNumbering(self, parser):
+        '''
+            _assertNumbering - Assert contains and searches within a tag give the same results as walking the tree
+        '''
+        allNodes = parser.getAllNodes()
+
+        for tag in allNodes:
+            for other in allNodes:
+                assert tag.contains(other) == walkContains(tag, other) , 'Expected %s.contains(%s) to be %s' %(repr(tag), repr(other), walkContains(tag, other))
+
+            for (methodName, arg) in ( ('getElementsByTagName', 'span'), ('getElementsByName', 'item'), ('getElementsByClassName', 'item') ):
+                gotTags = getattr(parser, methodName)(arg, root=tag)
+                expectedTags = [ other for other in getattr(parser, methodName)(arg, useIndex=False) if walkContains(tag, other) ]
+
+                assert set(gotTags) == set(expectedTags) , 'Expected %s("%s") within %s to match walking the tree' %(methodName, arg, repr(tag))
+
+        # Numbers are in document order, with the tags within a tag between its numbers
+        numbers = []
+        for tag in allNodes:
+            numbers.append(tag._treeEnter)
+            assert tag._treeEnter < tag._treeExit , 'Expected exit number after enter number'
+
+        assert numbers == sorted(numbers) , 'Expected tags to be numbered in document order'
+
+    def test_parsed(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+
+        assert parser.getRoot()._treeEnter is None , 'Expected the tree to not be numbered until needed'
+
+        self._assertNumbering(parser)
+
+        oneEm = parser.getElementById('one')
+        assert parser.getElementById('one', root=oneEm) is oneEm , 'Expected to find root itself'
+        assert parser.getElementById('two', root=oneEm) is None , 'Expected to not find sibling within root'
+
+        parser.reindex()
+        assert parser.getRoot()._treeEnter is not None , 'Expected reindex to number the tree'
+        self._assertNumbering(parser)
+
+    def test_modified(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+        parser.reindex()
+
+        oneEm = parser.getElementById('one')
+        twoEm = parser.getElementById('two')
+
+        # Enough changes at the same place to use the room between numbers, so that the tree is numbered again
+        for i in range(40):
+            twoEm.appendChild(AdvancedTag('span', [('name', 'item')]))
+            oneEm.insertBefore(AdvancedTag('span', [('class', 'item')]), oneEm.children[0])
+            oneEm.insertAfter(AdvancedTag('b'), oneEm.children[0])
+
+        newEm = AdvancedTag('div')
+        newEm.appendChild(AdvancedTag('span', [('name', 'item')]))
+        twoEm.insertBefore(newEm, twoEm.children[1])
+
+        self._assertNumbering(parser)
+
+        innerEm = parser.getElementsByClassName('inner')[0]
+        innerEm.remove()
+        assert innerEm._treeEnter is None , 'Expected removed tag to not be numbered'
+        assert oneEm.contains(innerEm) is False and innerEm.contains(innerEm.children[0]) is True , 'Expected contains on removed tag'
+
+        twoEm.appendChild(innerEm)
+        self._assertNumbering(parser)
+
+    def test_pickled(self):
+        parser = IndexedAdvancedHTMLParser()
+        parser.parseStr(TEST_HTML)
+        parser.reindex()
+
+        parser = pickle.loads(pickle.dumps(parser))
+        self._assertNumbering(parser)
+
+
+if __name__ == '__main__':
+    sys.exit(subprocess.Popen('GoodTests.py -n1 "%s" %s' %(sys.argv[0], ' '.join(['"%s"' %(arg.replace('"', '\\"'), ) for arg in sys.argv[1:]]) ), shell=True).wait())
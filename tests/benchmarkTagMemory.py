@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+'''
+    benchmarkTagMemory.py - Measure the memory used, and number of allocations, per AdvancedTag
+
+      Usage: benchmarkTagMemory.py [numNodes]
+'''
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import AdvancedHTMLParser
+
+
+def measureMemory(func):
+    '''
+        measureMemory - Call #func, and return the number of bytes and the number of allocations still held by it (and its result)
+
+            @return tuple( numBytes <int>, numAllocations <int> )
+    '''
+    gc.collect()
+    tracemalloc.start()
+
+    result = func()
+
+    gc.collect()
+    (currentMemory, peakMemory) = tracemalloc.get_traced_memory()
+    numAllocations = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.stop()
+
+    del result
+
+    return (currentMemory, numAllocations)
+
+
+def createTags(numNodes):
+    AdvancedTag = AdvancedHTMLParser.AdvancedTag
+
+    return [ AdvancedTag('div') for i in range(numNodes) ]
+
+def createTagsWithAttributes(numNodes):
+    AdvancedTag = AdvancedHTMLParser.AdvancedTag
+
+    return [ AdvancedTag('a', [('href', '/item'), ('class', 'link')]) for i in range(numNodes) ]
+
+def parseDocument(numNodes):
+    parser = AdvancedHTMLParser.AdvancedHTMLParser()
+    parser.parseStr('<html><body>%s</body></html>' %( '<p class="x">Text</p>' * (numNodes - 2), ))
+
+    return parser
+
+
+if __name__ == '__main__':
+
+    if len(sys.argv) > 1:
+        numNodes = int(sys.argv[1])
+    else:
+        numNodes = 100000
+
+    print ( 'Per node, for %d nodes:\n' %(numNodes, ) )
+    print ( '  %-34s  %6s  %11s' %('', 'Bytes', 'Allocations') )
+
+    for (label, func) in ( ('AdvancedTag(tagName)', createTags), ('AdvancedTag(tagName, attributes)', createTagsWithAttributes), ('Parsed document', parseDocument) ):
+        (numBytes, numAllocations) = measureMemory(lambda : func(numNodes))
+
+        print ( '  %-34s  %6d  %11.1f' %(label, numBytes // numNodes, float(numAllocations) / numNodes) )
+
+# vim: set ts=4 sw=4 st=4 expandtab :
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+'''
+    benchmarkTokenizer.py - Compare parsing throughput of the tokenizer backends
+
+      Usage: benchmarkTokenizer.py [filename] [numRuns]
+
+        If no filename is given, a generated document is used.
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import AdvancedHTMLParser
+from AdvancedHTMLParser.Tokenizer import HTMLParserTokenizer, RegexTokenizer
+
+
+def generateDocument(numRows=2000):
+    rows = []
+    for i in range(numRows):
+        rows.append('''    <tr class="row %s" id="row%d" data-idx="%d">
+      <td class="name"><a href="/item?id=%d&amp;page=1">Item %d</a></td>
+      <td class="price">$%d.99</td>
+      <td><input type="checkbox" name="sel%d" checked> <br/> &nbsp;</td>
+    </tr>
+''' %( i % 2 and 'odd' or 'even', i, i, i, i, i % 100, i))
+
+    return '''<!DOCTYPE html>
+<html>
+  <head>
+    <title>Benchmark</title>
+    <style>td > a { color: red; }</style>
+  </head>
+  <body>
+    <!-- Generated table -->
+    <table id="items">
+%s    </table>
+  </body>
+</html>
+''' %( ''.join(rows), )
+
+
+class TokenizeOnlyParser(AdvancedHTMLParser.AdvancedHTMLParser):
+    '''
+        TokenizeOnlyParser - Ignores all events, to measure just the tokenizer
+    '''
+
+    def handle_starttag(self, tagName, attributeList, isSelfClosing=False):
+        pass
+
+    def handle_startendtag(self, tagName, attributeList):
+        pass
+
+    def handle_endtag(self, tagName):
+        pass
+
+    def handle_data(self, data):
+        pass
+
+    def handle_entityref(self, entity):
+        pass
+
+    def handle_charref(self, charRef):
+        pass
+
+    def handle_comment(self, comment):
+        pass
+
+
+def timeParse(html, parserClass, tokenizer, numRuns):
+    bestTime = None
+    for i in range(numRuns):
+        parser = parserClass(tokenizer=tokenizer)
+
+        startTime = time.time()
+        parser.parseStr(html)
+        runTime = time.time() - startTime
+
+        if bestTime is None or runTime < bestTime:
+            bestTime = runTime
+
+    return bestTime
+
+
+if __name__ == '__main__':
+
+    args = sys.argv[1:]
+
+    if args:
+        with open(args[0], 'rt') as f:
+            html = f.read()
+    else:
+        html = generateDocument()
+
+    if len(args) > 1:
+        numRuns = int(args[1])
+    else:
+        numRuns = 5
+
+    sizeMB = len(html) / 1048576.0
+
+    print ( 'Document size: %.2f MB, best of %d runs\n' %(sizeMB, numRuns) )
+
+    for (label, parserClass) in ( ('Tokenize only', TokenizeOnlyParser), ('Full parse', AdvancedHTMLParser.AdvancedHTMLParser) ):
+        print ( '%s:' %(label, ) )
+
+        baseTime = None
+        for tokenizer in (HTMLParserTokenizer, RegexTokenizer):
+            runTime = timeParse(html, parserClass, tokenizer, numRuns)
+            if baseTime is None:
+                baseTime = runTime
+
+            print ( '  %-20s  %.3fs  %6.2f MB/s  (%.2fx)' %(tokenizer.__name__, runTime, sizeMB / runTime, baseTime / runTime) )
+
+        print ( '' )
+
+# vim: set ts=4 sw=4 st=4 expandtab :